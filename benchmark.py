@@ -0,0 +1,405 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime
+
+import selenium
+
+from config import Config
+from utils.driver_setup import DriverSetup
+from utils.profiler import command_profiler, percentile
+
+from pages.login_page import LoginPage
+from pages.home_page import HomePage
+from pages.cart_page import CartPage
+from pages.checkout_page import CheckoutPage
+
+# 退出码：0 = 未发现回归；1 = 有性能回归；
+# 3 = 没有基线文件，没有做比较（CI 不能把“没有门禁”当成“没有回归”；--allow-missing-baseline 时只提示、退出码 0）
+EXIT_REGRESSION = 1
+EXIT_NO_BASELINE = 3
+
+
+# ---------------------------------------------------------------------- 热点流程
+# 每个流程：setup(driver) 只做准备、不计时；run(driver) 是被测量的部分
+
+
+def _open_login(driver):
+    LoginPage(driver).open()
+
+
+def _login(driver):
+    LoginPage(driver).open().login(Config.VALID_USERNAME, Config.VALID_PASSWORD)
+
+
+def _login_and_add(driver):
+    _login(driver)
+    HomePage(driver).add_first_product_to_cart()
+
+
+def _login_add_and_open_cart(driver):
+    _login_and_add(driver)
+    HomePage(driver).go_to_cart()
+
+
+def _flow_driver_creation(_):
+    DriverSetup.quit_quietly(DriverSetup.get_driver())
+
+
+def _flow_login(driver):
+    LoginPage(driver).login(Config.VALID_USERNAME, Config.VALID_PASSWORD)
+
+
+def _flow_add_to_cart(driver):
+    HomePage(driver).add_first_product_to_cart()
+
+
+def _flow_go_to_cart(driver):
+    HomePage(driver).go_to_cart()
+
+
+def _flow_checkout(driver):
+    """与 tests/test_checkout.py::TestCheckout::test_complete_checkout_flow 相同的步骤（不含截图/断言）"""
+    cart_page = CartPage(driver)
+    checkout_page = CheckoutPage(driver)
+    cart_page.get_cart_items_count()
+    cart_page.click_checkout()
+    checkout_page.enter_checkout_info("张", "三", "100000")
+    checkout_page.click_continue()
+    checkout_page.get_order_summary()
+    checkout_page.click_finish()
+    checkout_page.get_success_message()
+    checkout_page.is_order_complete()
+
+
+def _flow_demo_workflow(_):
+    # demo_full_workflow 自己启动/关闭浏览器；去掉步骤间固定的 1 秒停顿，只测浏览器和页面对象
+    from main import StepFailed, demo_full_workflow
+
+    # 出错时 demo_full_workflow 只返回 False：必须抛出，失败的一轮不能当成一次（很快的）有效采样
+    if not demo_full_workflow(think=lambda: None):
+        raise StepFailed("demo_full_workflow 没有走完（登录失败或执行出错，详见日志）")
+
+
+# 名称 -> (setup, run, 是否使用共享浏览器)
+FLOWS = {
+    "driver_creation": (None, _flow_driver_creation, False),
+    "login": (_open_login, _flow_login, True),
+    "add_to_cart": (_login, _flow_add_to_cart, True),
+    "go_to_cart": (_login_and_add, _flow_go_to_cart, True),
+    "checkout": (_login_add_and_open_cart, _flow_checkout, True),
+    "demo_full_workflow": (None, _flow_demo_workflow, False),
+}
+
+
+# ---------------------------------------------------------------------- 测量
+
+
+def _stats(samples_ms, commands):
+    values = sorted(samples_ms)
+    return {
+        "iterations": len(values),
+        "p50_ms": round(percentile(values, 50), 1),
+        "p95_ms": round(percentile(values, 95), 1),
+        "max_ms": round(values[-1], 1) if values else 0.0,
+        # 同一流程每次的命令数应当相同，取中位数以防个别轮次重试
+        "commands": sorted(commands)[len(commands) // 2] if commands else 0,
+    }
+
+
+def run_flow(name, iterations, warmup, shared_driver=None):
+    setup, run, uses_shared = FLOWS[name]
+    samples, commands = [], []
+    for i in range(warmup + iterations):
+        driver = shared_driver if uses_shared else None
+        if driver is not None:
+            DriverSetup.reset_driver(driver)
+            if setup:
+                setup(driver)
+
+        command_profiler.begin_test(f"benchmark::{name}")
+        start = time.perf_counter()
+        run(driver)
+        elapsed = (time.perf_counter() - start) * 1000
+        summary = command_profiler.end_test()
+
+        if i >= warmup:
+            samples.append(elapsed)
+            commands.append(summary["commands"])
+    return _stats(samples, commands)
+
+
+def _browser_memory_mb(driver):
+    """driver 对应浏览器进程树的常驻内存（MB）；没装 psutil 或拿不到进程时返回 None"""
+    try:
+        import psutil
+    except ImportError:
+        return None
+    process = getattr(getattr(driver, "service", None), "process", None)
+    if process is None:
+        return None
+    try:
+        root = psutil.Process(process.pid)
+        tree = [root] + root.children(recursive=True)
+        return sum(p.memory_info().rss for p in tree if p.is_running()) / (1024 * 1024)
+    except psutil.Error:
+        return None
+
+
+def measure_density(mode, sessions):
+    """同时打开 sessions 个会话，测每个会话的准备耗时和内存占用
+
+    mode："per_test"（每个会话一个浏览器进程）或 "context"（一个进程内多个浏览器上下文）
+    """
+    from utils.driver_setup import BrowserContextProvider
+
+    setup_ms, drivers, provider = [], [], None
+    try:
+        if mode == "context":
+            provider = BrowserContextProvider()
+        for _ in range(sessions):
+            start = time.perf_counter()
+            driver = provider.acquire() if provider else DriverSetup.get_driver()
+            driver.get(Config.BASE_URL)
+            setup_ms.append((time.perf_counter() - start) * 1000)
+            if driver not in drivers:
+                drivers.append(driver)
+        memory = [_browser_memory_mb(d) for d in drivers]
+        total_mb = None if None in memory else sum(memory)
+    finally:
+        if provider is not None:
+            provider.close()
+        else:
+            for driver in drivers:
+                DriverSetup.quit_quietly(driver)
+
+    values = sorted(setup_ms)
+    result = {
+        "sessions": sessions,
+        "setup_p50_ms": round(percentile(values, 50), 1),
+        "setup_max_ms": round(values[-1], 1),
+        "memory_mb": round(total_mb, 1) if total_mb is not None else None,
+    }
+    if total_mb:
+        result["mb_per_session"] = round(total_mb / sessions, 1)
+        result["sessions_per_gb"] = round(1024 / (total_mb / sessions), 1)
+    return result
+
+
+PROFILE_PAGES = ("", "inventory.html", "cart.html")
+
+
+def measure_profile(profile_name, iterations):
+    """在指定驱动配置档下反复导航几个页面，统计每次导航的阻塞耗时和传输字节数"""
+    from utils.page_metrics import measure_navigation
+
+    original = Config.DRIVER_PROFILE
+    Config.DRIVER_PROFILE = profile_name
+    driver = None
+    try:
+        driver = DriverSetup.get_driver()
+        _login(driver)
+        per_page = {}
+        for _ in range(iterations):
+            for page in PROFILE_PAGES:
+                m = measure_navigation(driver, Config.BASE_URL + page)
+                per_page.setdefault(page or "login", []).append(m)
+    finally:
+        Config.DRIVER_PROFILE = original
+        if driver is not None:
+            DriverSetup.quit_quietly(driver)
+
+    result = {}
+    for page, samples in per_page.items():
+        times = sorted(m["get_ms"] for m in samples)
+        result[page] = {
+            "get_p50_ms": round(percentile(times, 50), 1),
+            "transfer_bytes": round(sum(m["transfer_bytes"] for m in samples) / len(samples)),
+            "resources": round(sum(m["resources"] for m in samples) / len(samples), 1),
+        }
+    return result
+
+
+def _environment(target):
+    return {
+        "browser": Config.BROWSER,
+        "headless": Config.HEADLESS,
+        "target": target,
+        "python": platform.python_version(),
+        "selenium": selenium.__version__,
+        "platform": platform.platform(),
+    }
+
+
+# ---------------------------------------------------------------------- 基线与门禁
+
+
+def load_baseline(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(results, baseline, threshold):
+    """与基线比较，返回回归列表
+
+    回归条件：p50 或 p95 比基线慢超过 threshold（比例），或 WebDriver 命令数增加。
+    基线里没有的流程只提示，不算回归。
+    """
+    regressions = []
+    base_flows = (baseline or {}).get("flows", {})
+    for name, current in results.items():
+        base = base_flows.get(name)
+        if base is None:
+            print(f"  {name}: 基线中没有该流程，跳过比较")
+            continue
+        for key in ("p50_ms", "p95_ms"):
+            limit = base[key] * (1 + threshold)
+            if base[key] and current[key] > limit:
+                regressions.append(f"{name}: {key} {current[key]:.1f} > 基线 {base[key]:.1f} × {1 + threshold:.2f}")
+        if current["commands"] > base["commands"]:
+            regressions.append(f"{name}: WebDriver 命令数 {current['commands']} > 基线 {base['commands']}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="框架热点流程基准测试（p50/p95/max 耗时与 WebDriver 命令数）",
+        epilog=f"退出码：0 未发现回归（--allow-missing-baseline 时没有基线也是 0），{EXIT_REGRESSION} 有性能回归，"
+               f"{EXIT_NO_BASELINE} 没有基线文件（未做比较）",
+    )
+    parser.add_argument("--flows", default=",".join(FLOWS), help=f"要运行的流程，逗号分隔（默认全部: {','.join(FLOWS)}）")
+    parser.add_argument("--iterations", type=int, default=Config.BENCHMARK_ITERATIONS, help="每个流程的测量轮数")
+    parser.add_argument("--warmup", type=int, default=Config.BENCHMARK_WARMUP, help="每个流程先跑几轮不计入结果")
+    parser.add_argument("--remote", action="store_true", help="对 Config.BASE_URL 的真实站点运行（默认用本地替身站点，数据更稳定）")
+    parser.add_argument("--latency", default="none", help="本地站点注入的网络条件（none / lan / broadband / wan / 3g）")
+    parser.add_argument("--baseline", default=Config.BENCHMARK_BASELINE, help="基线文件")
+    parser.add_argument("--threshold", type=float, default=Config.BENCHMARK_THRESHOLD, help="允许的变慢比例（0.2 = 20%%）")
+    parser.add_argument("--update-baseline", action="store_true", help="把本次结果写为新的基线（不做比较）")
+    parser.add_argument("--allow-missing-baseline", action="store_true",
+                        default=not Config.BENCHMARK_REQUIRE_BASELINE,
+                        help=f"没有基线文件时只提示并跳过比较（默认以退出码 {EXIT_NO_BASELINE} 失败；"
+                             "也可设置环境变量 BENCHMARK_REQUIRE_BASELINE=0）")
+    parser.add_argument("--output", default=f"{Config.REPORT_DIR}benchmark.json", help="本次结果输出文件")
+    parser.add_argument("--density", type=int, default=0, metavar="N",
+                        help="只做会话密度对比：同时打开 N 个会话，比较每进程一个浏览器与浏览器上下文（chrome / edge）的准备耗时和内存")
+    parser.add_argument("--profiles", default="",
+                        help="只做驱动配置档对比，例如 fidelity,fast：统计每次导航的耗时和传输字节数，以第一个为基准计算节省量")
+    args = parser.parse_args(argv)
+
+    names = [n.strip() for n in args.flows.split(",") if n.strip()]
+    unknown = [n for n in names if n not in FLOWS]
+    if unknown:
+        parser.error(f"未知的流程: {', '.join(unknown)}")
+
+    # 统计命令数依赖命令分析器（对所有流程一致地包装，开销计入但各轮相同）
+    Config.PROFILE_COMMANDS = True
+
+    site = None
+    if not args.remote:
+        from utils.local_site import LocalSite
+
+        site = LocalSite(latency=args.latency).start()
+        Config.BASE_URL = site.url
+    target = Config.BASE_URL if args.remote else f"local:{args.latency}"
+
+    if args.density:
+        try:
+            density = {mode: measure_density(mode, args.density) for mode in ("per_test", "context")}
+        finally:
+            if site is not None:
+                site.stop()
+        for mode, r in density.items():
+            print(f"[{mode}] {r}")
+        if density["per_test"].get("memory_mb") is None:
+            print("注意：没装 psutil，无法统计内存（pip install psutil）")
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"environment": _environment(target), "density": density}, f, ensure_ascii=False, indent=2)
+        print(f"结果: {args.output}")
+        return 0
+
+    if args.profiles:
+        names = [n.strip() for n in args.profiles.split(",") if n.strip()]
+        try:
+            profiles = {name: measure_profile(name, args.iterations) for name in names}
+        finally:
+            if site is not None:
+                site.stop()
+        base = profiles[names[0]]
+        for name in names:
+            for page, r in profiles[name].items():
+                saved_ms = base[page]["get_p50_ms"] - r["get_p50_ms"]
+                saved_bytes = base[page]["transfer_bytes"] - r["transfer_bytes"]
+                r["saved_ms"], r["saved_bytes"] = round(saved_ms, 1), saved_bytes
+                print(f"[{name}] {page}: get p50={r['get_p50_ms']:.1f}ms bytes={r['transfer_bytes']} "
+                      f"（比 {names[0]} 少 {saved_ms:.1f}ms / {saved_bytes} 字节）")
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"environment": _environment(target), "profiles": profiles}, f, ensure_ascii=False, indent=2)
+        print(f"结果: {args.output}")
+        return 0
+
+    results = {}
+    shared_driver = None
+    try:
+        if any(FLOWS[n][2] for n in names):
+            shared_driver = DriverSetup.get_driver()
+        for name in names:
+            print(f"[{name}] {args.iterations} 轮（预热 {args.warmup} 轮）...")
+            results[name] = run_flow(name, args.iterations, args.warmup, shared_driver)
+            r = results[name]
+            print(f"  p50={r['p50_ms']:.1f}ms p95={r['p95_ms']:.1f}ms max={r['max_ms']:.1f}ms commands={r['commands']}")
+    finally:
+        if shared_driver is not None:
+            DriverSetup.quit_quietly(shared_driver)
+        if site is not None:
+            site.stop()
+
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "environment": _environment(target),
+        "iterations": args.iterations,
+        "flows": results,
+    }
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"结果: {args.output}")
+
+    if args.update_baseline:
+        baseline = load_baseline(args.baseline) or {"flows": {}}
+        baseline.update({k: v for k, v in report.items() if k != "flows"})
+        baseline["flows"].update(results)
+        os.makedirs(os.path.dirname(args.baseline) or ".", exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, ensure_ascii=False, indent=2)
+        print(f"基线已更新: {args.baseline}")
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    if baseline is None:
+        if not args.allow_missing_baseline:
+            print(f"✗ 没有基线文件 {args.baseline}，未做回归比较：用 --update-baseline 生成后提交到仓库")
+            return EXIT_NO_BASELINE
+        print(f"注意：没有基线文件 {args.baseline}，跳过回归比较（用 --update-baseline 生成后提交到仓库）")
+        return 0
+    if baseline.get("environment", {}).get("target") != target:
+        print(f"注意：基线的运行目标是 {baseline.get('environment', {}).get('target')}，本次是 {target}，结果可能不可比")
+
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print("性能回归：")
+        for line in regressions:
+            print(f"  ✗ {line}")
+        return EXIT_REGRESSION
+    print("✓ 未发现性能回归")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
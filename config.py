@@ -1,13 +1,78 @@
 # 配置文件
+import os
+
+
 class Config:
     # 测试网站（使用演示网站）
     BASE_URL = "https://www.saucedemo.com/"
 
+    # 本地替身站点（utils/local_site）：离线、低延迟，适合内网构建机和框架性能基准
+    # 开启后测试会话开始时在空闲端口启动，并用它的地址覆盖 BASE_URL
+    USE_LOCAL_SITE = os.getenv("USE_LOCAL_SITE", "0") == "1"
+    LOCAL_SITE_LATENCY = os.getenv("LOCAL_SITE_LATENCY", "none")  # none / lan / broadband / wan / 3g
+
     # 浏览器配置
     BROWSER = "edge"  # chrome, firefox, edge
     HEADLESS = False
-    IMPLICIT_WAIT = 10
+
+    # 驱动配置档（DriverSetup.get_driver 按它设置页面加载策略 / 资源拦截 / 启动参数）
+    # - fidelity：与真实用户一致，等完整 load，不拦截任何资源（默认）
+    # - fast：DOMContentLoaded 即返回（eager），拦截图片 / 字体 / 第三方统计脚本（拦截仅 chrome / edge）
+    # - ci：在 fast 基础上强制无头，并加上适合容器的启动参数
+    DRIVER_PROFILE = os.getenv("DRIVER_PROFILE", "fidelity")
+    _BLOCK_ASSETS = ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+                     "*.woff", "*.woff2", "*.ttf", "*.otf"]
+    _BLOCK_THIRD_PARTY = ["*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+                          "*backtrace.io*", "*optimizely.com*", "*hotjar.com*"]
+    DRIVER_PROFILES = {
+        "fidelity": {"page_load_strategy": "normal", "block_urls": [], "headless": None, "args": []},
+        "fast": {
+            "page_load_strategy": "eager",
+            "block_urls": _BLOCK_ASSETS + _BLOCK_THIRD_PARTY,
+            "headless": None,  # None = 沿用 HEADLESS
+            "args": ["--disable-extensions", "--no-first-run", "--disable-background-networking"],
+        },
+        "ci": {
+            "page_load_strategy": "eager",
+            "block_urls": _BLOCK_ASSETS + _BLOCK_THIRD_PARTY,
+            "headless": True,
+            "args": ["--disable-extensions", "--no-first-run", "--disable-background-networking",
+                     "--disable-gpu", "--no-sandbox", "--disable-dev-shm-usage", "--mute-audio"],
+        },
+    }
+    # 隐式等待关闭：否则每次“元素不存在”的探测都要白等满 IMPLICIT_WAIT 秒
+    # 页面对象统一通过 utils.waits.Waiter 做显式等待
+    IMPLICIT_WAIT = 0
     EXPLICIT_WAIT = 20
+    WAIT_POLL_INTERVAL = 0.1  # 显式等待轮询间隔（秒）
+    ABSENCE_TIMEOUT = 0  # “元素不存在”探测的预算（秒），0 = 只查一次立即返回
+    SCRIPT_TIMEOUT = 30  # execute_async_script 超时（页面内 MutationObserver 等待依赖它）
+
+    # 表单输入方式（BasePage.fill_form）：
+    # - "script"：一次脚本写入多个输入框（原生 setter + input/change 事件），最快
+    # - "keys"：逐键 send_keys，与真实用户输入一致；单个用例可用 @pytest.mark.input_mode("keys") 覆盖
+    INPUT_MODE = os.getenv("INPUT_MODE", "script")
+
+    # 驱动复用模式：
+    # - "pool"：会话级浏览器池，用例之间只重置状态（cookies / storage / about:blank）
+    # - "per_test"：每个用例新起一个浏览器，用完即 quit（隔离性最强，最慢）
+    # - "spare"：同样每个用例一个全新浏览器，但后台提前启动好备用的，用例不再等启动
+    # - "context"：一个浏览器进程，每个用例一个独立的浏览器上下文（仅 chrome / edge，隔离 cookies / storage）
+    DRIVER_MODE = "pool"
+    DRIVER_POOL_SIZE = 1  # 单进程串行执行时 1 个就够
+    DRIVER_SPARES = 1  # spare 模式：保持几个已启动的备用浏览器
+    DRIVER_MAX_PARALLEL_LAUNCHES = 2  # spare 模式：最多同时启动几个浏览器
+    DRIVER_SPARE_MEMORY_MB = 400  # 每个浏览器预估内存；装了 psutil 时按可用内存收缩备用数量
+    DRIVER_MEMORY_RESERVE_MB = 1024  # 给系统和被测应用保留的内存
+
+    # 场景状态缓存（utils/scenario_cache.py）：登录 / 预置购物车每个会话只走一次 UI，
+    # 之后直接恢复 cookies + localStorage；TTL（秒）过期或校验失败会自动重建
+    SCENARIO_CACHE = os.getenv("SCENARIO_CACHE", "1") == "1"
+    SCENARIO_CACHE_TTL = 300
+
+    # 步骤级重试（utils/step_retry.py）：标记的步骤开始前保存检查点（URL、cookies、localStorage、表单值），
+    # 遇到瞬时错误（元素过期、超时、点击被遮挡）时还原检查点只重做该步骤，而不是重跑整个用例
+    STEP_RETRIES = int(os.getenv("STEP_RETRIES", "1"))  # 每个步骤最多重试几次，0 = 关闭（也不保存检查点）
 
     # 测试数据
     VALID_USERNAME = "standard_user"
@@ -15,10 +80,103 @@ class Config:
     INVALID_USERNAME = "invalid_user"
     INVALID_PASSWORD = "invalid_pass"
 
+    # 并行执行时的 worker 编号（由 run_tests.py --workers N 通过环境变量传入）
+    # 每个 worker 的截图/日志写到各自子目录，避免并发写同名文件
+    WORKER_ID = os.getenv("TEST_WORKER_ID", "")
+    _WORKER_SUBDIR = f"{WORKER_ID}/" if WORKER_ID else ""
+
     # 报告配置（注意：你项目里很多地方用字符串拼接，所以保留末尾 /）
-    SCREENSHOT_DIR = "reports/screenshots/"
+    SCREENSHOT_DIR = f"reports/screenshots/{_WORKER_SUBDIR}"
     REPORT_DIR = "reports/"
 
+    # 截图（utils/screenshot.py：调用线程只取原始数据，解码/去重/写盘在后台线程池完成）
+    # 策略：always = 显式截图 + 失败截图；step = 另外在每个 allure.step 结束时自动截图；on_failure = 只保留失败截图
+    SCREENSHOT_POLICY = os.getenv("SCREENSHOT_POLICY", "always")
+    SCREENSHOT_FORMAT = "png"  # png / jpeg / webp（非 png 和缩放需要 Pillow，没装时退回原始 PNG）
+    SCREENSHOT_QUALITY = 80  # jpeg / webp 质量
+    SCREENSHOT_MAX_WIDTH = 0  # 超过该宽度时按比例缩小，0 = 不缩放
+    SCREENSHOT_BUDGET_MB = 200  # 单次运行截图总大小上限（MB），超出后不再写盘，0 = 不限
+    SCREENSHOT_WORKERS = 2  # 后台写盘线程数
+
+    # 浏览器 / 驱动进程生命周期（utils/lifecycle.py）：登记每个启动的驱动及其浏览器进程树
+    # 用例超出时间预算时转储线程调用栈、截图并强制结束该浏览器；会话结束和下次启动时回收遗留进程
+    TEST_TIMEOUT = int(os.getenv("TEST_TIMEOUT", "300"))  # 单个用例（setup + call + teardown）的秒数上限，0 = 关闭
+    TEST_TIMEOUT_GRACE = 30  # 强制结束浏览器后仍未结束（卡在浏览器之外）再等几秒，然后中断本次运行
+    WATCHDOG_DIR = f"reports/watchdog/{_WORKER_SUBDIR}"
+    REAP_STALE_PROCESSES = True  # 启动时清理上次运行（崩溃 / 被杀）遗留的驱动和浏览器进程
+
+    # WebDriver 命令级性能分析：记录每条命令的耗时 / 定位器 / 页面对象方法 / allure.step
+    # 每个用例输出 reports/profiles/<用例>.json 并附到 Allure 报告（关闭时零开销）
+    PROFILE_COMMANDS = os.getenv("PROFILE_COMMANDS", "0") == "1"
+    PROFILE_TOP_N = 10  # 汇总里保留最慢的 N 条命令
+    PROFILE_DIR = f"reports/profiles/{_WORKER_SUBDIR}"
+
+    # 运行时间线（utils/tracer.py）：fixture / allure.step / 页面对象方法 / 等待 / WebDriver 命令
+    # 会话结束时写 reports/traces/trace.json（Chrome trace-event 格式，chrome://tracing 或 ui.perfetto.dev 打开）
+    # 与浏览器 DevTools 性能 trace 合并：python -m utils.tracer reports/traces/trace.json --devtools profile.json
+    TRACE = os.getenv("TRACE", "0") == "1"
+    TRACE_DIR = f"reports/traces/{_WORKER_SUBDIR}"
+    TRACE_TRACKS = "worker"  # worker = 每个进程/线程一条轨道；test = 每个用例一条轨道
+    TRACE_MAX_EVENTS = 1_000_000  # 内存里最多缓存的事件数，超出后丢弃并在 trace 里记录数量
+
+    # 被测站点前端性能采集：页面对象每次导航后读取 Navigation / Resource / Paint Timing（一次脚本）
+    # 会话结束时按页面汇总 p50 / p95，追加到趋势文件，并与最近几次运行的中位数比较标出回归
+    PAGE_TIMING = os.getenv("PAGE_TIMING", "0") == "1"
+    PAGE_TIMING_DIR = f"reports/page_timing/{_WORKER_SUBDIR}"
+    PAGE_TIMING_TREND_FILE = "reports/page_timing_trend.jsonl"
+    PAGE_TIMING_BASELINE_RUNS = 5  # 滚动基线取最近几次运行
+    PAGE_TIMING_THRESHOLD = 0.25  # p50 比基线慢超过 25% 判为回归
+
+    # 基准测试（benchmark.py）：热点流程重复运行，与仓库里的基线比较
+    BENCHMARK_ITERATIONS = 10
+    BENCHMARK_WARMUP = 1
+    BENCHMARK_BASELINE = "benchmarks/baseline.json"
+    BENCHMARK_THRESHOLD = 0.2  # p50 / p95 比基线慢超过 20% 判为回归
+    # 没有基线文件时算失败（退出码 3），CI 不会把“没有门禁”当成“没有回归”；
+    # 本地第一次生成基线前可设 BENCHMARK_REQUIRE_BASELINE=0（或 --allow-missing-baseline）只提示并跳过比较
+    BENCHMARK_REQUIRE_BASELINE = os.getenv("BENCHMARK_REQUIRE_BASELINE", "1") == "1"
+
+    # 负载模式（python -m utils.load）：N 个并发虚拟用户重复运行 main.demo_full_workflow，
+    # 按步骤统计吞吐、延迟分位数和错误率；默认对本地替身站点施压，--remote 才打真实站点
+    LOAD_USERS = 5
+    LOAD_RAMP_UP = 10  # 秒，全部虚拟用户在这段时间内均匀启动
+    LOAD_ITERATIONS = 1  # 每个虚拟用户循环执行几次
+    LOAD_THINK_TIME = "uniform:0.5,2"  # 步骤间思考时间：none / const:1 / uniform:0.5,2 / exp:1
+    LOAD_USER_MIX = "standard_user=3,performance_glitch_user=1"  # 账号=权重
+    LOAD_MAX_BROWSERS = 4  # 同时打开的浏览器上限，超过的虚拟用户排队
+    LOAD_REPORT_INTERVAL = 5  # 实时汇总输出间隔（秒）
+    LOAD_REPORT_DIR = "reports/load"
+
+    # WebDriver 命令磁带（utils/cassette.py）：标了 @pytest.mark.cassette 的用例可以录制真实运行的命令和响应，
+    # 之后不启动浏览器直接回放，几十毫秒跑完页面对象逻辑；命令序列变化时报 CassetteMismatch
+    # off = 不使用；replay = 只回放（没有磁带的用例跳过）；record = 重新录制；auto = 有磁带回放，没有就录制
+    CASSETTE_MODE = os.getenv("CASSETTE_MODE", "off")
+    CASSETTE_DIR = "tests/cassettes"
+
+    # 静态定位器检查（python -m utils.locator_check）：录制的各页面状态 HTML 快照，
+    # 不启动浏览器校验页面对象的定位器是否仍然唯一匹配；页面改版后用 --record 重新录制
+    LOCATOR_SNAPSHOT_DIR = "data/html_snapshots"
+
+    # 本地缓存目录（驱动路径解析结果等，可随时删除，删除后会重新探测）
+    CACHE_DIR = ".cache/"
+
+    # 用例运行历史（记录每个用例的耗时和最近几次结果，用于并行分片负载均衡和执行排序）
+    RUN_HISTORY_FILE = "reports/run_history.json"
+    # 执行顺序：file = 收集顺序；history = smoke 优先、最近失败/新增/改动过的优先、其余按历史耗时从短到长
+    TEST_ORDER = os.getenv("TEST_ORDER", "history")
+    ORDER_RECENT_RUNS = 3  # 最近几次运行里失败过即视为“最近失败”
+    # smoke 用例（@pytest.mark.smoke，例如有效登录）失败时立即中止，不再让后续用例逐个在 setup 里失败
+    SMOKE_FAIL_FAST = os.getenv("SMOKE_FAIL_FAST", "0") == "1"
+
     # ✅ 日志配置（新增）
-    LOG_DIR = "reports/logs/"
+    LOG_DIR = f"reports/logs/{_WORKER_SUBDIR}"
     LOG_LEVEL = "INFO"  # DEBUG / INFO / WARNING / ERROR
+    # 历史日志轮转：默认按大小；LOG_ROTATE_WHEN 设为 "midnight" / "H" 等则按时间
+    LOG_HISTORY_MAX_BYTES = 10 * 1024 * 1024
+    LOG_HISTORY_BACKUPS = 5
+    LOG_ROTATE_WHEN = ""
+    # 历史日志保留：超过天数的删除，每个 logger 最多保留最近 N 份
+    LOG_RETENTION_DAYS = 7
+    LOG_RETENTION_COUNT = 20
+    # 结构化日志：额外输出 reports/logs/log.jsonl（每行一条，带 test_id）
+    LOG_JSONL = os.getenv("LOG_JSONL", "0") == "1"
@@ -0,0 +1,424 @@
+import hashlib
+import inspect
+import json
+import os
+
+import allure
+import pytest
+
+from config import Config
+from utils.driver_cache import DriverCache
+from utils.cassette import CassetteRecorder, cassette_mode, cassette_path, replay_driver
+from utils.driver_setup import DriverSetup
+from utils.lifecycle import driver_lifecycle, watchdog
+from utils.logger import get_logger, set_test_id
+from utils.page_metrics import page_timing
+from utils.run_history import RunHistory, order_nodeids
+from utils.screenshot import close_screenshot_service, get_screenshot_service
+from utils.step_retry import step_retry_log
+from utils.step_tracker import step_tracker
+from utils.tracer import tracer
+
+# 本次会话每个用例的耗时（setup + call + teardown）
+_durations = {}
+# 本次会话每个用例的结果（任一阶段失败即 failed）和用例源码哈希，会话结束时写入运行历史
+_outcomes = {}
+_sources = {}
+# 被测站点前端性能的汇总结果（会话结束时生成，终端摘要里输出）
+_page_timing_result = {}
+# 驱动 / 浏览器进程回收统计（会话结束时生成，终端摘要里输出）
+_lifecycle_result = {}
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--node-list",
+        default=None,
+        help="只运行文件中列出的用例 nodeid（每行一个，按文件顺序执行；run_tests.py 并行分片使用）",
+    )
+    parser.addoption(
+        "--order",
+        choices=("file", "history"),
+        default=None,
+        help="执行顺序：file = 收集顺序；history = smoke 优先、最近失败/改动过的优先、其余按历史耗时从短到长"
+             "（默认取 Config.TEST_ORDER）",
+    )
+    parser.addoption(
+        "--smoke-fail-fast",
+        action="store_true",
+        default=None,
+        help="smoke 用例失败时立即中止本次运行（默认取 Config.SMOKE_FAIL_FAST）",
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "smoke: 冒烟用例（其余用例都依赖它，优先执行；开启 --smoke-fail-fast 时失败即中止）")
+    config.addinivalue_line("markers", "cassette: 可用录制的 WebDriver 命令磁带回放（Config.CASSETTE_MODE 不为 off 时生效）")
+    config.addinivalue_line("markers", 'input_mode(mode): 本用例的表单输入方式（"script" / "keys"），覆盖 Config.INPUT_MODE')
+    config.addinivalue_line("markers", "time_budget(seconds): 本用例的时间预算（秒），覆盖 Config.TEST_TIMEOUT")
+
+    # 把驱动配置档写进报告（pytest-html 的 Environment 表）
+    try:
+        from pytest_metadata.plugin import metadata_key
+    except ImportError:
+        return
+    profile = DriverSetup.profile()
+    config.stash[metadata_key]["Driver profile"] = (
+        f"{profile['name']} (page_load_strategy={profile['page_load_strategy']}, "
+        f"blocked_patterns={len(profile['block_urls'])})"
+    )
+
+
+def _source_hash(item):
+    try:
+        return hashlib.sha1(inspect.getsource(item.function).encode("utf-8")).hexdigest()[:12]
+    except (AttributeError, OSError, TypeError):
+        return None
+
+
+def pytest_collection_modifyitems(config, items):
+    path = config.getoption("--node-list")
+    if path:
+        with open(path, encoding="utf-8") as f:
+            wanted = [line.strip() for line in f if line.strip()]
+        order = {nodeid: i for i, nodeid in enumerate(wanted)}
+
+        selected = [item for item in items if item.nodeid in order]
+        deselected = [item for item in items if item.nodeid not in order]
+        selected.sort(key=lambda item: order[item.nodeid])
+
+        if deselected:
+            config.hook.pytest_deselected(items=deselected)
+        items[:] = selected
+
+    for item in items:
+        _sources[item.nodeid] = _source_hash(item)
+
+    if (config.getoption("--order") or getattr(Config, "TEST_ORDER", "file")) != "history":
+        return
+    by_id = {item.nodeid: item for item in items}
+    smoke = [item.nodeid for item in items if item.get_closest_marker("smoke")]
+    # 并行 worker 自己的历史文件每次运行前都是空的：排序读主历史文件
+    ordered = order_nodeids(list(by_id), RunHistory(RunHistory.main_path()), smoke=smoke, sources=_sources)
+    items[:] = [by_id[nodeid] for nodeid in ordered]
+
+
+def _time_budget(item):
+    marker = item.get_closest_marker("time_budget")
+    return marker.args[0] if marker else getattr(Config, "TEST_TIMEOUT", 0)
+
+
+def pytest_sessionstart(session):
+    if getattr(Config, "REAP_STALE_PROCESSES", True) and not session.config.option.collectonly:
+        driver_lifecycle.reap_stale()
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_protocol(item, nextitem):
+    """用例时间预算看门狗；Config.TRACE：每个用例（含 setup / teardown）在时间线上是一个区间"""
+    watchdog.start(item, _time_budget(item))
+    try:
+        if not tracer.enabled():
+            yield
+            return
+        tracer.begin_test(item.nodeid)
+        with tracer.span(item.nodeid, "test"):
+            yield
+        tracer.end_test()
+    finally:
+        watchdog.cancel()
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_call(item):
+    with tracer.span("call", "test"):
+        yield
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_fixture_setup(fixturedef, request):
+    if not tracer.enabled():
+        yield
+        return
+    with tracer.span(f"setup {fixturedef.argname}", "fixture", scope=fixturedef.scope):
+        yield
+    # 终结器后进先出：这里登记的会在 fixture 自身的 teardown 之前执行，标记 teardown 开始
+    key, name = id(fixturedef), f"teardown {fixturedef.argname}"
+    fixturedef.addfinalizer(lambda: tracer.fixture_teardown_started(key, name))
+
+
+def pytest_fixture_post_finalizer(fixturedef, request):
+    if tracer.enabled():
+        tracer.fixture_teardown_finished(id(fixturedef), f"teardown {fixturedef.argname}")
+
+
+def pytest_runtest_logreport(report):
+    _durations[report.nodeid] = _durations.get(report.nodeid, 0.0) + report.duration
+    if report.failed:
+        _outcomes[report.nodeid] = "failed"
+    elif report.skipped and _outcomes.get(report.nodeid) != "failed":
+        _outcomes[report.nodeid] = "skipped"
+    elif report.when == "call":
+        _outcomes.setdefault(report.nodeid, "passed")
+
+
+def pytest_sessionfinish(session):
+    # driver_provider 已在会话 fixture 收尾时关闭：此时仍在运行的驱动 / 浏览器进程都是泄漏的
+    _lifecycle_result.update(driver_lifecycle.reap_session())
+
+    if tracer.enabled():
+        path = tracer.flush()
+        if path:
+            get_logger("pytest").info("运行时间线已写入: %s", path)
+
+    # Allure 报告的 Environment 面板
+    allure_dir = getattr(session.config.option, "allure_report_dir", None)
+    if allure_dir and os.path.isdir(allure_dir):
+        profile = DriverSetup.profile()
+        with open(os.path.join(allure_dir, "environment.properties"), "w", encoding="utf-8") as f:
+            f.write(f"Browser={Config.BROWSER}\n")
+            f.write(f"Driver.Mode={Config.DRIVER_MODE}\n")
+            f.write(f"Driver.Profile={profile['name']}\n")
+            f.write(f"Driver.PageLoadStrategy={profile['page_load_strategy']}\n")
+
+    if not _durations:
+        return
+    history = RunHistory()
+    for nodeid, duration in _durations.items():
+        history.record(nodeid, duration, _outcomes.get(nodeid), _sources.get(nodeid))
+    history.save()
+
+
+def _smoke_fail_fast(config) -> bool:
+    option = config.getoption("--smoke-fail-fast")
+    return bool(getattr(Config, "SMOKE_FAIL_FAST", False) if option is None else option)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    """每个阶段生成报告后：
+
+    - 记录 item.rep_<阶段>（driver fixture 收尾时据此判断用例是否通过，例如磁带是否写盘）
+    - 看门狗超时：报告里加 watchdog 段，并附上线程调用栈
+    - 有步骤重试：写进用例的 user_properties（JUnit XML 等报告可见）
+    - smoke 用例失败且开启 fail-fast：中止本次运行
+    - 用例失败：通过截图服务自动截图（后台写盘），写好的文件再附到 Allure 报告
+    """
+    outcome = yield
+    report = outcome.get_result()
+    setattr(item, f"rep_{report.when}", report)
+    timeout = getattr(item, "_watchdog", None)
+    if timeout and report.failed:
+        report.sections.append(("watchdog", timeout["message"]))
+        if os.path.exists(timeout["stacks"]):
+            allure.attach.file(timeout["stacks"], name="watchdog-stacks", attachment_type=allure.attachment_type.TEXT)
+        item._watchdog = None
+    retries = step_retry_log.get(item.nodeid) if report.when == "call" else None
+    if retries:
+        # 步骤重试后通过的用例也要留痕：写进 JUnit XML 等报告的 properties
+        item.user_properties.append(("step_retries", json.dumps(retries, ensure_ascii=False)))
+    if report.failed and item.get_closest_marker("smoke") and _smoke_fail_fast(item.config):
+        # 其余用例都依赖 smoke 用例（例如登录）：继续跑只会在 setup 里逐个失败
+        item.session.shouldstop = f"smoke 用例失败，中止本次运行: {item.nodeid}"
+    if report.when != "call" or not report.failed:
+        return
+    drv = item.funcargs.get("driver")
+    if drv is None:
+        return
+    service = get_screenshot_service()
+    if not service.wants("failure"):
+        return
+    name = item.nodeid.split("::", 1)[-1].replace("::", "_")
+    try:
+        future = service.capture(drv, f"failure_{name}", kind="failure")
+    except Exception:
+        return
+    service.attach_to_allure(future, "failure")
+
+
+def pytest_terminal_summary(terminalreporter):
+    if not terminalreporter.config.option.collectonly:
+        profile = DriverSetup.profile()
+        terminalreporter.write_line(
+            f"driver profile: {profile['name']} (page_load_strategy={profile['page_load_strategy']})"
+        )
+    if _page_timing_result:
+        terminalreporter.write_line(f"page timing: {len(_page_timing_result['pages'])} 个页面 ({_page_timing_result['path']})")
+        for r in _page_timing_result["regressions"]:
+            terminalreporter.write_line(
+                f"  ⚠ 前端性能回归 {r['page']} {r['metric']}: p50={r['p50']:.1f}ms，"
+                f"基线 {r['baseline']:.1f}ms（最近 {r['runs']} 次运行中位数）",
+                yellow=True,
+            )
+
+    retried = step_retry_log.summary()
+    if retried:
+        terminalreporter.write_line(f"step retries: {sum(len(v) for v in retried.values())} 次（{len(retried)} 个用例）", yellow=True)
+        for nodeid, entries in retried.items():
+            for entry in entries:
+                terminalreporter.write_line(f"  ↻ {nodeid} [{entry['step']}] 第 {entry['attempt']} 次: {entry['error']}")
+
+    if _lifecycle_result.get("tracked") or _lifecycle_result.get("stale_processes"):
+        r = _lifecycle_result
+        terminalreporter.write_line(
+            f"process reaper: 跟踪 {r['tracked']} 个驱动，超时 {r['timeouts']} 个用例，"
+            f"强制结束 {r['killed_processes']} 个进程（约 {r['reclaimed_mb']:.0f} MB），"
+            f"启动时清理遗留 {r['stale_processes']} 个进程（约 {r['stale_mb']:.0f} MB）",
+            yellow=bool(r["killed_processes"] or r["stale_processes"]),
+        )
+
+    stats = DriverCache.stats()
+    if stats["hits"] or stats["misses"]:
+        terminalreporter.write_line(
+            f"driver cache: hits={stats['hits']} misses={stats['misses']} ({DriverCache.path()})"
+        )
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _init_log_session():
+    get_logger("pytest")
+    if tracer.enabled():
+        step_tracker.add_listener(tracer)
+
+
+@pytest.fixture(autouse=True)
+def _log_test_id(request):
+    """给本用例期间的日志打上 test_id（JSONL 日志按它区分用例）"""
+    set_test_id(request.node.nodeid)
+    yield
+    set_test_id("")
+
+
+@pytest.fixture(autouse=True)
+def _input_mode(request):
+    """@pytest.mark.input_mode("keys") 时本用例改用逐键输入"""
+    marker = request.node.get_closest_marker("input_mode")
+    if marker is None:
+        yield
+        return
+    original = Config.INPUT_MODE
+    Config.INPUT_MODE = marker.args[0]
+    yield
+    Config.INPUT_MODE = original
+
+
+@pytest.fixture(autouse=True)
+def _command_profile(request):
+    """Config.PROFILE_COMMANDS 开启时：汇总本用例的 WebDriver 命令耗时，写 JSON 并附到 Allure"""
+    if not getattr(Config, "PROFILE_COMMANDS", False):
+        yield
+        return
+
+    from utils.profiler import command_profiler
+
+    command_profiler.begin_test(request.node.nodeid)
+    yield
+    summary = command_profiler.end_test()
+    if summary["commands"]:
+        path = command_profiler.write(summary)
+        allure.attach.file(path, name="webdriver-profile", attachment_type=allure.attachment_type.JSON)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _page_timing_session():
+    """Config.PAGE_TIMING 开启时：会话结束汇总各页面的前端性能并与滚动基线比较"""
+    yield
+    result = page_timing.finish()
+    if result:
+        _page_timing_result.update(result)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _screenshot_session():
+    """会话结束时等待后台截图写完，并输出 manifest.json"""
+    yield
+    stats = close_screenshot_service()
+    if stats:
+        get_logger("pytest").info("截图统计: %s", stats)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def local_site():
+    """Config.USE_LOCAL_SITE 开启时启动本地替身站点，并把 BASE_URL 指向它"""
+    if not Config.USE_LOCAL_SITE:
+        yield None
+        return
+
+    from utils.local_site import LocalSite
+
+    site = LocalSite(latency=Config.LOCAL_SITE_LATENCY).start()
+    original_url = Config.BASE_URL
+    Config.BASE_URL = site.url
+    yield site
+    Config.BASE_URL = original_url
+    site.stop()
+
+
+@pytest.fixture(scope="session")
+def driver_provider():
+    """会话级 driver 提供者（由 Config.DRIVER_MODE 决定：pool / per_test / spare / context）"""
+    provider = DriverSetup.create_provider()
+    yield provider
+    provider.close()
+
+
+@pytest.fixture
+def driver(request):
+    """为当前用例租用一个浏览器，用例结束后归还（池模式下会重置状态）
+
+    标了 @pytest.mark.cassette 的用例在 Config.CASSETTE_MODE 下改为：
+    - replay / auto（磁带已存在）：用录制的命令磁带回放，不启动浏览器
+    - record / auto（磁带不存在）：照常用真实浏览器，同时录制命令磁带（用例通过才写盘）
+    """
+    mode = cassette_mode() if request.node.get_closest_marker("cassette") else "off"
+    if mode != "off":
+        path = cassette_path(request.node.nodeid)
+        exists = os.path.exists(path)
+        if mode == "replay" and not exists:
+            pytest.skip(f"没有录制的磁带: {path}（用 CASSETTE_MODE=record 录制）")
+        # 磁带里的命令序列要自成一体：不走场景缓存（否则取决于前面的用例是否已构建过场景）
+        original_cache = Config.SCENARIO_CACHE
+        Config.SCENARIO_CACHE = False
+        try:
+            if mode in ("replay", "auto") and exists:
+                yield from _replay_driver(request, path)
+            else:
+                yield from _provided_driver(request, path)
+        finally:
+            Config.SCENARIO_CACHE = original_cache
+        return
+
+    yield from _provided_driver(request)
+
+
+def _replay_driver(request, path):
+    drv = replay_driver(path)
+    yield drv
+    report = getattr(request.node, "rep_call", None)
+    if report is not None and report.passed:
+        drv._replay_connection.assert_finished()
+
+
+def _provided_driver(request, cassette=None):
+    driver_provider = request.getfixturevalue("driver_provider")
+    drv = driver_provider.acquire()
+    recorder = None
+    service = get_screenshot_service()
+    try:
+        recorder = CassetteRecorder(drv).start() if cassette else None
+        if service.wants("step"):
+            # step 策略：每个 allure.step 结束时对当前浏览器截图
+            service.bind(drv)
+            step_tracker.add_listener(service)
+        yield drv
+    finally:
+        # 收尾步骤出错也要归还浏览器，否则驱动和浏览器进程会一直留在后台
+        try:
+            service.unbind()
+            if recorder is not None:
+                recorder.stop()
+                report = getattr(request.node, "rep_call", None)
+                if report is not None and report.passed:
+                    recorder.write(cassette)
+        finally:
+            driver_provider.release(drv)
@@ -1,87 +1,147 @@
 import os
+import sys
 import time
+from contextlib import contextmanager
 
 from config import Config
 from utils.driver_setup import DriverSetup
 from utils.logger import get_logger
+from utils.screenshot import close_screenshot_service, take_screenshot
 
 from pages.login_page import LoginPage
 from pages.home_page import HomePage
 
 
-def demo_full_workflow():
-    """演示完整的用户工作流程"""
-    logger = get_logger("demo")
+class StepFailed(Exception):
+    """工作流里某一步的结果不符合预期（例如登录失败），后续步骤无法继续"""
+
+
+class _Step:
+    def __init__(self, name, logger, failures):
+        self.name = name
+        self.logger = logger
+        self.failures = failures
+
+    def fail(self, message: str) -> None:
+        """记录本步骤失败但继续执行：写错误日志，流程走完后 demo_full_workflow 返回 False"""
+        self.logger.error("✗ 步骤 %s 失败: %s", self.name, message)
+        self.failures.append(self.name)
+
+
+@contextmanager
+def _untimed_step(name, logger, failures):
+    yield _Step(name, logger, failures)
+
+
+def _sleep_one_second():
+    time.sleep(1)
+
+
+def demo_full_workflow(driver=None, username=None, password=None, think=None, step=None, logger=None):
+    """演示完整的用户工作流程：登录 → 浏览 → 加购 → 购物车 → 返回 → 登出
+
+    直接运行时各参数都用默认值（自己启动/关闭浏览器，步骤间固定停顿 1 秒）。
+    负载模式（utils/load.py）复用同一流程：
+    - driver：传入已租用的浏览器，结束时不关闭
+    - username / password：虚拟用户的账号（默认 Config.VALID_USERNAME）
+    - think()：步骤间的思考时间，替代固定的 time.sleep(1)
+    - step(name)：包住每个步骤的上下文管理器（计时 / 记录错误），产出的对象可调用 fail(message)
+    返回 True 表示流程走完且没有步骤失败（默认的 step 下调用过 fail() 也返回 False）。
+    """
+    logger = logger or get_logger("demo")
+    username = username or Config.VALID_USERNAME
+    password = password or Config.VALID_PASSWORD
+    think = think or _sleep_one_second
+    failures = []
+    step = step or (lambda name: _untimed_step(name, logger, failures))
+    owns_driver = driver is None
 
     # 确保截图目录存在（你项目里直接拼字符串写文件名）
     os.makedirs(Config.SCREENSHOT_DIR, exist_ok=True)
 
     logger.info("=== 开始演示电商网站自动化测试 ===")
 
-    driver = DriverSetup.get_driver()
+    if owns_driver:
+        driver = DriverSetup.get_driver()
 
     try:
         # 1. 登录
         logger.info("1. 登录网站...")
-        login_page = LoginPage(driver)
-        login_page.open().login(Config.VALID_USERNAME, Config.VALID_PASSWORD)
+        with step("login"):
+            login_page = LoginPage(driver)
+            login_page.open().login(username, password)
 
-        if login_page.is_login_successful():
-            logger.info("✓ 登录成功")
-        else:
-            logger.error("✗ 登录失败")
-            driver.save_screenshot(f"{Config.SCREENSHOT_DIR}demo_login_failed.png")
-            return
+            if login_page.is_login_successful():
+                logger.info("✓ 登录成功")
+            else:
+                logger.error("✗ 登录失败")
+                take_screenshot(driver, "demo_login_failed", kind="failure")
+                raise StepFailed(f"登录失败: {username}")
 
-        time.sleep(1)
+        think()
 
         # 2. 浏览首页
         logger.info("2. 浏览商品...")
-        home_page = HomePage(driver)
-        product_count = home_page.get_product_count()
-        logger.info("✓ 找到 %s 个商品", product_count)
+        with step("browse"):
+            home_page = HomePage(driver)
+            product_count = home_page.get_product_count()
+            logger.info("✓ 找到 %s 个商品", product_count)
 
         # 3. 添加商品到购物车
         logger.info("3. 添加商品到购物车...")
-        if home_page.add_first_product_to_cart():
-            cart_count = home_page.get_cart_count()
-            logger.info("✓ 已添加商品到购物车，购物车数量: %s", cart_count)
-        else:
-            logger.error("✗ 添加商品失败")
-            driver.save_screenshot(f"{Config.SCREENSHOT_DIR}demo_add_to_cart_failed.png")
+        with step("add_to_cart") as current:
+            if home_page.add_first_product_to_cart():
+                cart_count = home_page.get_cart_count()
+                logger.info("✓ 已添加商品到购物车，购物车数量: %s", cart_count)
+            else:
+                logger.error("✗ 添加商品失败")
+                take_screenshot(driver, "demo_add_to_cart_failed", kind="failure")
+                current.fail("添加商品失败")
 
-        time.sleep(1)
+        think()
 
         # 4. 查看购物车
         logger.info("4. 查看购物车...")
-        cart_page = home_page.go_to_cart()
-        cart_items = cart_page.get_cart_items_count()
-        logger.info("✓ 购物车中有 %s 个商品", cart_items)
+        with step("view_cart"):
+            cart_page = home_page.go_to_cart()
+            cart_items = cart_page.get_cart_items_count()
+            logger.info("✓ 购物车中有 %s 个商品", cart_items)
 
-        time.sleep(1)
+        think()
 
         # 5. 返回首页
         logger.info("5. 返回首页...")
-        driver.back()
-        time.sleep(1)
+        with step("back"):
+            driver.back()
+        think()
 
         # 6. 登出
         logger.info("6. 登出...")
-        home_page.logout()
+        with step("logout"):
+            home_page.logout()
         logger.info("✓ 登出成功")
 
+        if failures:
+            logger.error("=== 演示完成，失败的步骤: %s ===", ", ".join(failures))
+            return False
         logger.info("=== 演示完成 ===")
+        return True
 
+    except StepFailed:
+        return False
     except Exception:
         logger.exception("✗ 执行过程中出错（已记录堆栈）")
         try:
-            driver.save_screenshot(f"{Config.SCREENSHOT_DIR}demo_exception.png")
+            take_screenshot(driver, "demo_exception", kind="failure")
         except Exception:
             pass
+        return False
     finally:
-        driver.quit()
-        logger.info("浏览器已关闭")
+        if owns_driver:
+            DriverSetup.quit_quietly(driver)
+            close_screenshot_service()  # 等后台写完截图
+            logger.info("浏览器已关闭")
 
 
 if __name__ == "__main__":
-    demo_full_workflow()
+    sys.exit(0 if demo_full_workflow() else 1)
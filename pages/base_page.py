@@ -0,0 +1,139 @@
+from selenium.webdriver.support.ui import WebDriverWait
+
+from config import Config
+from utils.locators import to_css
+from utils.page_metrics import page_timing
+from utils.tracer import tracer
+from utils.waits import Waiter
+
+# 一次 execute_script 读取多个元素的文本 / 属性 / 是否存在
+_SNAPSHOT_JS = """
+var spec = arguments[0], out = {};
+function textOf(el) { return ((el.innerText !== undefined ? el.innerText : el.textContent) || "").trim(); }
+for (var i = 0; i < spec.length; i++) {
+    var item = spec[i], kind = item.kind;
+    if (kind === "url") { out[item.name] = location.href; continue; }
+    var els = document.querySelectorAll(item.css), first = els.length ? els[0] : null;
+    if (kind === "present") { out[item.name] = els.length > 0; }
+    else if (kind === "count") { out[item.name] = els.length; }
+    else if (kind === "text") { out[item.name] = first ? textOf(first) : null; }
+    else if (kind === "texts") { out[item.name] = Array.prototype.map.call(els, textOf); }
+    else if (kind === "value") { out[item.name] = first ? first.value : null; }
+    else if (kind.indexOf("attr:") === 0) { out[item.name] = first ? first.getAttribute(kind.slice(5)) : null; }
+}
+return out;
+"""
+
+SNAPSHOT_KINDS = ("text", "texts", "present", "count", "value", "url")
+
+# 一次 execute_script 填写多个输入框
+# React 等框架接管了 input 的 value：直接赋值不会更新组件状态，
+# 所以用原型上的原生 setter 写值，再派发 input / change 事件，最后读回实际值供校验
+_FILL_JS = """
+var fields = arguments[0], out = {values: {}, missing: []};
+for (var i = 0; i < fields.length; i++) {
+    var f = fields[i], el = document.querySelector(f.css);
+    if (!el) { out.missing.push(f.name); continue; }
+    var proto = el instanceof HTMLTextAreaElement ? HTMLTextAreaElement.prototype
+        : el instanceof HTMLSelectElement ? HTMLSelectElement.prototype : HTMLInputElement.prototype;
+    var setter = Object.getOwnPropertyDescriptor(proto, "value").set;
+    el.focus();
+    setter.call(el, f.value);
+    el.dispatchEvent(new Event("input", {bubbles: true}));
+    el.dispatchEvent(new Event("change", {bubbles: true}));
+    out.values[f.name] = el.value;
+}
+if (document.activeElement && document.activeElement.blur) { document.activeElement.blur(); }
+return out;
+"""
+
+INPUT_MODES = ("script", "keys")
+
+
+class BasePage:
+    """页面对象基类：统一持有 driver 和等待引擎"""
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if tracer.enabled():
+            # Config.TRACE 开启时：每个页面对象方法在时间线上是一个区间
+            tracer.trace_class(cls)
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.wait = WebDriverWait(driver, Config.EXPLICIT_WAIT, poll_frequency=Config.WAIT_POLL_INTERVAL)
+        self.waiter = Waiter(driver)
+
+    def _record_timing(self, started=None):
+        """导航/路由切换完成后采集被测站点的前端性能（Config.PAGE_TIMING 关闭时什么都不做）"""
+        if page_timing.enabled():
+            page_timing.capture(self.driver, started)
+
+    def fill_form(self, fields: dict, mode=None):
+        """填写多个输入框
+
+        fields: {定位器: 值}，按顺序填写；值为 "" 表示清空
+        mode（默认取 Config.INPUT_MODE，可用 @pytest.mark.input_mode("keys") 按用例覆盖）：
+        - "script"：一次 execute_script 写入全部字段并派发 input / change 事件，随后校验实际值；
+          个别字段写入后不一致（例如有输入掩码）时，只对这些字段退回逐键输入
+        - "keys"：逐个字段 clear + send_keys，与真实键盘输入一致（保真模式）
+        """
+        mode = (mode or getattr(Config, "INPUT_MODE", "script")).lower()
+        if mode not in INPUT_MODES:
+            raise ValueError(f"不支持的输入模式: {mode}（可选: {', '.join(INPUT_MODES)}）")
+        if mode == "keys":
+            self._fill_with_keys(fields)
+            return self
+
+        items = [{"name": str(i), "css": to_css(locator), "value": "" if value is None else str(value)}
+                 for i, (locator, value) in enumerate(fields.items())]
+        result = self.driver.execute_script(_FILL_JS, items)
+        if result["missing"]:
+            # 表单还没渲染出来：等第一个缺失的字段出现后整体重试一次
+            locators = list(fields)
+            self.waiter.present(locators[int(result["missing"][0])])
+            result = self.driver.execute_script(_FILL_JS, items)
+
+        mismatched = {}
+        for i, (locator, value) in enumerate(fields.items()):
+            if result["values"].get(str(i)) != items[i]["value"]:
+                mismatched[locator] = value
+        if mismatched:
+            self._fill_with_keys(mismatched)
+        return self
+
+    def _fill_with_keys(self, fields: dict):
+        for locator, value in fields.items():
+            element = self.waiter.present(locator)
+            element.clear()
+            if value:
+                element.send_keys(value)
+
+    def snapshot(self, spec: dict) -> dict:
+        """一次 WebDriver 往返读取多个值
+
+        spec: {名称: 定位器} 或 {名称: (定位器, 读取方式)}
+        读取方式：
+        - "text"（默认）：第一个匹配元素的文本，不存在为 None
+        - "texts"：所有匹配元素的文本列表
+        - "present" / "count"：是否存在 / 匹配数量
+        - "value"：第一个匹配元素（输入框）的 value
+        - "attr:<属性名>"：第一个匹配元素的属性
+        - "url"：当前 URL（定位器写 None）
+
+        例如：self.snapshot({"total": self.TOTAL_AMOUNT, "has_error": (self.ERROR_MESSAGE, "present")})
+        """
+        items = []
+        for name, entry in spec.items():
+            if isinstance(entry, tuple) and len(entry) == 2 and (entry[0] is None or isinstance(entry[0], tuple)):
+                locator, kind = entry
+            else:
+                locator, kind = entry, "text"
+            if kind not in SNAPSHOT_KINDS and not kind.startswith("attr:"):
+                raise ValueError(f"不支持的读取方式: {kind}")
+            items.append({"name": name, "kind": kind, "css": to_css(locator) if locator else ""})
+        return self.driver.execute_script(_SNAPSHOT_JS, items)
+
+
+if tracer.enabled():
+    tracer.trace_class(BasePage)
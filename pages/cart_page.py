@@ -1,15 +1,11 @@
+import time
+
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from config import Config
+from pages.base_page import BasePage
 
-class CartPage:
+class CartPage(BasePage):
     """购物车页面"""
     
-    def __init__(self, driver):
-        self.driver = driver
-        self.wait = WebDriverWait(driver, Config.EXPLICIT_WAIT)
-    
     # 元素定位器
     CART_ITEMS = (By.CLASS_NAME, "cart_item")
     CHECKOUT_BUTTON = (By.ID, "checkout")
@@ -19,5 +15,8 @@ class CartPage:
         return len(self.driver.find_elements(*self.CART_ITEMS))
     
     def click_checkout(self):
-        """点击结算按钮"""
-        self.wait.until(EC.element_to_be_clickable(self.CHECKOUT_BUTTON)).click()
\ No newline at end of file
+        """点击结算按钮（等到进入结算第一步为止）"""
+        started = time.perf_counter()
+        self.waiter.clickable(self.CHECKOUT_BUTTON).click()
+        self.waiter.url_contains("checkout-step-one")
+        self._record_timing(started)
\ No newline at end of file
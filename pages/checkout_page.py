@@ -1,15 +1,13 @@
+import time
+
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from config import Config
+from pages.base_page import BasePage
 
-class CheckoutPage:
+class CheckoutPage(BasePage):
     """结算页面对象模型"""
     
-    def __init__(self, driver):
-        self.driver = driver
-        self.wait = WebDriverWait(driver, Config.EXPLICIT_WAIT)
-    
     # 元素定位器 - 结算第一步（填写信息页面）
     FIRST_NAME_INPUT = (By.ID, "first-name")
     LAST_NAME_INPUT = (By.ID, "last-name")
@@ -24,73 +22,91 @@ class CheckoutPage:
     TOTAL_AMOUNT = (By.CLASS_NAME, "summary_total_label")
     FINISH_BUTTON = (By.ID, "finish")
     CANCEL_BUTTON_STEP2 = (By.ID, "cancel")
+    SUMMARY_INFO_LABELS = (By.CLASS_NAME, "summary_info_label")
+    SUMMARY_VALUE_LABELS = (By.CLASS_NAME, "summary_value_label")
     
     # 元素定位器 - 结算完成页面
     SUCCESS_MESSAGE = (By.CLASS_NAME, "complete-header")
     COMPLETE_TEXT = (By.CLASS_NAME, "complete-text")
     BACK_HOME_BUTTON = (By.ID, "back-to-products")
     
+    def open_step_one(self):
+        """直接打开结算第一步（需已登录且购物车非空），同一会话里连续提交多组信息时用来回到表单"""
+        self.driver.get(Config.BASE_URL + "checkout-step-one.html")
+        self.waiter.present(self.FIRST_NAME_INPUT)
+        self._record_timing()
+        return self
+
     def enter_checkout_info(self, first_name, last_name, postal_code):
         """填写结算信息（第一步）"""
-        self.wait.until(EC.presence_of_element_located(self.FIRST_NAME_INPUT))
-
         # 重要：无论是否传空字符串，都需要先清空输入框。
         # 否则在参数化/多步骤用例中，上一轮输入会残留导致断言不稳定。
-        first_name_input = self.driver.find_element(*self.FIRST_NAME_INPUT)
-        last_name_input = self.driver.find_element(*self.LAST_NAME_INPUT)
-        postal_code_input = self.driver.find_element(*self.POSTAL_CODE_INPUT)
-
-        first_name_input.clear()
-        last_name_input.clear()
-        postal_code_input.clear()
-
-        if first_name:
-            first_name_input.send_keys(first_name)
-        if last_name:
-            last_name_input.send_keys(last_name)
-        if postal_code:
-            postal_code_input.send_keys(postal_code)
-        
+        self.fill_form({
+            self.FIRST_NAME_INPUT: first_name,
+            self.LAST_NAME_INPUT: last_name,
+            self.POSTAL_CODE_INPUT: postal_code,
+        })
         return self
     
     def click_continue(self):
-        """点击继续按钮（前往第二步）"""
+        """点击继续按钮（前往第二步）
+
+        等到进入第二步或出现表单校验错误为止，调用方可以直接断言 current_url。
+        """
+        started = time.perf_counter()
         self.driver.find_element(*self.CONTINUE_BUTTON).click()
+        try:
+            found = self.waiter.any_of(present=[self.ERROR_MESSAGE], url_contains=["checkout-step-two.html"])
+        except TimeoutException:
+            return self
+        if found == "checkout-step-two.html":
+            self._record_timing(started)
         return self
     
     def click_cancel(self):
-        """点击取消按钮"""
+        """点击取消按钮（等到页面跳走为止）"""
+        # 第一步、第二步的取消按钮定位器相同：等它可点击（SPA 跳转后可能还没渲染）
         try:
-            # 尝试点击第一步的取消按钮
-            self.driver.find_element(*self.CANCEL_BUTTON).click()
-        except:
-            # 如果在第二步，点击第二步的取消按钮
-            try:
-                self.driver.find_element(*self.CANCEL_BUTTON_STEP2).click()
-            except:
-                print("未找到取消按钮")
+            button = self.waiter.clickable(self.CANCEL_BUTTON)
+        except TimeoutException:
+            print("未找到取消按钮")
+            return self
+
+        current_url = self.driver.current_url
+        started = time.perf_counter()
+        button.click()
+        self.waiter.url_changes(current_url)
+        self._record_timing(started)
         return self
     
     def click_finish(self):
         """点击完成按钮（完成订单）"""
+        started = time.perf_counter()
         self.driver.find_element(*self.FINISH_BUTTON).click()
+        self.waiter.url_contains("checkout-complete.html")
+        self._record_timing(started)
         return self
     
     def get_error_message(self):
         """获取错误信息"""
-        try:
-            return self.driver.find_element(*self.ERROR_MESSAGE).text
-        except:
-            return None
+        error = self.waiter.find_or_none(self.ERROR_MESSAGE)
+        return error.text if error is not None else None
     
     def get_order_summary(self):
-        """获取订单摘要信息"""
+        """获取订单摘要信息（一次 WebDriver 往返读取全部字段）"""
         try:
             # SauceDemo 的 checkout-step-two 页面结构：
             # - .summary_info_label: Payment Information:, Shipping Information:, Price Total:
             # - .summary_value_label: 对应 value（前两个 label 有 value）
-            labels = [el.text.strip() for el in self.driver.find_elements(By.CLASS_NAME, "summary_info_label")]
-            values = [el.text.strip() for el in self.driver.find_elements(By.CLASS_NAME, "summary_value_label")]
+            data = self.snapshot({
+                "labels": (self.SUMMARY_INFO_LABELS, "texts"),
+                "values": (self.SUMMARY_VALUE_LABELS, "texts"),
+                "item_total": self.ITEM_TOTAL,
+                "tax": self.TAX_AMOUNT,
+                "total": self.TOTAL_AMOUNT,
+            })
+            labels = data["labels"]
+            values = data["values"]
 
             # 前两个 label（支付/配送）通常各对应一个 value
             payment_label = labels[0] if len(labels) > 0 else "Payment Information"
@@ -100,9 +116,9 @@ class CheckoutPage:
             payment_value = values[0] if len(values) > 0 else ""
             shipping_value = values[1] if len(values) > 1 else ""
 
-            item_total = self.get_item_total()
-            tax_amount = self.get_tax_amount()
-            total_amount = self.get_total_amount()
+            item_total = self._parse_amount(data["item_total"])
+            tax_amount = self._parse_amount(data["tax"])
+            total_amount = self._parse_amount(data["total"])
 
             # 注意：测试用例里断言包含 "Payment Information" / "Shipping Information" / "Price Total"
             # 所以这里保留页面原始英文 label，方便做稳定断言。
@@ -119,47 +135,45 @@ class CheckoutPage:
 
         except Exception as e:
             return f"获取订单摘要失败: {e}"
-    
-    def get_item_total(self):
-        """获取商品小计金额"""
+
+    @staticmethod
+    def _parse_amount(text):
+        """从 "Item total: $29.99" 中提取数字，取不到返回 0.0"""
         try:
-            text = self.driver.find_element(*self.ITEM_TOTAL).text
-            # 从 "Item total: $29.99" 中提取数字
-            amount_text = text.split('$')[-1]
-            return float(amount_text)
-        except:
+            return float(text.split('$')[-1])
+        except (AttributeError, ValueError):
             return 0.0
+
+    def get_price_breakdown(self):
+        """一次往返获取价格三项：{"item_total": .., "tax": .., "total": ..}"""
+        data = self.snapshot({"item_total": self.ITEM_TOTAL, "tax": self.TAX_AMOUNT, "total": self.TOTAL_AMOUNT})
+        return {name: self._parse_amount(text) for name, text in data.items()}
+
+    def get_item_total(self):
+        """获取商品小计金额"""
+        return self._parse_amount(self.snapshot({"text": self.ITEM_TOTAL})["text"])
     
     def get_tax_amount(self):
         """获取税费金额"""
-        try:
-            text = self.driver.find_element(*self.TAX_AMOUNT).text
-            amount_text = text.split('$')[-1]
-            return float(amount_text)
-        except:
-            return 0.0
+        return self._parse_amount(self.snapshot({"text": self.TAX_AMOUNT})["text"])
     
     def get_total_amount(self):
         """获取总金额"""
-        try:
-            text = self.driver.find_element(*self.TOTAL_AMOUNT).text
-            amount_text = text.split('$')[-1]
-            return float(amount_text)
-        except:
-            return 0.0
+        return self._parse_amount(self.snapshot({"text": self.TOTAL_AMOUNT})["text"])
     
     def get_success_message(self):
         """获取订单成功信息"""
+        # click_finish 只等到 URL 变化，标题可能还没渲染：等它可见再读
         try:
-            return self.driver.find_element(*self.SUCCESS_MESSAGE).text
-        except:
+            return self.waiter.visible(self.SUCCESS_MESSAGE).text
+        except TimeoutException:
             return ""
     
     def get_complete_text(self):
         """获取完成页面的详细说明"""
         try:
-            return self.driver.find_element(*self.COMPLETE_TEXT).text
-        except:
+            return self.waiter.visible(self.COMPLETE_TEXT).text
+        except TimeoutException:
             return ""
     
     def is_order_complete(self):
@@ -172,32 +186,43 @@ class CheckoutPage:
     def back_to_home(self):
         """返回首页"""
         try:
-            self.driver.find_element(*self.BACK_HOME_BUTTON).click()
-        except:
+            self.waiter.clickable(self.BACK_HOME_BUTTON).click()
+        except TimeoutException:
             # 如果按钮不存在，直接导航到首页
             self.driver.get(Config.BASE_URL + "inventory.html")
         return self
     
+    def get_page_state(self):
+        """一次往返读取结算流程的页面状态：当前 URL + 各步骤的标志元素是否存在"""
+        return self.snapshot({
+            "url": (None, "url"),
+            "step_one_form": (self.FIRST_NAME_INPUT, "present"),
+            "step_two_summary": (self.ITEM_TOTAL, "present"),
+            "error": self.ERROR_MESSAGE,
+        })
+
     def is_on_checkout_step_one(self):
-        """检查是否在结算第一步"""
+        """检查是否在结算第一步（URL 正确且表单已渲染）"""
         try:
-            return "checkout-step-one.html" in self.driver.current_url
+            state = self.get_page_state()
+            return "checkout-step-one.html" in state["url"] and state["step_one_form"]
         except:
             return False
     
     def is_on_checkout_step_two(self):
-        """检查是否在结算第二步"""
+        """检查是否在结算第二步（URL 正确且订单摘要已渲染）"""
         try:
-            return "checkout-step-two.html" in self.driver.current_url
+            state = self.get_page_state()
+            return "checkout-step-two.html" in state["url"] and state["step_two_summary"]
         except:
             return False
     
     def wait_for_checkout_step_two(self):
         """等待进入结算第二步"""
-        self.wait.until(EC.url_contains("checkout-step-two"))
+        self.waiter.url_contains("checkout-step-two")
         return self
     
     def wait_for_order_complete(self):
         """等待订单完成"""
-        self.wait.until(EC.url_contains("checkout-complete"))
+        self.waiter.url_contains("checkout-complete")
         return self
\ No newline at end of file
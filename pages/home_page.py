@@ -1,15 +1,75 @@
+import time
+
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from config import Config
+from pages.base_page import BasePage
+from utils.scenario_cache import scenario_cache
+
+# 一次 execute_script 读取整个商品目录（以及购物车角标）
+# arguments[0]：可选的批量操作 {"action": "add" / "remove", "names": [...], "indexes": [...]}，
+# 先在页面内逐个点击对应按钮，再读取目录返回，省掉额外的往返
+# arguments[1]：缓存目录时的版本号。读取目录时给商品列表容器挂一个 MutationObserver，
+# 列表内有任何改动（加购/移除、排序、别的页面对象操作）就递增计数；导航、刷新、后退后容器是新元素，没有版本号。
+# 没有批量操作且版本号未变时只返回 {unchanged: true}，否则重新读取并返回新的版本号
+_CATALOG_JS = """
+var op = arguments[0], known = arguments[1];
+function list() { return document.querySelector(".inventory_list"); }
+function generation(el) { return el && el.__catalogToken ? el.__catalogToken + ":" + el.__catalogGen : null; }
+if (!op && known && generation(list()) === known) { return {unchanged: true}; }
+
+function items() { return document.querySelectorAll(".inventory_item"); }
+function text(root, css) { var el = root.querySelector(css); return el ? (el.textContent || "").trim() : ""; }
+function button(item) { return item.querySelector(".btn_inventory"); }
+function inCart(btn) { return !!btn && (btn.id.indexOf("remove") === 0 || /remove/i.test(btn.textContent || "")); }
+
+var missing = [], clicked = 0;
+if (op) {
+    var targets = [];
+    (op.names || []).forEach(function (name) {
+        var found = -1, list = items();
+        for (var i = 0; i < list.length; i++) { if (text(list[i], ".inventory_item_name") === name) { found = i; break; } }
+        if (found < 0) { missing.push(name); } else { targets.push(found); }
+    });
+    (op.indexes || []).forEach(function (index) {
+        if (index >= 0 && index < items().length) { targets.push(index); } else { missing.push(index); }
+    });
+    targets.forEach(function (index) {
+        // 点击后按钮会被替换，每次都重新查找
+        var btn = button(items()[index]);
+        if (btn && inCart(btn) === (op.action === "remove")) { btn.click(); clicked++; }
+    });
+}
 
-class HomePage:
+var catalog = Array.prototype.map.call(items(), function (item, index) {
+    var btn = button(item);
+    return {
+        index: index,
+        name: text(item, ".inventory_item_name"),
+        price: parseFloat(text(item, ".inventory_item_price").replace(/[^0-9.]/g, "")) || 0,
+        description: text(item, ".inventory_item_desc"),
+        button_id: btn ? btn.id : "",
+        in_cart: inCart(btn)
+    };
+});
+var container = list();
+if (container && !container.__catalogToken) {
+    container.__catalogToken = Date.now().toString(36) + Math.random().toString(36).slice(2);
+    container.__catalogGen = 0;
+    container.__catalogObserver = new MutationObserver(function () { container.__catalogGen++; });
+    container.__catalogObserver.observe(container, {childList: true, subtree: true, attributes: true, characterData: true});
+} else if (container) {
+    // 本次脚本自己的点击已经反映在读到的目录里，丢掉这些尚未回调的改动记录
+    container.__catalogObserver.takeRecords();
+}
+var badge = document.querySelector(".shopping_cart_badge");
+return {catalog: catalog, generation: generation(container),
+        cart_count: badge ? parseInt(badge.textContent, 10) || 0 : 0, missing: missing, clicked: clicked};
+"""
+
+
+class HomePage(BasePage):
     """首页/商品列表页面"""
     
-    def __init__(self, driver):
-        self.driver = driver
-        self.wait = WebDriverWait(driver, Config.EXPLICIT_WAIT)
-    
     # 元素定位器
     PRODUCTS_TITLE = (By.CLASS_NAME, "title")
     PRODUCT_ITEMS = (By.CLASS_NAME, "inventory_item")
@@ -18,7 +78,12 @@ class HomePage:
     CART_LINK = (By.CLASS_NAME, "shopping_cart_link")
     MENU_BUTTON = (By.ID, "react-burger-menu-btn")
     LOGOUT_LINK = (By.ID, "logout_sidebar_link")
-    
+
+    def __init__(self, driver):
+        super().__init__(driver)
+        self._catalog = None
+        self._generation = None
+
     def get_page_title(self):
         """获取页面标题"""
         return self.driver.find_element(*self.PRODUCTS_TITLE).text
@@ -27,47 +92,128 @@ class HomePage:
         """获取商品数量"""
         return len(self.driver.find_elements(*self.PRODUCT_ITEMS))
     
+    def invalidate_catalog(self):
+        """丢弃目录缓存，下次读取重新抓取（页面上的改动会被自动发现，一般不需要手动调用）"""
+        self._catalog = None
+        self._generation = None
+
+    def _run_catalog_script(self, op=None):
+        waited = self._catalog is None
+        if waited:
+            # 第一次读取前等商品列表渲染出来；之后的操作都在页面内完成
+            self.waiter.all_present(self.PRODUCT_ITEMS)
+        result = self.driver.execute_script(_CATALOG_JS, op, self._generation)
+        if result.get("unchanged"):
+            return result
+        if not result["catalog"] and not waited:
+            # 缓存之后页面被导航过、列表还没渲染：等一下再做一次
+            self.waiter.all_present(self.PRODUCT_ITEMS)
+            result = self.driver.execute_script(_CATALOG_JS, op, None)
+        # 每次脚本（包括批量操作）都顺带返回最新目录和版本号，缓存随之更新
+        self._catalog = result["catalog"]
+        self._generation = result["generation"]
+        return result
+
+    def get_catalog(self, refresh=False):
+        """商品目录：[{index, name, price, description, button_id, in_cart}, ...]
+
+        一次脚本调用读取全部商品，缓存在页面对象上。之后每次读取只做一次轻量的版本号核对：
+        商品列表在页面上被改动过（刷新、导航、其他页面对象的加购/移除等）才重新读取。
+        """
+        if refresh:
+            self.invalidate_catalog()
+        self._run_catalog_script()
+        return self._catalog
+
+    def get_product(self, name):
+        """按名称取商品信息，不存在返回 None"""
+        for product in self.get_catalog():
+            if product["name"] == name:
+                return product
+        return None
+
+    def get_price(self, name):
+        product = self.get_product(name)
+        return product["price"] if product is not None else None
+
+    def _cart_action(self, action, names=(), indexes=()):
+        result = self._run_catalog_script({"action": action, "names": list(names), "indexes": list(indexes)})
+        if result["missing"]:
+            raise ValueError(f"找不到商品: {result['missing']}")
+        return result["cart_count"]
+
+    def add_products(self, names):
+        """按名称批量加入购物车（已在购物车里的跳过），一次往返；返回最终的购物车数量"""
+        return self._cart_action("add", names=names)
+
+    def remove_products(self, names):
+        """按名称批量移出购物车（不在购物车里的跳过），一次往返；返回最终的购物车数量"""
+        return self._cart_action("remove", names=names)
+
+    def add_products_by_index(self, indexes):
+        """按目录顺序的索引批量加入购物车，一次往返；返回最终的购物车数量"""
+        return self._cart_action("add", indexes=indexes)
+
     def add_first_product_to_cart(self):
         """添加第一个商品到购物车"""
-        # 等待商品列表加载完成，避免偶发找不到按钮
-        self.wait.until(EC.presence_of_all_elements_located(self.PRODUCT_ITEMS))
-        add_buttons = self.driver.find_elements(*self.ADD_TO_CART_BUTTON)
-        if add_buttons:
-            add_buttons[0].click()
-            return True
-        return False
+        return self.add_product_by_index(0)
 
     def add_product_by_index(self, index: int) -> bool:
         """按索引添加商品到购物车（用于多商品场景）。
 
         SauceDemo 的每个商品卡片里都有一个 .btn_inventory 按钮。
-        这里直接按按钮列表索引点击。
+        这里在页面内按索引点击，并顺带刷新目录缓存。
+        """
+        try:
+            self._cart_action("add", indexes=[index])
+        except ValueError:
+            return False
+        return self._catalog[index]["in_cart"]
+
+    def load_cart_fast(self, indexes=(0,), username=None, password=None):
+        """快速进入“已登录且购物车里有指定商品”的状态，停在商品页
+
+        同一会话里每种组合只通过 UI 登录并加购一次，之后恢复缓存的 cookies / localStorage。
         """
+        from pages.login_page import LoginPage
 
-        self.wait.until(EC.presence_of_all_elements_located(self.PRODUCT_ITEMS))
-        add_buttons = self.driver.find_elements(*self.ADD_TO_CART_BUTTON)
+        indexes = list(indexes)
+        username = username or Config.VALID_USERNAME
+        password = password or Config.VALID_PASSWORD
+
+        def build(driver):
+            LoginPage(driver).open().login(username, password)
+            HomePage(driver).add_products_by_index(indexes)
+
+        def verify(driver):
+            return LoginPage(driver).is_logged_in_page() and HomePage(driver).get_cart_count() == len(indexes)
+
+        scenario_cache.restore(
+            self.driver, f"cart:{username}:{indexes}", build=build, landing="inventory.html", verify=verify
+        )
+        self.invalidate_catalog()
+        return self
 
-        if 0 <= index < len(add_buttons):
-            add_buttons[index].click()
-            return True
-        return False
-    
     def get_cart_count(self):
         """获取购物车商品数量"""
-        try:
-            return int(self.driver.find_element(*self.CART_BADGE).text)
-        except:
-            return 0
+        # 购物车为空时页面上没有角标：只查一次，不等待
+        badge = self.waiter.find_or_none(self.CART_BADGE)
+        return int(badge.text) if badge is not None else 0
     
     def go_to_cart(self):
         """前往购物车页面"""
+        self.invalidate_catalog()
+        started = time.perf_counter()
         self.driver.find_element(*self.CART_LINK).click()
         # 等待购物车页面加载完成
-        self.wait.until(EC.presence_of_element_located((By.ID, "checkout")))
+        self.waiter.present((By.ID, "checkout"))
+        self._record_timing(started)
         from pages.cart_page import CartPage
         return CartPage(self.driver)
     
     def logout(self):
         """登出"""
+        self.invalidate_catalog()
         self.driver.find_element(*self.MENU_BUTTON).click()
-        self.wait.until(EC.element_to_be_clickable(self.LOGOUT_LINK)).click()
\ No newline at end of file
+        self.waiter.clickable(self.LOGOUT_LINK).click()
+        self.waiter.present((By.ID, "login-button"))
\ No newline at end of file
@@ -1,14 +1,13 @@
+import time
+
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from config import Config
+from pages.base_page import BasePage
+from utils.scenario_cache import scenario_cache
 
-class LoginPage:
+class LoginPage(BasePage):
     """登录页面对象模型"""
-    
-    def __init__(self, driver):
-        self.driver = driver
-        self.wait = WebDriverWait(driver, Config.EXPLICIT_WAIT)
         
     # 元素定位器
     USERNAME_INPUT = (By.ID, "user-name")
@@ -20,44 +19,70 @@ class LoginPage:
     def open(self):
         """打开登录页面"""
         self.driver.get(Config.BASE_URL)
+        self._record_timing()
         return self
     
     def enter_username(self, username):
         """输入用户名"""
-        self.wait.until(EC.presence_of_element_located(self.USERNAME_INPUT))
-        self.driver.find_element(*self.USERNAME_INPUT).clear()
-        self.driver.find_element(*self.USERNAME_INPUT).send_keys(username)
+        self.fill_form({self.USERNAME_INPUT: username})
         return self
     
     def enter_password(self, password):
         """输入密码"""
-        self.driver.find_element(*self.PASSWORD_INPUT).clear()
-        self.driver.find_element(*self.PASSWORD_INPUT).send_keys(password)
+        self.fill_form({self.PASSWORD_INPUT: password})
         return self
     
     def click_login(self):
-        """点击登录按钮"""
+        """点击登录按钮（等到跳转到商品页或出现错误提示为止）"""
+        started = time.perf_counter()
         self.driver.find_element(*self.LOGIN_BUTTON).click()
+        try:
+            found = self.waiter.any_of(present=[self.ERROR_MESSAGE], url_contains=["inventory.html"])
+        except TimeoutException:
+            return self
+        if found == "inventory.html":
+            self._record_timing(started)
         return self
     
     def login(self, username, password):
-        """完整的登录流程"""
-        self.enter_username(username)
-        self.enter_password(password)
+        """完整的登录流程（用户名、密码一次填写）"""
+        self.fill_form({self.USERNAME_INPUT: username, self.PASSWORD_INPUT: password})
         self.click_login()
         return self
     
+    def login_fast(self, username=None, password=None):
+        """快速登录：同一会话里只走一次登录 UI，之后直接恢复缓存的会话状态并打开商品页
+
+        用于“已登录”只是前置条件的用例；验证登录本身的用例仍应使用 login()。
+        """
+        username = username or Config.VALID_USERNAME
+        password = password or Config.VALID_PASSWORD
+        scenario_cache.restore(
+            self.driver,
+            f"logged_in:{username}",
+            build=lambda d: LoginPage(d).open().login(username, password),
+            landing="inventory.html",
+            verify=lambda d: LoginPage(d).is_logged_in_page(),
+        )
+        return self
+
+    def is_logged_in_page(self):
+        """当前是否是已登录的商品页（被重定向回登录页说明会话无效）"""
+        try:
+            found = self.waiter.any_of(present=[self.PRODUCTS_TITLE, self.LOGIN_BUTTON])
+        except TimeoutException:
+            return False
+        return found == self.PRODUCTS_TITLE and "inventory.html" in self.driver.current_url
+
     def get_error_message(self):
         """获取错误信息"""
-        try:
-            return self.driver.find_element(*self.ERROR_MESSAGE).text
-        except:
-            return None
+        error = self.waiter.find_or_none(self.ERROR_MESSAGE)
+        return error.text if error is not None else None
     
     def is_login_successful(self):
         """验证是否登录成功"""
         try:
-            self.wait.until(EC.presence_of_element_located(self.PRODUCTS_TITLE))
+            self.waiter.present(self.PRODUCTS_TITLE)
             return True
-        except:
+        except TimeoutException:
             return False
\ No newline at end of file
@@ -1,46 +1,216 @@
-import pytest
+import argparse
+import html
 import os
 import shutil
+import subprocess
+import sys
+import xml.etree.ElementTree as ET
 from datetime import datetime
 
-def run_tests():
-    """运行测试并生成报告"""
-    
+import pytest
+
+from utils.run_history import RunHistory, plan_shards
+
+WORKERS_DIR = "reports/workers"
+ALLURE_RESULTS_DIR = "reports/allure-results"
+
+
+def collect_nodeids():
+    """收集 tests/ 下所有用例的 nodeid（不启动浏览器）
+
+    返回 (退出码, nodeid 列表)。有模块导入失败等收集错误时退出码非 0，并打印 pytest 的输出：
+    这时其余模块的 nodeid 仍会列出，不能只按列表分片，否则出错的模块被悄悄漏掉。
+    """
+    result = subprocess.run(
+        [sys.executable, "-m", "pytest", "tests/", "--rootdir=.", "--collect-only", "-q", "-p", "no:cacheprovider"],
+        capture_output=True,
+        text=True,
+        encoding="utf-8",
+    )
+    nodeids = [line.strip() for line in result.stdout.splitlines() if "::" in line]
+    if result.returncode not in (pytest.ExitCode.OK, pytest.ExitCode.NO_TESTS_COLLECTED):
+        print(result.stdout)
+        print(result.stderr, file=sys.stderr)
+    return result.returncode, nodeids
+
+
+def _worker_command(worker_dir, node_list, extra_args=()):
+    return [
+        sys.executable, "-m", "pytest",
+        "tests/",
+        "--rootdir=.",
+        f"--node-list={node_list}",
+        f"--html={worker_dir}/report.html",
+        "--self-contained-html",
+        "--capture=sys",
+        "-v",
+        f"--alluredir={worker_dir}/allure-results",
+        f"--junitxml={worker_dir}/junit.xml",
+        *extra_args,
+    ]
+
+
+def _merge_allure_results(worker_dirs, target=ALLURE_RESULTS_DIR):
+    """Allure 结果文件名本身就是 UUID，直接汇总到同一目录即可（先清空，报告里只有本次运行的结果）"""
+    if os.path.exists(target):
+        shutil.rmtree(target)
+    os.makedirs(target, exist_ok=True)
+    for worker_dir in worker_dirs:
+        source = os.path.join(worker_dir, "allure-results")
+        if not os.path.isdir(source):
+            continue
+        for name in os.listdir(source):
+            shutil.copy2(os.path.join(source, name), os.path.join(target, name))
+
+
+def _merge_html_reports(worker_dirs, html_report):
+    """根据各 worker 的 junit.xml 生成汇总 HTML，并链接到各自的详细报告"""
+    rows = []
+    counts = {"passed": 0, "failed": 0, "skipped": 0}
+    for worker_dir in worker_dirs:
+        worker = os.path.basename(worker_dir)
+        junit = os.path.join(worker_dir, "junit.xml")
+        if not os.path.exists(junit):
+            rows.append((worker, "(worker 未生成结果)", "failed", 0.0, ""))
+            counts["failed"] += 1
+            continue
+        for case in ET.parse(junit).getroot().iter("testcase"):
+            if case.find("failure") is not None or case.find("error") is not None:
+                status = "failed"
+                node = case.find("failure") if case.find("failure") is not None else case.find("error")
+                message = node.get("message", "")
+            elif case.find("skipped") is not None:
+                status, message = "skipped", case.find("skipped").get("message", "")
+            else:
+                status, message = "passed", ""
+            counts[status] += 1
+            name = f"{case.get('classname')}::{case.get('name')}"
+            rows.append((worker, name, status, float(case.get("time", 0) or 0), message))
+
+    colors = {"passed": "#2e7d32", "failed": "#c62828", "skipped": "#9e9e9e"}
+    links = " | ".join(
+        f'<a href="{html.escape(os.path.relpath(os.path.join(d, "report.html"), os.path.dirname(html_report)))}">'
+        f"{html.escape(os.path.basename(d))}</a>"
+        for d in worker_dirs
+    )
+    body = "\n".join(
+        f"<tr><td>{html.escape(w)}</td><td>{html.escape(n)}</td>"
+        f'<td style="color:{colors[s]}">{s}</td><td>{t:.2f}s</td><td>{html.escape(m)}</td></tr>'
+        for w, n, s, t, m in rows
+    )
+    with open(html_report, "w", encoding="utf-8") as f:
+        f.write(
+            '<!DOCTYPE html><html><head><meta charset="utf-8"><title>测试报告（并行汇总）</title></head><body>'
+            f"<h1>测试报告（{len(worker_dirs)} 个 worker 汇总）</h1>"
+            f"<p>通过 {counts['passed']} / 失败 {counts['failed']} / 跳过 {counts['skipped']}</p>"
+            f"<p>各 worker 详细报告: {links}</p>"
+            '<table border="1" cellspacing="0" cellpadding="4">'
+            "<tr><th>Worker</th><th>用例</th><th>结果</th><th>耗时</th><th>信息</th></tr>"
+            f"{body}</table></body></html>"
+        )
+    return counts["failed"] == 0
+
+
+def run_parallel(workers, html_report, extra_args=()):
+    """按历史耗时分片，每个 worker 一个独立进程（各自的浏览器、截图和日志目录）"""
+    collect_code, nodeids = collect_nodeids()
+    if collect_code not in (pytest.ExitCode.OK, pytest.ExitCode.NO_TESTS_COLLECTED):
+        print(f"收集用例失败（pytest 退出码 {collect_code}），未启动 worker")
+        return collect_code
+    if not nodeids:
+        print("未收集到任何用例")
+        return 1
+
+    history = RunHistory()
+    shards = plan_shards(nodeids, history, workers)
+
+    if os.path.exists(WORKERS_DIR):
+        shutil.rmtree(WORKERS_DIR)
+
+    processes = []
+    worker_dirs = []
+    for index, (estimate, shard) in enumerate(shards):
+        worker_id = f"w{index}"
+        worker_dir = f"{WORKERS_DIR}/{worker_id}"
+        os.makedirs(worker_dir, exist_ok=True)
+        node_list = f"{worker_dir}/nodeids.txt"
+        with open(node_list, "w", encoding="utf-8") as f:
+            f.write("\n".join(shard))
+
+        print(f"[{worker_id}] {len(shard)} 个用例，预计耗时 {estimate:.1f}s")
+        env = dict(os.environ, TEST_WORKER_ID=worker_id)
+        with open(f"{worker_dir}/output.txt", "w", encoding="utf-8") as out:
+            processes.append(subprocess.Popen(
+                _worker_command(worker_dir, node_list, extra_args), env=env, stdout=out, stderr=subprocess.STDOUT,
+            ))
+        worker_dirs.append(worker_dir)
+
+    exit_codes = [p.wait() for p in processes]
+
+    # 汇总本次各 worker 的耗时到主历史文件，供下次分片使用
+    for worker_dir in worker_dirs:
+        history.merge(RunHistory(os.path.join(worker_dir, "run_history.json")))
+    history.save()
+
+    _merge_allure_results(worker_dirs)
+    all_passed = _merge_html_reports(worker_dirs, html_report)
+    return 0 if all_passed and not any(exit_codes) else 1
+
+
+def run_tests(workers=1, smoke_fail_fast=False):
+    """运行测试并生成报告
+
+    用例顺序由 conftest 按运行历史决定（Config.TEST_ORDER）：smoke 优先，最近失败/改动过的其次，其余按耗时从短到长。
+    smoke_fail_fast：smoke 用例失败时立即中止（并行时中止所在的 worker）
+    """
+
     # 清理旧的截图
     if os.path.exists("reports/screenshots"):
         shutil.rmtree("reports/screenshots")
     os.makedirs("reports/screenshots", exist_ok=True)
-    
+
     # 运行测试
     print("开始运行自动化测试...")
-    
+
     # 使用pytest运行测试
     # 生成HTML报告
     report_dir = "reports"
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     html_report = f"{report_dir}/test_report_{timestamp}.html"
-    
-    pytest_args = [
-        "tests/",
-        f"--html={html_report}",
-        "--self-contained-html",
-        "--capture=sys",
-        "-v",
-        "--alluredir=reports/allure-results"
-    ]
-    
-    # 执行测试
-    pytest.main(pytest_args)
-    
+
+    extra_args = ["--smoke-fail-fast"] if smoke_fail_fast else []
+    if workers > 1:
+        exit_code = run_parallel(workers, html_report, extra_args)
+    else:
+        pytest_args = [
+            "tests/",
+            f"--html={html_report}",
+            "--self-contained-html",
+            "--capture=sys",
+            "-v",
+            f"--alluredir={ALLURE_RESULTS_DIR}",
+            "--clean-alluredir",
+            *extra_args,
+        ]
+
+        # 执行测试
+        exit_code = pytest.main(pytest_args)
+
     print(f"\n测试完成！")
     print(f"HTML报告: {html_report}")
-    
+
     # 生成Allure报告
     try:
-        os.system("allure generate reports/allure-results -o reports/allure-report --clean")
+        os.system(f"allure generate {ALLURE_RESULTS_DIR} -o reports/allure-report --clean")
         print(f"Allure报告: reports/allure-report/index.html")
     except:
         print("注意: 需要安装Allure才能生成Allure报告")
 
+    return exit_code
+
 if __name__ == "__main__":
-    run_tests()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="运行自动化测试")
+    parser.add_argument("--workers", type=int, default=1, help="并行 worker 进程数（默认 1，即串行）")
+    parser.add_argument("--smoke-fail-fast", action="store_true", help="smoke 用例失败时立即中止本次运行")
+    args = parser.parse_args()
+    sys.exit(run_tests(workers=args.workers, smoke_fail_fast=args.smoke_fail_fast))
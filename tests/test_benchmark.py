@@ -0,0 +1,26 @@
+import allure
+
+from benchmark import compare
+
+BASELINE = {"flows": {"login": {"p50_ms": 100.0, "p95_ms": 200.0, "commands": 5}}}
+
+
+@allure.feature("基准测试")
+class TestBenchmarkCompare:
+    @allure.story("未超出阈值不算回归")
+    def test_within_threshold(self):
+        results = {"login": {"p50_ms": 119.0, "p95_ms": 239.0, "commands": 5}}
+        assert compare(results, BASELINE, threshold=0.2) == []
+
+    @allure.story("p50 / p95 超出阈值或命令数增加都算回归")
+    def test_slower_or_more_commands_is_regression(self):
+        results = {"login": {"p50_ms": 121.0, "p95_ms": 241.0, "commands": 6}}
+        regressions = compare(results, BASELINE, threshold=0.2)
+        assert len(regressions) == 3
+        assert [r.split(":")[1].split()[0] for r in regressions] == ["p50_ms", "p95_ms", "WebDriver"]
+
+    @allure.story("基线里没有的流程只提示不算回归")
+    def test_flow_missing_from_baseline_is_skipped(self):
+        results = {"checkout": {"p50_ms": 999.0, "p95_ms": 999.0, "commands": 99}}
+        assert compare(results, BASELINE, threshold=0.2) == []
+        assert compare(results, None, threshold=0.2) == []
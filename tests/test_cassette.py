@@ -0,0 +1,71 @@
+import json
+
+import allure
+import pytest
+from selenium.webdriver.remote.command import Command
+
+from config import Config
+from utils import cassette
+from utils.cassette import CassetteMismatch, replay_driver
+
+SITE = "http://127.0.0.1:5555"
+
+
+def _write_cassette(path, entries, settings=None, browser="chrome"):
+    header = {"version": cassette.VERSION, "browser": browser,
+              "settings": cassette._settings() if settings is None else settings}
+    lines = [header, {"c": Command.NEW_SESSION, "p": None,
+                      "r": {"value": {"sessionId": "recorded", "capabilities": {"browserName": browser}}}}]
+    lines += [{"c": c, "p": p, "r": {"value": v}} for c, p, v in entries]
+    path.write_text("\n".join(json.dumps(line, ensure_ascii=False) for line in lines) + "\n", encoding="utf-8")
+    return str(path)
+
+
+@pytest.fixture
+def recorded(tmp_path, monkeypatch):
+    """站点地址录成占位符，回放时替换成当前的 Config.BASE_URL"""
+    monkeypatch.setattr(Config, "BASE_URL", f"{SITE}/")
+    return _write_cassette(tmp_path / "login.jsonl", [
+        (Command.GET, {"url": "{{BASE_URL}}/"}, None),
+        (Command.GET_TITLE, {}, "Swag Labs"),
+    ])
+
+
+@allure.feature("命令磁带")
+class TestReplayConnection:
+    @allure.story("按录制顺序回放，站点地址换成当前 BASE_URL")
+    def test_exact_replay(self, recorded):
+        driver = replay_driver(recorded)
+        driver.get(f"{SITE}/")
+        assert driver.title == "Swag Labs"
+        driver._replay_connection.assert_finished()
+
+    @allure.story("连续重复的命令（等待轮询）重复返回上一条响应")
+    def test_repeated_polling_returns_last_response(self, recorded):
+        driver = replay_driver(recorded)
+        driver.get(f"{SITE}/")
+        assert [driver.title for _ in range(3)] == ["Swag Labs"] * 3
+        driver._replay_connection.assert_finished()
+
+    @allure.story("命令或参数与磁带不一致时指出第几条、期望和实际")
+    def test_divergence_raises_mismatch(self, recorded):
+        driver = replay_driver(recorded)
+        with pytest.raises(CassetteMismatch) as error:
+            driver.get(f"{SITE}/inventory.html")
+        message = str(error.value)
+        assert "第 2 条" in message
+        assert f"{SITE}/inventory.html" in message and f'"{SITE}/"' in message
+
+    @allure.story("磁带里还有没发出的命令")
+    def test_unplayed_commands_fail_assert_finished(self, recorded):
+        driver = replay_driver(recorded)
+        driver.get(f"{SITE}/")
+        with pytest.raises(CassetteMismatch, match="还有 1 条命令没有发出"):
+            driver._replay_connection.assert_finished()
+
+    @allure.story("录制时的设置与当前不同时要求重新录制")
+    def test_changed_settings_require_rerecording(self, tmp_path, monkeypatch):
+        path = _write_cassette(tmp_path / "login.jsonl", [], settings=dict(cassette._settings(), INPUT_MODE="keys"))
+        monkeypatch.setattr(Config, "INPUT_MODE", "script")
+        with pytest.raises(CassetteMismatch, match="INPUT_MODE"):
+            replay_driver(path)
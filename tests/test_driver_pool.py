@@ -0,0 +1,91 @@
+import allure
+import pytest
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.remote.errorhandler import ErrorHandler
+from selenium.webdriver.remote.remote_connection import RemoteConnection
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from config import Config
+from utils.driver_setup import BrowserContextProvider, DriverPool, DriverSetup
+
+
+def _dead_driver():
+    """会话指向一个没有驱动服务监听的端口，相当于驱动进程已被结束（崩溃 / 看门狗）"""
+    driver = object.__new__(WebDriver)
+    driver.command_executor = RemoteConnection("http://127.0.0.1:9")
+    driver.error_handler = ErrorHandler()
+    driver.session_id = "dead-session"
+    driver.caps = {}
+    driver._is_remote = True
+    return driver
+
+
+class _FakeChromium:
+    """只实现 BrowserContextProvider 用到的 CDP 命令和窗口切换；fail_on 指定的命令抛出 WebDriverException"""
+
+    def __init__(self, fail_on=None):
+        self.fail_on = fail_on
+        self.commands = []
+        self.current_window_handle = "anchor"
+        self.switch_to = self
+        self._targets = 0
+
+    def window(self, handle):
+        self.current_window_handle = handle
+
+    def execute_cdp_cmd(self, command, params):
+        self.commands.append(command)
+        if command == self.fail_on:
+            raise WebDriverException(f"{command} failed")
+        if command == "Target.createBrowserContext":
+            return {"browserContextId": f"ctx{len(self.commands)}"}
+        if command == "Target.createTarget":
+            self._targets += 1
+            return {"targetId": f"target{self._targets}"}
+        return {}
+
+    @property
+    def window_handles(self):
+        return ["anchor"]
+
+
+@allure.feature("驱动池")
+class TestDriverPool:
+    @allure.story("驱动服务已退出时探活 / 重置返回 False 而不是抛异常")
+    def test_dead_driver_service_is_not_alive(self):
+        driver = _dead_driver()
+        assert DriverSetup.is_alive(driver) is False
+        assert DriverSetup.reset_driver(driver) is False
+
+    @allure.story("归还驱动服务已退出的浏览器时直接回收，不放回池里")
+    def test_release_recycles_dead_driver(self):
+        pool = DriverPool(size=1, factory=_dead_driver)
+        driver = pool.acquire()
+        pool.release(driver)
+        assert pool._idle == []
+        assert pool.stats["recycled"] == 1
+
+
+@allure.feature("浏览器上下文")
+class TestBrowserContextProvider:
+    @allure.story("上下文建好后准备失败：销毁该上下文、切回锚点窗口并抛出原异常")
+    def test_failed_setup_disposes_context(self, monkeypatch):
+        monkeypatch.setattr(Config, "BROWSER", "chrome")
+        driver = _FakeChromium(fail_on="Target.createTarget")
+        provider = BrowserContextProvider(factory=lambda: driver)
+        with pytest.raises(WebDriverException):
+            provider.acquire()
+        assert driver.commands[-1] == "Target.disposeBrowserContext"
+        assert driver.current_window_handle == "anchor"
+        assert provider._leases == {}
+        assert provider.stats["contexts"] == 0
+
+    @allure.story("准备耗时只保留总和与最大值")
+    def test_setup_stats_do_not_grow_per_test(self, monkeypatch):
+        monkeypatch.setattr(Config, "BROWSER", "chrome")
+        provider = BrowserContextProvider(factory=_FakeChromium)
+        for _ in range(3):
+            provider.release(provider.acquire())
+        assert provider.stats["contexts"] == 3
+        assert set(provider.stats) == {"contexts", "browsers", "setup_ms_total", "setup_ms_max"}
+        assert provider.stats["setup_ms_total"] >= provider.stats["setup_ms_max"] >= 0
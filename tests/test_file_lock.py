@@ -0,0 +1,124 @@
+import multiprocessing
+import os
+import time
+
+import allure
+
+from utils.file_lock import FileLock
+
+
+def _hold_lock(lock_path, log_path, start, takeover_delay=0.0):
+    """等到同一时刻再抢锁，持锁期间在日志里记下进入 / 退出，用来检查是否有重叠
+
+    takeover_delay 让本进程第一次删除 / 改名锁文件前先停一下：它看到的失效锁这时已被另一个进程接管，
+    用来稳定复现“两个等待方看到同一把失效锁”的竞争。
+    """
+    if takeover_delay:
+        for name in ("remove", "rename"):
+            _delay_first_call(name, takeover_delay)
+    start.wait()
+    with FileLock(lock_path, timeout=10, stale_after=1, poll_interval=0.01):
+        with open(log_path, "a", encoding="utf-8") as f:
+            f.write(f"enter {os.getpid()}\n")
+        time.sleep(0.3)
+        with open(log_path, "a", encoding="utf-8") as f:
+            f.write(f"exit {os.getpid()}\n")
+
+
+def _delay_first_call(name, delay, _done=[]):
+    original = getattr(os, name)
+
+    def delayed(*args, **kwargs):
+        if not _done:
+            _done.append(name)
+            time.sleep(delay)
+        return original(*args, **kwargs)
+
+    setattr(os, name, delayed)
+
+
+@allure.feature("文件锁")
+class TestFileLock:
+    @allure.story("两个进程同时发现失效锁时只有一个能接管")
+    def test_stale_lock_taken_over_by_one_process_at_a_time(self, tmp_path):
+        lock_path = str(tmp_path / "shared.lock")
+        log_path = str(tmp_path / "holders.log")
+        with open(lock_path, "w", encoding="ascii") as f:
+            f.write("99999:crashed-holder")
+        old = time.time() - 60
+        os.utime(lock_path, (old, old))
+
+        ctx = multiprocessing.get_context("spawn")
+        start = ctx.Event()
+        workers = [
+            ctx.Process(target=_hold_lock, args=(lock_path, log_path, start, delay))
+            for delay in (0.0, 0.2)
+        ]
+        for worker in workers:
+            worker.start()
+        start.set()
+        for worker in workers:
+            worker.join(timeout=30)
+        assert [worker.exitcode for worker in workers] == [0, 0]
+
+        with open(log_path, encoding="utf-8") as f:
+            events = f.read().split()[::2]
+        assert events == ["enter", "exit", "enter", "exit"]
+        assert not os.path.exists(lock_path)
+        assert [name for name in os.listdir(tmp_path) if ".stale." in name] == []
+
+    @allure.story("释放时不删除已被别人接管的锁文件")
+    def test_release_keeps_lock_owned_by_someone_else(self, tmp_path):
+        lock_path = str(tmp_path / "shared.lock")
+        lock = FileLock(lock_path, timeout=5, stale_after=1)
+        lock.acquire()
+        os.remove(lock_path)
+        with open(lock_path, "w", encoding="ascii") as f:
+            f.write("12345:new-holder")
+        lock.release()
+        with open(lock_path, encoding="ascii") as f:
+            assert f.read() == "12345:new-holder"
+
+    @allure.story("接管失效锁时放回新锁失败，不删除被挪走的活锁")
+    def test_displaced_live_lock_is_kept_when_link_back_fails(self, tmp_path, monkeypatch):
+        """等待方 W 看到失效锁后、rename 之前，A 已接管并重建锁；W 把 A 的锁挪走、放回之前 C 又建了锁"""
+        lock_path = str(tmp_path / "shared.lock")
+        with open(lock_path, "w", encoding="ascii") as f:
+            f.write("99999:crashed-holder")
+        old = time.time() - 60
+        os.utime(lock_path, (old, old))
+
+        a = FileLock(lock_path, timeout=5, stale_after=1)
+        c = FileLock(lock_path, timeout=5, stale_after=1)
+        waiter = FileLock(lock_path, timeout=5, stale_after=1)
+        real_rename, real_link = os.rename, os.link
+        hooked = []
+
+        def rename(src, dst):
+            if "rename" not in hooked:
+                hooked.append("rename")
+                a.acquire()  # A 抢先接管失效锁并建好自己的锁
+            return real_rename(src, dst)
+
+        def link(src, dst):
+            if "link" not in hooked:
+                hooked.append("link")
+                c.acquire()  # 锁文件被 W 挪走的空档里 C 建了锁
+            return real_link(src, dst)
+
+        monkeypatch.setattr(os, "rename", rename)
+        monkeypatch.setattr(os, "link", link)
+        waiter._break_if_stale()
+        monkeypatch.undo()
+
+        displaced = [name for name in os.listdir(tmp_path) if ".stale." in name]
+        assert len(displaced) == 1
+        with open(tmp_path / displaced[0], encoding="ascii") as f:
+            assert f.read() == a._token
+        assert c._owned()
+
+        a.release()
+        assert [name for name in os.listdir(tmp_path) if ".stale." in name] == []
+        assert c._owned()
+        c.release()
+        assert not os.path.exists(lock_path)
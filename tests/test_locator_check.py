@@ -0,0 +1,103 @@
+import allure
+import pytest
+from selenium.webdriver.common.by import By
+
+from utils.locator_check import (
+    UnsupportedLocator,
+    check_locators,
+    find_all,
+    load_manifest,
+    parse_html,
+    select,
+    snapshot_dir,
+)
+
+HTML = """
+<html><body>
+  <div id="root" class="app main">
+    <form class="login" data-test="login-form">
+      <input id="user-name" name="user-name" class="input_error form_input" data-test="username" type="text">
+      <input id="password" name="password" class="input_error form_input" data-test="password" type="password">
+      <h3 data-test="error" class="error-message">Epic sadface: <span lang="en-US">required</span></h3>
+      <input type="submit" id="login-button" class="submit-button btn_action" value="Login">
+    </form>
+    <ul class="items">
+      <li class="item first" title="Sauce Labs Backpack">one</li>
+      <li class="item">two<br></li>
+      <li class="item last" title="Bolt T-Shirt">three</li>
+    </ul>
+  </div>
+</body></html>
+"""
+
+
+@pytest.fixture(scope="module")
+def root():
+    return parse_html(HTML)
+
+
+def _ids(nodes):
+    return [n.attrs.get("id") or n.attrs.get("title") or n.tag for n in nodes]
+
+
+@allure.feature("静态定位器检查")
+class TestSelect:
+    @allure.story("复合选择器：标签 + id + class + 属性")
+    def test_compound_selectors(self, root):
+        assert _ids(select(root, "input#user-name.form_input[type='text']")) == ["user-name"]
+        assert _ids(select(root, "input.form_input.input_error")) == ["user-name", "password"]
+        assert _ids(select(root, "*[data-test=error]")) == ["h3"]
+        assert select(root, "input#user-name[type=password]") == []
+
+    @allure.story("属性运算符")
+    def test_attribute_operators(self, root):
+        assert _ids(select(root, "li[title]")) == ["Sauce Labs Backpack", "Bolt T-Shirt"]
+        assert _ids(select(root, 'li[title="Bolt T-Shirt"]')) == ["Bolt T-Shirt"]
+        assert _ids(select(root, "li[class~=last]")) == ["Bolt T-Shirt"]
+        assert _ids(select(root, "input[id^=pass]")) == ["password"]
+        assert _ids(select(root, "input[id$=button]")) == ["login-button"]
+        assert _ids(select(root, "li[title*='Labs Back']")) == ["Sauce Labs Backpack"]
+        assert _ids(select(root, "span[lang|=en]")) == ["span"]
+        assert select(root, "input[id^='']") == []
+
+    @allure.story("组合符：后代、子代、相邻、兄弟")
+    def test_combinators(self, root):
+        assert len(select(root, "#root input")) == 3
+        assert _ids(select(root, "form > h3 > span")) == ["span"]
+        assert select(root, "#root > input") == []
+        assert _ids(select(root, "li.first + li + li")) == ["Bolt T-Shirt"]
+        assert _ids(select(root, "#password ~ input")) == ["login-button"]
+        assert _ids(select(root, "h3+input")) == ["login-button"]
+
+    @allure.story("逗号分隔的选择器列表按文档顺序去重")
+    def test_comma_lists(self, root):
+        assert _ids(select(root, "#login-button, #user-name, input[name=user-name]")) == ["user-name", "login-button"]
+
+    @allure.story("不支持的语法明确报错")
+    def test_unsupported_syntax(self, root):
+        with pytest.raises(UnsupportedLocator):
+            select(root, "li:first-child")
+        with pytest.raises(UnsupportedLocator):
+            select(root, "li, , ul")
+        with pytest.raises(UnsupportedLocator):
+            find_all(root, (By.XPATH, "//li"))
+
+
+@allure.feature("静态定位器检查")
+class TestFindAll:
+    @allure.story("唯一、多个（歧义）和匹配不到")
+    def test_unique_ambiguous_and_missing(self, root):
+        assert len(find_all(root, (By.ID, "login-button"))) == 1
+        assert len(find_all(root, (By.CLASS_NAME, "item"))) == 3
+        assert len(find_all(root, (By.NAME, "password"))) == 1
+        assert len(find_all(root, (By.TAG_NAME, "LI"))) == 3
+        assert find_all(root, (By.ID, "missing")) == []
+        assert find_all(root, (By.CSS_SELECTOR, ".items > .missing")) == []
+
+    @allure.story("页面对象的定位器在录制的快照上都能唯一匹配")
+    def test_page_locators_against_snapshots(self):
+        if not load_manifest().get("states"):
+            pytest.skip(f"{snapshot_dir()} 下没有录制的快照（python -m utils.locator_check --record --local）")
+        report = check_locators()
+        assert report["missing"] == []
+        assert report["ambiguous"] == []
@@ -1,21 +1,22 @@
 import pytest
 import allure
-from utils.driver_setup import DriverSetup
 from pages.login_page import LoginPage
 from config import Config
+from utils.screenshot import take_screenshot
 
 @allure.feature("登录功能测试")
 class TestLogin:
     @pytest.fixture(autouse=True)
-    def setup(self):
-        """测试前置条件"""
-        self.driver = DriverSetup.get_driver()
+    def setup(self, driver):
+        """测试前置条件（driver 由 conftest 的 driver fixture 提供并负责回收）"""
+        self.driver = driver
         self.login_page = LoginPage(self.driver)
         yield
-        self.driver.quit()
     
     @allure.story("测试有效登录")
     @allure.severity(allure.severity_level.CRITICAL)
+    @pytest.mark.smoke
+    @pytest.mark.input_mode("keys")  # 保留一条走真实键盘输入的登录用例
     def test_valid_login(self):
         """测试有效用户登录"""
         with allure.step("1. 打开登录页面"):
@@ -28,7 +29,7 @@ class TestLogin:
             assert self.login_page.is_login_successful(), "登录失败"
             
         with allure.step("4. 截图验证"):
-            self.driver.save_screenshot(f"{Config.SCREENSHOT_DIR}test_valid_login.png")
+            take_screenshot(self.driver, "test_valid_login")
     
     @allure.story("测试无效登录")
     def test_invalid_login(self):
@@ -45,7 +46,7 @@ class TestLogin:
             assert "Username and password do not match" in error_message
             
         with allure.step("4. 截图验证"):
-            self.driver.save_screenshot(f"{Config.SCREENSHOT_DIR}test_invalid_login.png")
+            take_screenshot(self.driver, "test_invalid_login")
     
     @allure.story("测试空密码登录")
     def test_login_with_empty_password(self):
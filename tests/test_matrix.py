@@ -0,0 +1,54 @@
+import itertools
+
+import allure
+
+from data.test_data import CHECKOUT_CONSTRAINTS, CHECKOUT_DOMAINS, checkout_info_cases
+from utils.matrix import covering_cases, full_product_size, group_cases
+
+DOMAINS = {
+    "user": ["a", "b", "c"],
+    "first_name": {"empty": "", "ascii": "Test", "long": "A" * 64},
+    "last_name": ["x", "y"],
+    "postal_code": ["1", "2", "3"],
+}
+
+
+def _uncovered_pairs(domains, cases, constraints=()):
+    fields = list(domains)
+    missing = []
+    for f1, f2 in itertools.combinations(fields, 2):
+        for l1, l2 in itertools.product(domains[f1], domains[f2]):
+            if not all(c({f1: l1, f2: l2}) for c in constraints):
+                continue
+            if not any(case.labels[f1] == l1 and case.labels[f2] == l2 for case in cases):
+                missing.append((f1, l1, f2, l2))
+    return missing
+
+
+@allure.feature("组合覆盖")
+class TestCoveringCases:
+    @allure.story("两两组合全部覆盖且用例数少于笛卡尔积")
+    def test_every_pair_is_covered(self):
+        cases = list(covering_cases(DOMAINS))
+        assert _uncovered_pairs(DOMAINS, cases) == []
+        assert len(cases) < full_product_size(DOMAINS)
+        assert cases[0]["first_name"] in ("", "Test", "A" * 64)
+
+    @allure.story("相同参数生成的序列相同")
+    def test_result_is_deterministic(self):
+        first = [case.id for case in covering_cases(DOMAINS, seed=7)]
+        second = [case.id for case in covering_cases(DOMAINS, seed=7)]
+        assert first == second
+
+    @allure.story("约束排除的组合不出现，其余两两组合仍全部覆盖")
+    def test_checkout_matrix_respects_constraints(self):
+        cases = list(checkout_info_cases())
+        assert all(all(c(case.labels) for c in CHECKOUT_CONSTRAINTS) for case in cases)
+        assert _uncovered_pairs(CHECKOUT_DOMAINS, cases, CHECKOUT_CONSTRAINTS) == []
+
+    @allure.story("按登录用户分组保持首次出现的顺序")
+    def test_group_cases_keeps_first_seen_order(self):
+        cases = list(covering_cases(DOMAINS))
+        groups = group_cases(cases, "user")
+        assert [user for user, _ in groups] == list(dict.fromkeys(case.labels["user"] for case in cases))
+        assert sum(len(members) for _, members in groups) == len(cases)
@@ -0,0 +1,25 @@
+import allure
+
+from utils.page_metrics import PageTimingCollector
+
+
+def _run(p50):
+    return {"pages": {"/inventory.html": {"load_ms": {"p50": p50}}}}
+
+
+@allure.feature("页面性能")
+class TestFindRegressions:
+    @allure.story("当前 p50 超过最近几次的中位数加阈值才算回归")
+    def test_regression_against_rolling_median(self):
+        history = [_run(100), _run(300), _run(110), _run(90)]
+        current = {"/inventory.html": {"load_ms": {"p50": 140}}}
+        regressions = PageTimingCollector.find_regressions(current, history, window=3, threshold=0.25)
+        assert regressions == [{"page": "/inventory.html", "metric": "load_ms", "p50": 140, "baseline": 110, "runs": 3}]
+
+    @allure.story("阈值以内、没有历史或缺少该指标都不算回归")
+    def test_no_regression(self):
+        current = {"/inventory.html": {"load_ms": {"p50": 137}, "ttfb_ms": {"p50": 50}}}
+        assert PageTimingCollector.find_regressions(current, [_run(110)], window=5, threshold=0.25) == []
+        assert PageTimingCollector.find_regressions(current, [], window=5, threshold=0.25) == []
+        assert PageTimingCollector.find_regressions({"/cart.html": {"load_ms": {"p50": 999}}}, [_run(1)],
+                                                    window=5, threshold=0.25) == []
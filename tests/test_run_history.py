@@ -0,0 +1,75 @@
+import allure
+
+import conftest
+from config import Config
+from utils.run_history import RunHistory, plan_shards
+
+
+class _FakeConfig:
+    """只提供 pytest_collection_modifyitems 用到的 getoption"""
+
+    def __init__(self, options):
+        self.options = options
+
+    def getoption(self, name):
+        return self.options.get(name)
+
+
+class _FakeItem:
+    def __init__(self, nodeid):
+        self.nodeid = nodeid
+
+    def get_closest_marker(self, name):
+        return None
+
+
+@allure.feature("执行排序")
+class TestRunHistoryOrder:
+    @allure.story("并行 worker 按主历史文件把最近失败的用例排在最前")
+    def test_worker_orders_previous_failure_first(self, monkeypatch, tmp_path):
+        """worker 自己的历史目录每次运行前被清空，排序仍要用主历史文件里的结果"""
+        main_file = tmp_path / "run_history.json"
+        monkeypatch.setattr(Config, "RUN_HISTORY_FILE", str(main_file))
+        monkeypatch.setattr(Config, "REPORT_DIR", str(tmp_path))
+        monkeypatch.setattr(Config, "WORKER_ID", "w0")
+
+        history = RunHistory(str(main_file))
+        history.record("tests/a.py::test_fast", 1.0, "passed")
+        history.record("tests/a.py::test_slow", 5.0, "passed")
+        history.record("tests/a.py::test_flaky", 9.0, "failed")
+        history.save()
+
+        # worker 写结果的文件是它自己的（此时为空），不能用来排序
+        assert RunHistory.default_path() != str(main_file)
+        assert RunHistory().tests == {}
+
+        items = [_FakeItem(n) for n in ("tests/a.py::test_slow", "tests/a.py::test_fast", "tests/a.py::test_flaky")]
+        conftest.pytest_collection_modifyitems(_FakeConfig({"--order": "history"}), items)
+
+        assert [item.nodeid for item in items] == [
+            "tests/a.py::test_flaky",
+            "tests/a.py::test_fast",
+            "tests/a.py::test_slow",
+        ]
+
+
+@allure.feature("并行分片")
+class TestPlanShards:
+    @allure.story("按历史耗时均衡分片，分片内保持收集顺序")
+    def test_balances_by_history(self, tmp_path):
+        history = RunHistory(str(tmp_path / "run_history.json"))
+        for nodeid, duration in (("t::a", 8.0), ("t::b", 5.0), ("t::c", 4.0), ("t::d", 3.0), ("t::e", 1.0)):
+            history.record(nodeid, duration)
+        shards = plan_shards(["t::a", "t::b", "t::c", "t::d", "t::e"], history, 2)
+        assert shards == [(11.0, ["t::a", "t::d"]), (10.0, ["t::b", "t::c", "t::e"])]
+
+    @allure.story("没有历史的用例按已知耗时的中位数估算，分片数不超过用例数")
+    def test_unknown_tests_use_median(self, tmp_path):
+        history = RunHistory(str(tmp_path / "run_history.json"))
+        history.record("t::a", 2.0)
+        history.record("t::b", 6.0)
+        history.record("t::c", 4.0)
+        shards = plan_shards(["t::a", "t::b", "t::c", "t::new"], history, 2)
+        assert shards == [(8.0, ["t::a", "t::b"]), (8.0, ["t::c", "t::new"])]
+        assert plan_shards(["t::a"], history, 4) == [(2.0, ["t::a"])]
+        assert plan_shards([], history, 3) == []
@@ -0,0 +1,90 @@
+import base64
+import json
+import os
+import threading
+import time
+
+import allure
+import pytest
+
+from utils.screenshot import ScreenshotService
+
+
+def _frame(text):
+    return base64.b64encode(text.encode("ascii")).decode("ascii")
+
+
+@allure.feature("截图")
+class TestScreenshotDedup:
+    @allure.story("同名截图加序号，去重指向的文件不会被后来的截图覆盖")
+    def test_reused_name_does_not_overwrite_deduplicated_file(self, tmp_path):
+        service = ScreenshotService(directory=str(tmp_path), policy="always", image_format="png", max_width=0)
+        first = service.submit("checkout_step1", _frame("frame-a")).result()
+        duplicate = service.submit("checkout_step2", _frame("frame-a")).result()
+        again = service.submit("checkout_step1", _frame("frame-b")).result()
+        stats = service.close()
+
+        assert (first, duplicate, again) == ("checkout_step1.png", "checkout_step1.png", "checkout_step1_2.png")
+        assert (tmp_path / "checkout_step1.png").read_bytes() == b"frame-a"
+        assert (tmp_path / "checkout_step1_2.png").read_bytes() == b"frame-b"
+        manifest = json.loads((tmp_path / "manifest.json").read_text(encoding="utf-8"))
+        assert manifest["checkout_step2"] == {"file": "checkout_step1.png", "sha1": manifest["checkout_step1"]["sha1"],
+                                              "duplicate": True}
+        assert manifest["checkout_step1_2"]["file"] == "checkout_step1_2.png"
+        assert (stats["written"], stats["duplicates"]) == (2, 1)
+
+    @allure.story("序号不与显式带序号的名字冲突")
+    def test_suffix_skips_names_already_taken(self, tmp_path):
+        service = ScreenshotService(directory=str(tmp_path), policy="always", image_format="png", max_width=0)
+        names = [service.submit(name, _frame(f"frame-{i}")).result()
+                 for i, name in enumerate(("shot_2", "shot", "shot", "shot"))]
+        service.close()
+        assert names == ["shot_2.png", "shot.png", "shot_3.png", "shot_4.png"]
+        assert sorted(os.listdir(tmp_path)) == ["manifest.json", "shot.png", "shot_2.png", "shot_3.png", "shot_4.png"]
+
+    @allure.story("第一帧写盘失败后，相同内容的截图重新写盘而不是指向不存在的文件")
+    def test_failed_write_is_not_used_for_dedup(self, tmp_path):
+        service = ScreenshotService(directory=str(tmp_path), policy="always", image_format="png", max_width=0)
+        original = service._encode
+        calls = []
+
+        def flaky_encode(png):
+            calls.append(png)
+            if len(calls) == 1:
+                raise OSError("disk full")
+            return original(png)
+
+        service._encode = flaky_encode
+        with pytest.raises(OSError):
+            service.submit("first", _frame("frame-a")).result()
+        second = service.submit("second", _frame("frame-a")).result()
+        stats = service.close()
+
+        assert second == "second.png"
+        assert (tmp_path / "second.png").read_bytes() == b"frame-a"
+        assert (stats["errors"], stats["written"], stats["duplicates"]) == (1, 1, 0)
+
+    @allure.story("第一帧还在处理时提交的相同截图等它结果：超出预算时不拿到没写盘的文件名")
+    def test_duplicate_waits_for_first_write(self, tmp_path):
+        service = ScreenshotService(directory=str(tmp_path), policy="always", image_format="png", max_width=0,
+                                    budget_mb=0.000001, max_workers=2)
+        original = service._encode
+        entered, release = threading.Event(), threading.Event()
+
+        def slow_encode(png):
+            entered.set()
+            release.wait(5)
+            return original(png)
+
+        service._encode = slow_encode
+        first = service.submit("first", _frame("frame-too-large"))
+        assert entered.wait(5)
+        duplicate = service.submit("second", _frame("frame-too-large"))
+        time.sleep(0.1)  # 让第二张截图在第一张还没处理完时就查到相同内容
+        release.set()
+        results = (first.result(), duplicate.result())
+        stats = service.close()
+
+        assert results == ("", "")
+        assert stats["skipped_budget"] == 2
+        assert not any(name.endswith(".png") for name in os.listdir(tmp_path))
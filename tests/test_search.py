@@ -1,23 +1,21 @@
 import pytest
 import allure
-from utils.driver_setup import DriverSetup
 from pages.login_page import LoginPage
 from pages.home_page import HomePage
-from config import Config
+from utils.screenshot import take_screenshot
 
 @allure.feature("商品功能测试")
 class TestProduct:
     @pytest.fixture(autouse=True)
-    def setup(self):
+    def setup(self, driver):
         """测试前置条件：先登录"""
-        self.driver = DriverSetup.get_driver()
+        self.driver = driver
         self.login_page = LoginPage(self.driver)
         self.home_page = HomePage(self.driver)
         
-        # 先登录
-        self.login_page.open().login(Config.VALID_USERNAME, Config.VALID_PASSWORD)
+        # 先登录（走场景缓存：只有第一个用例真正操作 UI）
+        self.login_page.login_fast()
         yield
-        self.driver.quit()
     
     @allure.story("测试添加商品到购物车")
     def test_add_to_cart(self):
@@ -33,7 +31,7 @@ class TestProduct:
             assert new_count == initial_count + 1, f"购物车数量应该从{initial_count}增加到{new_count}"
             
         with allure.step("4. 截图验证"):
-            self.driver.save_screenshot(f"{Config.SCREENSHOT_DIR}test_add_to_cart.png")
+            take_screenshot(self.driver, "test_add_to_cart")
     
     @allure.story("测试查看购物车")
     def test_view_cart(self):
@@ -49,4 +47,4 @@ class TestProduct:
             assert cart_items > 0, "购物车中应该有商品"
             
         with allure.step("4. 截图验证"):
-            self.driver.save_screenshot(f"{Config.SCREENSHOT_DIR}test_view_cart.png")
\ No newline at end of file
+            take_screenshot(self.driver, "test_view_cart")
\ No newline at end of file
@@ -0,0 +1,37 @@
+import json
+
+import allure
+
+from utils.tracer import SYNC_PREFIX, merge_traces
+
+
+def _write(path, data):
+    path.write_text(json.dumps(data), encoding="utf-8")
+    return str(path)
+
+
+@allure.feature("执行时间线")
+class TestMergeTraces:
+    @allure.story("合并多个 worker 的 trace，不平移时间")
+    def test_merges_worker_traces(self, tmp_path):
+        w0 = _write(tmp_path / "w0.json", {"traceEvents": [{"ph": "X", "name": "a", "ts": 10, "pid": 1, "tid": 1}]})
+        w1 = _write(tmp_path / "w1.json", [{"ph": "X", "name": "b", "ts": 20, "pid": 2, "tid": 1}])
+        merged = merge_traces([w0, w1])
+        assert [(e["name"], e["ts"]) for e in merged["traceEvents"]] == [("a", 10), ("b", 20)]
+        assert "otherData" not in merged
+
+    @allure.story("按对时标记平移测试侧事件，元数据事件不动")
+    def test_aligns_to_devtools_sync_mark(self, tmp_path):
+        label = f"{SYNC_PREFIX}:1:1"
+        ours = _write(tmp_path / "trace.json", {"traceEvents": [
+            {"ph": "M", "name": "process_name", "pid": 1, "tid": 0, "ts": 0},
+            {"ph": "i", "name": label, "cat": "sync", "ts": 1000, "pid": 1, "tid": 1},
+            {"ph": "X", "name": "step", "ts": 1500, "pid": 1, "tid": 1},
+        ]})
+        devtools = _write(tmp_path / "devtools.json", [
+            {"ph": "I", "name": "TimeStamp", "ts": 5000, "args": {"data": {"message": label}}},
+        ])
+        merged = merge_traces([ours], devtools)
+        assert merged["otherData"] == {"sync_offset_us": 4000}
+        by_name = {e["name"]: e["ts"] for e in merged["traceEvents"]}
+        assert by_name == {"TimeStamp": 5000, "process_name": 0, label: 5000, "step": 5500}
@@ -0,0 +1,192 @@
+import json
+import os
+import re
+import threading
+from urllib.parse import urlsplit
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options as ChromeOptions
+from selenium.webdriver.chromium.webdriver import ChromiumDriver
+from selenium.webdriver.remote.command import Command
+
+from config import Config
+
+VERSION = 1
+_BASE_URL_TOKEN = "{{BASE_URL}}"
+# 截图数据很大又不影响页面对象逻辑：录制时换成 1x1 的 PNG，保持磁带紧凑
+_PLACEHOLDER_PNG = "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNk+M9QDwADhgGAWjR9awAAAABJRU5ErkJggg=="
+_SCREENSHOT_COMMANDS = {Command.SCREENSHOT, Command.ELEMENT_SCREENSHOT}
+# 影响命令序列的设置：录制和回放时不一致，序列必然不同，直接提示重新录制
+_SETTINGS = ("INPUT_MODE", "PAGE_TIMING", "SCREENSHOT_POLICY", "EXPLICIT_WAIT", "ABSENCE_TIMEOUT", "STEP_RETRIES")
+
+
+class CassetteMismatch(AssertionError):
+    """回放时页面对象发出的命令与磁带里录制的不一致（逻辑变了，需要重新录制或修复）"""
+
+
+def cassette_mode() -> str:
+    """off：不使用磁带（默认，走真实浏览器）；replay：只回放；record：重新录制；auto：有磁带就回放，没有就录制"""
+    return (getattr(Config, "CASSETTE_MODE", "off") or "off").lower().strip()
+
+
+def cassette_path(nodeid: str, directory=None) -> str:
+    directory = directory or getattr(Config, "CASSETTE_DIR", "tests/cassettes")
+    name = re.sub(r"[^\w.-]+", "_", nodeid.split("::", 1)[-1]).strip("_")
+    module = os.path.splitext(os.path.basename(nodeid.split("::", 1)[0]))[0]
+    return os.path.join(directory, module, f"{name}.jsonl")
+
+
+def _origin(url) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def _settings() -> dict:
+    return {name: getattr(Config, name, None) for name in _SETTINGS}
+
+
+def _brief(params) -> str:
+    """错误信息里的参数摘要：脚本只保留开头，重点显示参数"""
+    if isinstance(params, dict) and "script" in params:
+        params = dict(params, script=" ".join(str(params["script"]).split())[:60] + "…")
+    return json.dumps(params, ensure_ascii=False)[:300]
+
+
+def _strip_session(params):
+    """去掉 sessionId，并按 JSON 往返一次（元组变列表），与磁带里的参数可以直接比较"""
+    if isinstance(params, dict):
+        params = {k: v for k, v in params.items() if k != "sessionId"}
+    return json.loads(json.dumps(params))
+
+
+class CassetteRecorder:
+    """录制：在真实 driver 的传输层（command_executor.execute）记录每条命令和原始响应
+
+    站点地址替换成占位符，回放时换成当时的 Config.BASE_URL（本地替身站点每次端口不同）。
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.entries = []
+        self._origin = _origin(Config.BASE_URL)
+        self._original = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        executor = self.driver.command_executor
+        self._original = executor.execute
+        # 回放时由 webdriver.Remote 发起 newSession：用当前会话的信息补一条
+        self._add(Command.NEW_SESSION, None,
+                  {"value": {"sessionId": self.driver.session_id, "capabilities": self.driver.caps}})
+
+        def execute(command, params):
+            response = self._original(command, params)
+            self._add(command, params, response)
+            return response
+
+        executor.execute = execute
+        return self
+
+    def stop(self):
+        if self._original is not None:
+            self.driver.command_executor.execute = self._original
+            self._original = None
+
+    def _add(self, command, params, response):
+        if command in _SCREENSHOT_COMMANDS and isinstance(response, dict) and isinstance(response.get("value"), str):
+            response = dict(response, value=_PLACEHOLDER_PNG)
+        entry = {"c": command, "p": _strip_session(params), "r": response}
+        text = json.dumps(entry, ensure_ascii=False, separators=(",", ":")).replace(self._origin, _BASE_URL_TOKEN)
+        with self._lock:
+            self.entries.append(text)
+
+    def write(self, path) -> str:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        header = {"version": VERSION, "browser": Config.BROWSER, "settings": _settings()}
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(json.dumps(header, ensure_ascii=False, separators=(",", ":")) + "\n")
+            for line in self.entries:
+                f.write(line + "\n")
+        os.replace(tmp, path)
+        return path
+
+
+class ReplayConnection:
+    """回放：代替 RemoteConnection 交给 webdriver.Remote，按顺序返回磁带里的响应
+
+    - 命令名或参数与录制的不一致 → CassetteMismatch（指出第几条、期望什么、实际什么）
+    - 同一条命令被连续重复发出（显式等待轮询次数不同）时，重复返回上一条响应
+    - assert_finished()：磁带里还有没用到的命令，说明页面对象少发了命令
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, encoding="utf-8") as f:
+            lines = [line for line in f if line.strip()]
+        if not lines:
+            raise CassetteMismatch(f"磁带为空: {path}")
+        self.header = json.loads(lines[0])
+        if self.header.get("version") != VERSION:
+            raise CassetteMismatch(f"磁带版本不兼容（{self.header.get('version')}），请重新录制: {path}")
+        changed = {k: (v, getattr(Config, k, None)) for k, v in self.header.get("settings", {}).items()
+                   if getattr(Config, k, None) != v}
+        if changed:
+            detail = ", ".join(f"{k}: 录制时 {old!r} / 现在 {new!r}" for k, (old, new) in changed.items())
+            raise CassetteMismatch(f"录制时的设置与当前不同（{detail}），请重新录制: {path}")
+
+        origin = _origin(Config.BASE_URL)
+        self.entries = [json.loads(line.replace(_BASE_URL_TOKEN, origin)) for line in lines[1:]]
+        self.position = 0
+        self._last = None
+
+    def execute(self, command, params):
+        actual = _strip_session(params)
+        if self.position < len(self.entries):
+            expected = self.entries[self.position]
+            # newSession 的能力参数取决于本地浏览器配置，不做比较
+            if expected["c"] == command and (command == Command.NEW_SESSION or expected["p"] == actual):
+                self.position += 1
+                self._last = expected
+                return expected["r"]
+        if self._last is not None and self._last["c"] == command and self._last["p"] == actual:
+            return self._last["r"]
+        raise CassetteMismatch(self._describe(command, actual))
+
+    def _describe(self, command, actual) -> str:
+        if self.position >= len(self.entries):
+            expected = "（磁带已结束）"
+        else:
+            entry = self.entries[self.position]
+            expected = f"{entry['c']} {_brief(entry['p'])}"
+        return (
+            f"命令序列与磁带不一致（第 {self.position + 1} 条，{self.path}）\n"
+            f"  期望: {expected}\n"
+            f"  实际: {command} {_brief(actual)}\n"
+            f"页面对象逻辑有意改变时用 CASSETTE_MODE=record 重新录制"
+        )
+
+    def assert_finished(self) -> None:
+        remaining = len(self.entries) - self.position
+        if remaining:
+            entry = self.entries[self.position]
+            raise CassetteMismatch(
+                f"磁带里还有 {remaining} 条命令没有发出（下一条: {entry['c']}），{self.path}\n"
+                f"页面对象逻辑有意改变时用 CASSETTE_MODE=record 重新录制"
+            )
+
+
+class ReplayChromiumDriver(webdriver.Remote):
+    """回放 chrome / edge 录制的磁带：保留 execute_cdp_cmd，页面对象走的分支与录制时一致"""
+
+    execute_cdp_cmd = ChromiumDriver.execute_cdp_cmd
+
+
+def replay_driver(path):
+    """用磁带创建一个不需要浏览器的 driver"""
+    connection = ReplayConnection(path)
+    browser = (connection.header.get("browser") or "").lower()
+    cls = ReplayChromiumDriver if browser in ("chrome", "edge") else webdriver.Remote
+    driver = cls(command_executor=connection, options=ChromeOptions())
+    driver._replay_connection = connection
+    return driver
@@ -0,0 +1,156 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+
+from config import Config
+from utils.file_lock import FileLock
+
+# 各浏览器可执行文件的常见位置（非 Windows 平台通过 `--version` 读取版本号）
+_BROWSER_BINARIES = {
+    "chrome": [
+        "google-chrome", "google-chrome-stable", "chromium", "chromium-browser",
+        "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
+    ],
+    "edge": [
+        "microsoft-edge", "microsoft-edge-stable",
+        "/Applications/Microsoft Edge.app/Contents/MacOS/Microsoft Edge",
+    ],
+    "firefox": [
+        "firefox",
+        "/Applications/Firefox.app/Contents/MacOS/firefox",
+    ],
+}
+
+# Windows 下浏览器把当前版本号写在注册表里，读注册表比启动进程快得多
+_WINDOWS_REGISTRY = {
+    "chrome": [("HKEY_CURRENT_USER", r"Software\Google\Chrome\BLBeacon", "version")],
+    "edge": [("HKEY_CURRENT_USER", r"Software\Microsoft\Edge\BLBeacon", "version")],
+    "firefox": [("HKEY_LOCAL_MACHINE", r"SOFTWARE\Mozilla\Mozilla Firefox", "CurrentVersion")],
+}
+
+
+def detect_browser_version(browser: str) -> str:
+    """探测本机浏览器版本（探测失败返回空字符串）"""
+    if sys.platform.startswith("win"):
+        import winreg
+
+        for hive, key, value in _WINDOWS_REGISTRY.get(browser, []):
+            try:
+                with winreg.OpenKey(getattr(winreg, hive), key) as handle:
+                    version = str(winreg.QueryValueEx(handle, value)[0])
+                return version.split(" ")[0]
+            except OSError:
+                continue
+        return ""
+
+    for binary in _BROWSER_BINARIES.get(browser, []):
+        executable = binary if os.path.isabs(binary) else shutil.which(binary)
+        if not executable or not os.path.exists(executable):
+            continue
+        try:
+            output = subprocess.run(
+                [executable, "--version"], capture_output=True, text=True, timeout=10
+            ).stdout
+        except (OSError, subprocess.SubprocessError):
+            continue
+        # 例如 "Google Chrome 120.0.6099.109" / "Mozilla Firefox 121.0"
+        for token in reversed(output.split()):
+            if token[:1].isdigit():
+                return token
+    return ""
+
+
+class DriverCache:
+    """驱动可执行文件路径的磁盘缓存
+
+    key = "<browser>:<浏览器版本>"，value = 解析出的驱动路径等信息。
+    命中时直接用缓存路径启动，跳过 Selenium Manager / webdriver-manager 的探测；
+    缓存文件的读-改-写由文件锁保护，多个 worker 进程同时解析时只有一个真正去探测。
+    """
+
+    _stats = {"hits": 0, "misses": 0}
+    _stats_lock = threading.Lock()
+    _versions = {}  # 同一进程内浏览器版本只探测一次
+
+    @staticmethod
+    def path() -> str:
+        return os.path.join(getattr(Config, "CACHE_DIR", ".cache/"), "driver_cache.json")
+
+    @staticmethod
+    def key(browser: str) -> str:
+        if browser not in DriverCache._versions:
+            DriverCache._versions[browser] = detect_browser_version(browser)
+        return f"{browser}:{DriverCache._versions[browser] or 'unknown'}"
+
+    @staticmethod
+    def _read() -> dict:
+        try:
+            with open(DriverCache.path(), encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def _write(data: dict) -> None:
+        path = DriverCache.path()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, path)
+
+    @staticmethod
+    def _count(name: str) -> None:
+        with DriverCache._stats_lock:
+            DriverCache._stats[name] += 1
+
+    @staticmethod
+    def lookup(browser: str):
+        """查缓存（不加锁的快速路径）；缓存的驱动文件已不存在视为未命中"""
+        entry = DriverCache._read().get(DriverCache.key(browser))
+        if entry and os.path.isfile(entry.get("driver_path", "")):
+            return entry
+        return None
+
+    @staticmethod
+    def resolve(browser: str, resolver, refresh: bool = False):
+        """返回 (driver_path, from_cache)
+
+        resolver()：未命中时调用，返回 (driver_path, resolved_by)
+        refresh=True：忽略已有缓存强制重新解析（例如缓存的驱动和浏览器版本不匹配）
+        """
+        key = DriverCache.key(browser)
+        if not refresh:
+            entry = DriverCache.lookup(browser)
+            if entry:
+                DriverCache._count("hits")
+                return entry["driver_path"], True
+
+        with FileLock(DriverCache.path() + ".lock"):
+            # 拿到锁后再查一次：可能别的进程刚刚解析完
+            data = DriverCache._read()
+            entry = data.get(key)
+            if entry and not refresh and os.path.isfile(entry.get("driver_path", "")):
+                DriverCache._count("hits")
+                return entry["driver_path"], True
+
+            DriverCache._count("misses")
+            driver_path, resolved_by = resolver()
+            data[key] = {
+                "driver_path": str(driver_path),
+                "browser_version": key.split(":", 1)[1],
+                "resolved_by": resolved_by,
+                "resolved_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            }
+            DriverCache._write(data)
+            return str(driver_path), False
+
+    @staticmethod
+    def stats() -> dict:
+        with DriverCache._stats_lock:
+            return dict(DriverCache._stats)
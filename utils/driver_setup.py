@@ -1,19 +1,32 @@
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
 from selenium.webdriver.chrome.service import Service as ChromeService
 from selenium.webdriver.chrome.options import Options as ChromeOptions
 from selenium.webdriver.firefox.service import Service as FirefoxService
 from selenium.webdriver.firefox.options import Options as FirefoxOptions
 from selenium.webdriver.edge.service import Service as EdgeService
 from selenium.webdriver.edge.options import Options as EdgeOptions
+from selenium.webdriver.common.driver_finder import DriverFinder
+from urllib3.exceptions import HTTPError
 
 from webdriver_manager.chrome import ChromeDriverManager
 from webdriver_manager.firefox import GeckoDriverManager
 from webdriver_manager.microsoft import EdgeChromiumDriverManager
 
 from config import Config
+from utils.driver_cache import DriverCache
+from utils.lifecycle import driver_lifecycle
+from utils.tracer import tracer
+
+# 会话已不可用时 selenium 抛出的异常：浏览器报错是 WebDriverException；驱动进程已退出（崩溃、被看门狗结束）
+# 时请求连不上驱动服务，抛出的是 urllib3 的 MaxRetryError 等 HTTPError 或底层的 OSError
+SESSION_ERRORS = (WebDriverException, HTTPError, OSError)
 
 
 class DriverSetup:
@@ -24,77 +37,493 @@ class DriverSetup:
         report_dir.mkdir(parents=True, exist_ok=True)
         screenshot_dir.mkdir(parents=True, exist_ok=True)
 
+    @staticmethod
+    def _probe_driver_path(browser, service_cls, options):
+        """真正去探测驱动路径：Selenium Manager（优先）> webdriver-manager（兜底）
+
+        返回 (driver_path, resolved_by)
+        """
+        try:
+            return DriverFinder.get_path(service_cls(), options), "selenium-manager"
+        except Exception:
+            pass
+
+        if browser == "chrome":
+            return ChromeDriverManager().install(), "webdriver-manager"
+        if browser == "firefox":
+            return GeckoDriverManager().install(), "webdriver-manager"
+        # webdriver-manager（兜底：把下载源从 azureedge 换成 microsoft.com）
+        url = getattr(Config, "EDGE_WDM_URL", "https://msedgedriver.microsoft.com/")
+        latest = getattr(Config, "EDGE_WDM_LATEST_RELEASE_URL", "https://msedgedriver.microsoft.com/LATEST_RELEASE")
+        return EdgeChromiumDriverManager(url=url, latest_release_url=latest).install(), "webdriver-manager"
+
+    @staticmethod
+    def _launch(browser, driver_cls, service_cls, options, local=""):
+        """启动浏览器：本地驱动 > 磁盘缓存的驱动路径 > 重新探测（结果写回缓存）"""
+        if local and Path(local).exists():
+            return driver_cls(service=service_cls(executable_path=local), options=options)
+
+        def resolver():
+            return DriverSetup._probe_driver_path(browser, service_cls, options)
+
+        path, from_cache = DriverCache.resolve(browser, resolver)
+        try:
+            return driver_cls(service=service_cls(executable_path=path), options=options)
+        except WebDriverException:
+            if not from_cache:
+                raise
+            # 缓存的驱动不可用（例如浏览器刚升级、版本不匹配）：作废缓存重新探测一次
+            path, _ = DriverCache.resolve(browser, resolver, refresh=True)
+            return driver_cls(service=service_cls(executable_path=path), options=options)
+
+    @staticmethod
+    def profile(name=None) -> dict:
+        """当前驱动配置档（Config.DRIVER_PROFILE），返回带 name 字段的 dict"""
+        name = (name or getattr(Config, "DRIVER_PROFILE", "fidelity") or "fidelity").lower().strip()
+        profiles = getattr(Config, "DRIVER_PROFILES", {})
+        if name not in profiles:
+            raise ValueError(f"未知的驱动配置档: {name}（可选: {', '.join(profiles)}）")
+        return {"name": name, **profiles[name]}
+
+    @staticmethod
+    def apply_network_profile(driver, profile=None) -> bool:
+        """按配置档拦截资源（DevTools Network.setBlockedURLs，只作用于当前窗口/标签页）
+
+        非 Chromium 浏览器返回 False。
+        """
+        profile = profile or DriverSetup.profile()
+        if not profile.get("block_urls") or not hasattr(driver, "execute_cdp_cmd"):
+            return False
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": list(profile["block_urls"])})
+        return True
+
     @staticmethod
     def get_driver():
-        """初始化 WebDriver（Windows 友好：本地驱动 > Selenium Manager > webdriver-manager）"""
+        """初始化 WebDriver（Windows 友好：本地驱动 > 缓存的驱动路径 > Selenium Manager > webdriver-manager）"""
         DriverSetup._ensure_dirs()
+        started = time.perf_counter()
 
         browser = (getattr(Config, "BROWSER", "edge") or "edge").lower().strip()
-        headless = bool(getattr(Config, "HEADLESS", False))
+        profile = DriverSetup.profile()
+        headless = profile["headless"] if profile.get("headless") is not None else bool(getattr(Config, "HEADLESS", False))
 
         if browser == "chrome":
             options = ChromeOptions()
             if headless:
                 options.add_argument("--headless=new")
             options.add_argument("--window-size=1920,1080")
+            for arg in profile.get("args", []):
+                options.add_argument(arg)
+            options.page_load_strategy = profile["page_load_strategy"]
 
             local = os.getenv("CHROME_DRIVER_PATH") or getattr(Config, "CHROME_DRIVER_PATH", "")
-            if local and Path(local).exists():
-                service = ChromeService(executable_path=local)
-                driver = webdriver.Chrome(service=service, options=options)
-            else:
-                # Selenium Manager（优先）
-                try:
-                    driver = webdriver.Chrome(options=options)
-                except Exception:
-                    # webdriver-manager（兜底）
-                    service = ChromeService(ChromeDriverManager().install())
-                    driver = webdriver.Chrome(service=service, options=options)
+            driver = DriverSetup._launch(browser, webdriver.Chrome, ChromeService, options, local)
 
         elif browser == "firefox":
             options = FirefoxOptions()
             if headless:
                 options.add_argument("-headless")
+            options.page_load_strategy = profile["page_load_strategy"]
+            if any(p.startswith("*.") and p[2:] in ("png", "jpg") for p in profile.get("block_urls", [])):
+                # Firefox 没有 CDP 的 URL 拦截：退而求其次，只禁止加载图片
+                options.set_preference("permissions.default.image", 2)
 
             local = os.getenv("GECKO_DRIVER_PATH") or getattr(Config, "GECKO_DRIVER_PATH", "")
-            if local and Path(local).exists():
-                service = FirefoxService(executable_path=local)
-                driver = webdriver.Firefox(service=service, options=options)
-            else:
-                try:
-                    driver = webdriver.Firefox(options=options)
-                except Exception:
-                    service = FirefoxService(GeckoDriverManager().install())
-                    driver = webdriver.Firefox(service=service, options=options)
+            driver = DriverSetup._launch(browser, webdriver.Firefox, FirefoxService, options, local)
 
         elif browser == "edge":
             options = EdgeOptions()
             if headless:
                 options.add_argument("--headless=new")
             options.add_argument("--window-size=1920,1080")
+            for arg in profile.get("args", []):
+                options.add_argument(arg)
+            options.page_load_strategy = profile["page_load_strategy"]
 
             # 1) 本地驱动（最稳，推荐）
             local = os.getenv("EDGE_DRIVER_PATH") or getattr(Config, "EDGE_DRIVER_PATH", "")
-            if local and Path(local).exists():
-                service = EdgeService(executable_path=local)
-                driver = webdriver.Edge(service=service, options=options)
-            else:
-                # 2) Selenium Manager（优先）
-                try:
-                    driver = webdriver.Edge(options=options)
-                except Exception:
-                    # 3) webdriver-manager（兜底：把下载源从 azureedge 换成 microsoft.com）
-                    url = getattr(Config, "EDGE_WDM_URL", "https://msedgedriver.microsoft.com/")
-                    latest = getattr(Config, "EDGE_WDM_LATEST_RELEASE_URL", "https://msedgedriver.microsoft.com/LATEST_RELEASE")
-                    path = EdgeChromiumDriverManager(url=url, latest_release_url=latest).install()
-                    service = EdgeService(executable_path=path)
-                    driver = webdriver.Edge(service=service, options=options)
+            driver = DriverSetup._launch(browser, webdriver.Edge, EdgeService, options, local)
         else:
             raise ValueError(f"不支持的浏览器: {browser}")
 
-        driver.implicitly_wait(getattr(Config, "IMPLICIT_WAIT", 10))
+        driver_lifecycle.track(driver)
         try:
-            driver.maximize_window()
+            if getattr(Config, "PROFILE_COMMANDS", False):
+                # 命令级性能分析（关闭时不包装 driver，没有额外开销）
+                from utils.profiler import command_profiler
+
+                command_profiler.attach(driver)
+                command_profiler.record("launchBrowser", (time.perf_counter() - started) * 1000, target=browser, caller="")
+
+            if tracer.enabled():
+                tracer.complete("launchBrowser", "webdriver", int(started * 1_000_000), {"target": browser})
+                tracer.attach(driver)
+
+            DriverSetup.apply_network_profile(driver, profile)
+
+            implicit_wait = getattr(Config, "IMPLICIT_WAIT", 0)
+            if implicit_wait:
+                driver.implicitly_wait(implicit_wait)
+            driver.set_script_timeout(getattr(Config, "SCRIPT_TIMEOUT", 30))
+            try:
+                driver.maximize_window()
+            except Exception:
+                pass
+        except BaseException:
+            # 浏览器已经启动：配置失败时不能把驱动 / 浏览器进程留在后台
+            driver_lifecycle.discard(driver)
+            raise
+        return driver
+
+    @staticmethod
+    def reset_driver(driver) -> bool:
+        """把浏览器恢复到“干净”状态，供下一个用例复用
+
+        - 关闭多余窗口，只保留第一个
+        - 清空当前站点的 cookies / localStorage / sessionStorage
+        - 导航到 about:blank
+
+        返回 False 表示会话已损坏（浏览器崩溃、驱动断开等），调用方应丢弃该 driver。
+        """
+        try:
+            handles = driver.window_handles
+            for handle in handles[1:]:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(handles[0])
+
+            driver.delete_all_cookies()
+            driver.execute_script(
+                "try { window.localStorage.clear(); window.sessionStorage.clear(); } catch (e) {}"
+            )
+            driver.get("about:blank")
+            return True
+        except SESSION_ERRORS:
+            return False
+
+    @staticmethod
+    def is_alive(driver) -> bool:
+        """会话是否仍可用（一次轻量 HTTP 往返）"""
+        try:
+            return bool(driver.window_handles)
+        except SESSION_ERRORS:
+            return False
+
+    @staticmethod
+    def quit_quietly(driver) -> None:
+        """关闭 driver，忽略会话已失效时的异常"""
+        try:
+            driver.quit()
         except Exception:
             pass
+        driver_lifecycle.untrack(driver)
+
+    @staticmethod
+    def create_provider(mode=None):
+        """按 Config.DRIVER_MODE 创建 driver 提供者（acquire / release / close）"""
+        mode = (mode or getattr(Config, "DRIVER_MODE", "pool") or "pool").lower().strip()
+        if mode == "pool":
+            return DriverPool(size=getattr(Config, "DRIVER_POOL_SIZE", 1))
+        if mode == "per_test":
+            return PerTestDriverProvider()
+        if mode == "context":
+            return BrowserContextProvider()
+        if mode == "spare":
+            return SpareDriverLauncher(
+                spares=getattr(Config, "DRIVER_SPARES", 1),
+                max_parallel=getattr(Config, "DRIVER_MAX_PARALLEL_LAUNCHES", 2),
+            )
+        raise ValueError(f"不支持的驱动模式: {mode}")
+
+
+class PerTestDriverProvider:
+    """每个用例一个全新浏览器（原有行为）"""
+
+    def acquire(self):
+        return DriverSetup.get_driver()
+
+    def release(self, driver, broken: bool = False) -> None:
+        DriverSetup.quit_quietly(driver)
+
+    def close(self) -> None:
+        pass
+
+
+class DriverPool:
+    """会话级 WebDriver 池
+
+    - acquire()：租出一个已启动的浏览器，池里没有空闲的就新建
+    - release()：归还前做快速状态重置；重置失败说明会话已损坏，直接回收（quit）
+    - close()：会话结束时关闭所有浏览器
+    """
+
+    def __init__(self, size: int = 1, factory=None):
+        self.size = max(1, int(size))
+        self._factory = factory or DriverSetup.get_driver
+        self._idle = []
+        self._leased = []
+        self._lock = threading.Lock()
+        self.stats = {"created": 0, "reused": 0, "recycled": 0}
+
+    def acquire(self):
+        with self._lock:
+            driver = self._idle.pop() if self._idle else None
+
+        # 空闲期间浏览器可能被关掉/崩溃：租出前做一次轻量探活
+        if driver is not None and not DriverSetup.is_alive(driver):
+            DriverSetup.quit_quietly(driver)
+            driver = None
+            with self._lock:
+                self.stats["recycled"] += 1
+
+        if driver is not None:
+            with self._lock:
+                self.stats["reused"] += 1
+        else:
+            driver = self._factory()
+            with self._lock:
+                self.stats["created"] += 1
+
+        with self._lock:
+            self._leased.append(driver)
         return driver
+
+    def release(self, driver, broken: bool = False) -> None:
+        with self._lock:
+            if driver in self._leased:
+                self._leased.remove(driver)
+
+        if not broken and DriverSetup.reset_driver(driver):
+            with self._lock:
+                if len(self._idle) < self.size:
+                    self._idle.append(driver)
+                    return
+        else:
+            with self._lock:
+                self.stats["recycled"] += 1
+
+        DriverSetup.quit_quietly(driver)
+
+    def close(self) -> None:
+        with self._lock:
+            drivers = self._idle + self._leased
+            self._idle = []
+            self._leased = []
+        for driver in drivers:
+            DriverSetup.quit_quietly(driver)
+
+
+def _available_memory_mb():
+    """当前可用内存（MB）；没装 psutil 时返回 None（不做内存限制）"""
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.virtual_memory().available / (1024 * 1024)
+
+
+class SpareDriverLauncher:
+    """预热备用浏览器：每个用例仍然拿到全新的浏览器，但启动耗时在后台提前完成
+
+    - 后台线程始终保持 spares 个“已启动、未使用”的浏览器
+    - acquire()：直接取一个备用的，同时立即开始启动下一个补位
+    - release()：用完即 quit（后台进行，不阻塞用例收尾）
+    - 同时启动的浏览器数受 max_parallel 限制；装了 psutil 时按可用内存收缩备用数量
+    - close()：会话结束时回收所有没用上的备用浏览器
+    """
+
+    def __init__(self, spares: int = 1, max_parallel: int = 2, factory=None):
+        self.spares = max(0, int(spares))
+        self._factory = factory or DriverSetup.get_driver
+        self._launcher = ThreadPoolExecutor(max_workers=max(1, int(max_parallel)), thread_name_prefix="spare-driver")
+        self._quitter = ThreadPoolExecutor(max_workers=1, thread_name_prefix="driver-quit")
+        self._cond = threading.Condition()
+        self._ready = []
+        self._pending = 0
+        self._closed = False
+        self.stats = {"launched": 0, "warm": 0, "cold": 0, "failed": 0, "reaped": 0}
+        self._top_up()
+
+    def _allowed_by_memory(self) -> int:
+        available = _available_memory_mb()
+        if available is None:
+            return self.spares
+        per_browser = getattr(Config, "DRIVER_SPARE_MEMORY_MB", 400)
+        reserve = getattr(Config, "DRIVER_MEMORY_RESERVE_MB", 1024)
+        # 正在启动的浏览器还没占满内存，按预估值先扣掉
+        free = available - reserve - self._pending * per_browser
+        return max(0, int(free // per_browser))
+
+    def _top_up(self) -> None:
+        with self._cond:
+            if self._closed:
+                return
+            need = self.spares - len(self._ready) - self._pending
+            need = min(need, self._allowed_by_memory())
+            for _ in range(max(0, need)):
+                self._pending += 1
+                self._launcher.submit(self._launch_one)
+
+    def _launch_one(self) -> None:
+        try:
+            driver = self._factory()
+        except Exception:
+            driver = None
+
+        with self._cond:
+            self._pending -= 1
+            if driver is None:
+                self.stats["failed"] += 1
+            else:
+                self.stats["launched"] += 1
+                if not self._closed:
+                    self._ready.append(driver)
+                    driver = None
+            self._cond.notify_all()
+
+        if driver is not None:
+            # 会话已经结束：刚启动好的浏览器直接回收
+            DriverSetup.quit_quietly(driver)
+            with self._cond:
+                self.stats["reaped"] += 1
+
+    def acquire(self):
+        with self._cond:
+            # 有正在启动的就等它（比从头再启动一个快）
+            while not self._ready and self._pending and not self._closed:
+                self._cond.wait(timeout=1)
+            driver = self._ready.pop(0) if self._ready else None
+
+        if driver is not None and not DriverSetup.is_alive(driver):
+            DriverSetup.quit_quietly(driver)
+            driver = None
+
+        if driver is not None:
+            with self._cond:
+                self.stats["warm"] += 1
+            self._top_up()
+            return driver
+
+        # 没有可用的备用浏览器（后台启动失败或内存不足）：同步启动
+        self._top_up()
+        driver = self._factory()
+        with self._cond:
+            self.stats["cold"] += 1
+        return driver
+
+    def release(self, driver, broken: bool = False) -> None:
+        self._quitter.submit(DriverSetup.quit_quietly, driver)
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            drivers, self._ready = self._ready, []
+        for driver in drivers:
+            DriverSetup.quit_quietly(driver)
+        with self._cond:
+            self.stats["reaped"] += len(drivers)
+        # 等待仍在启动中的浏览器（启动完成后会被 _launch_one 回收）和后台 quit
+        self._launcher.shutdown(wait=True)
+        self._quitter.shutdown(wait=True)
+
+
+class BrowserContextProvider:
+    """一个浏览器进程 + 每个用例一个独立的浏览器上下文（仅 Chromium：chrome / edge）
+
+    通过 DevTools 的 Target.createBrowserContext 创建类似无痕窗口的上下文：
+    cookies / localStorage / 缓存互相隔离，但共用同一个浏览器进程，省掉进程启动和大部分内存。
+    每个用例拿到的是同一个 driver，只是已切换到该上下文里的新窗口，页面对象无需改动。
+
+    注意：同一个 WebDriver 会话同一时刻只能操作一个窗口，因此一个提供者只服务串行执行的用例；
+    并行请使用 run_tests.py --workers（每个 worker 各自一个浏览器进程）。
+    """
+
+    def __init__(self, factory=None):
+        self._factory = factory or DriverSetup.get_driver
+        self._driver = None
+        self._anchor = None  # 默认上下文里的初始窗口：关掉最后一个窗口会结束会话，所以一直保留
+        self._leases = {}  # driver 窗口句柄 -> browserContextId
+        self._lock = threading.Lock()
+        # 上下文准备耗时只保留总和与最大值（每个用例一次，不随用例数增长）
+        self.stats = {"contexts": 0, "browsers": 0, "setup_ms_total": 0.0, "setup_ms_max": 0.0}
+
+    def _browser(self):
+        if self._driver is not None and not DriverSetup.is_alive(self._driver):
+            DriverSetup.quit_quietly(self._driver)
+            self._driver = None
+        if self._driver is None:
+            browser = (getattr(Config, "BROWSER", "edge") or "edge").lower().strip()
+            if browser not in ("chrome", "edge"):
+                raise ValueError(f"context 模式只支持 chrome / edge，当前浏览器: {browser}")
+            self._driver = self._factory()
+            self._anchor = self._driver.current_window_handle
+            self.stats["browsers"] += 1
+        return self._driver
+
+    def acquire(self):
+        with self._lock:
+            started = time.perf_counter()
+            driver = self._browser()
+            context_id = driver.execute_cdp_cmd("Target.createBrowserContext", {"disposeOnDetach": False})["browserContextId"]
+            try:
+                target_id = driver.execute_cdp_cmd(
+                    "Target.createTarget", {"url": "about:blank", "browserContextId": context_id, "newWindow": True}
+                )["targetId"]
+                # ChromeDriver 的窗口句柄就是 DevTools 的 targetId
+                driver.switch_to.window(target_id)
+                # 资源拦截按标签页生效，新窗口要重新设置
+                DriverSetup.apply_network_profile(driver)
+            except Exception:
+                # 上下文已经建好但没能租出：销毁它（连同其中的窗口），切回锚点窗口，租约表保持不变
+                self._dispose(driver, context_id)
+                try:
+                    driver.switch_to.window(self._anchor)
+                except SESSION_ERRORS:
+                    pass
+                raise
+            self._leases[target_id] = context_id
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self.stats["contexts"] += 1
+            self.stats["setup_ms_total"] = round(self.stats["setup_ms_total"] + elapsed_ms, 1)
+            self.stats["setup_ms_max"] = round(max(self.stats["setup_ms_max"], elapsed_ms), 1)
+            return driver
+
+    def release(self, driver, broken: bool = False) -> None:
+        with self._lock:
+            handle = None
+            try:
+                handle = driver.current_window_handle
+            except SESSION_ERRORS:
+                broken = True
+            context_id = self._leases.pop(handle, None)
+            if broken or context_id is None:
+                # 用例把会话弄坏了（或切走了窗口）：整个浏览器重来，保证隔离
+                for leftover in self._leases.values():
+                    self._dispose(driver, leftover)
+                self._leases.clear()
+                DriverSetup.quit_quietly(driver)
+                self._driver = None
+                return
+            # 先切回锚点窗口，再销毁上下文（会一并关闭用例在该上下文里打开的所有窗口）
+            try:
+                driver.switch_to.window(self._anchor)
+            except SESSION_ERRORS:
+                DriverSetup.quit_quietly(driver)
+                self._driver = None
+                return
+            self._dispose(driver, context_id)
+
+    @staticmethod
+    def _dispose(driver, context_id) -> None:
+        try:
+            driver.execute_cdp_cmd("Target.disposeBrowserContext", {"browserContextId": context_id})
+        except SESSION_ERRORS:
+            pass
+
+    def close(self) -> None:
+        with self._lock:
+            if self._driver is not None:
+                DriverSetup.quit_quietly(self._driver)
+                self._driver = None
+            self._leases.clear()
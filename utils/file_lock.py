@@ -0,0 +1,150 @@
+import os
+import threading
+import time
+import uuid
+
+
+class FileLock:
+    """跨进程文件锁（基于 O_CREAT | O_EXCL 创建锁文件，Windows / Linux 通用）
+
+    用法：
+        with FileLock("reports/.cache/drivers.json.lock"):
+            ...  # 读-改-写共享文件
+
+    持锁期间后台线程定期刷新锁文件的修改时间；持锁进程异常退出后不再刷新，
+    超过 stale_after 秒没有刷新即视为失效并强制接管（stale_after 必须小于 timeout，
+    否则等待方在锁失效前就已超时）。
+
+    锁文件内容是持有者的唯一令牌（pid:随机串）：接管失效锁时先原子 rename 到本进程独有的
+    文件名再核对令牌，多个等待方同时发现失效时只有一个能接管，不会删掉别人刚建好的新锁；
+    释放和心跳也只作用于仍写着自己令牌的锁文件。
+    """
+
+    def __init__(self, path: str, timeout: float = 300, stale_after: float = 30, poll_interval: float = 0.1):
+        if stale_after >= timeout:
+            raise ValueError(f"stale_after（{stale_after}）必须小于 timeout（{timeout}）")
+        self.path = path
+        self.timeout = timeout
+        self.stale_after = stale_after
+        self.poll_interval = poll_interval
+        self._fd = None
+        self._token = None
+        self._stop = None
+        self._heartbeat = None
+
+    def acquire(self) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        deadline = time.monotonic() + self.timeout
+        token = f"{os.getpid()}:{uuid.uuid4().hex}"
+        while True:
+            try:
+                self._fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                os.write(self._fd, token.encode("ascii"))
+                self._token = token
+                self._start_heartbeat()
+                return
+            except FileExistsError:
+                self._break_if_stale()
+                if time.monotonic() >= deadline:
+                    raise TimeoutError(f"获取文件锁超时: {self.path}")
+                time.sleep(self.poll_interval)
+
+    def _read_token(self, path: str):
+        try:
+            with open(path, "r", encoding="ascii", errors="replace") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _break_if_stale(self) -> None:
+        """锁文件超过 stale_after 秒未刷新时接管：rename 到独有文件名后核对令牌，确认拿到的正是那把失效锁才删除"""
+        try:
+            # 令牌和修改时间从同一个打开的文件读取，不会把失效锁的时间和新锁的令牌拼在一起
+            with open(self.path, "r", encoding="ascii", errors="replace") as f:
+                stale_token = f.read()
+                if time.time() - os.fstat(f.fileno()).st_mtime <= self.stale_after:
+                    return
+        except OSError:
+            return
+        claimed = f"{self.path}.stale.{os.getpid()}.{uuid.uuid4().hex}"
+        try:
+            os.rename(self.path, claimed)
+        except OSError:
+            return  # 锁文件已被别的等待方接管或释放
+        if self._read_token(claimed) == stale_token:
+            try:
+                os.remove(claimed)
+            except OSError:
+                pass
+            return
+        # 看到失效到 rename 之间锁已被别人接管并重建：把这把新锁原样放回（link 不会覆盖已存在的文件）
+        try:
+            os.link(claimed, self.path)
+        except OSError:
+            # 放回之前又有第三方建了锁：被挪走的仍是一把活锁，保留它，由持有者释放时按令牌清理
+            return
+        try:
+            os.remove(claimed)
+        except OSError:
+            pass
+
+    def _owned(self) -> bool:
+        return self._token is not None and self._read_token(self.path) == self._token
+
+    def _remove_displaced(self) -> None:
+        """删除被等待方挪走（*.stale.*）且没能放回、仍写着自己令牌的锁文件"""
+        directory = os.path.dirname(self.path) or "."
+        prefix = os.path.basename(self.path) + ".stale."
+        try:
+            names = [n for n in os.listdir(directory) if n.startswith(prefix)]
+        except OSError:
+            return
+        for name in names:
+            path = os.path.join(directory, name)
+            if self._read_token(path) == self._token:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def _start_heartbeat(self) -> None:
+        """持锁期间每 stale_after / 3 秒刷新一次修改时间，长时间持锁（下载驱动等）不会被误判为失效"""
+        self._stop = threading.Event()
+
+        def beat(stop=self._stop):
+            while not stop.wait(self.stale_after / 3):
+                if not self._owned():
+                    return
+                try:
+                    os.utime(self.path)
+                except OSError:
+                    return
+
+        self._heartbeat = threading.Thread(target=beat, name="file-lock-heartbeat", daemon=True)
+        self._heartbeat.start()
+
+    def release(self) -> None:
+        if self._fd is None:
+            return
+        self._stop.set()
+        self._heartbeat.join()
+        os.close(self._fd)
+        self._fd = None
+        owned = self._owned()
+        if not owned:
+            # 锁文件已被挪走或属于别的持有者：不动它，只清理挪走后没能放回的自己那份
+            self._remove_displaced()
+            self._token = None
+            return
+        self._token = None
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
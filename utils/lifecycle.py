@@ -0,0 +1,396 @@
+import atexit
+import json
+import os
+import re
+import signal
+import subprocess
+import sys
+import threading
+import time
+import traceback
+import _thread
+
+from config import Config
+from utils.file_lock import FileLock
+from utils.logger import get_logger
+
+
+def _psutil():
+    """装了 psutil 时用它查询进程（跨平台）；没装时 Linux 读 /proc，其他平台只能结束已知 pid"""
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil
+
+
+def _proc_stat(pid):
+    """/proc/<pid>/stat -> (进程名, ppid, 启动时刻 jiffies, 状态)；读不到返回 None"""
+    try:
+        with open(f"/proc/{pid}/stat", "rb") as f:
+            data = f.read().decode("utf-8", "replace")
+    except OSError:
+        return None
+    fields = data[data.rindex(")") + 2:].split()
+    return data[data.index("(") + 1:data.rindex(")")], int(fields[1]), int(fields[19]), fields[0]
+
+
+def _start_time(pid):
+    """进程的启动时刻（同一 pid 被系统复用时会变化）；进程不存在 / 已是僵尸 / 无法查询时返回 None"""
+    ps = _psutil()
+    if ps is not None:
+        try:
+            process = ps.Process(pid)
+            if process.status() == ps.STATUS_ZOMBIE:
+                return None
+            return process.create_time()
+        except ps.Error:
+            return None
+    stat = _proc_stat(pid)
+    if stat is None or stat[3] in ("Z", "X"):
+        return None
+    return stat[2]
+
+
+def _alive(pid, start) -> bool:
+    """pid 仍是登记时的那个进程（start 不一致说明 pid 已被复用，不能动它）"""
+    current = _start_time(int(pid))
+    return current is not None and current == start
+
+
+def _descendants(pid) -> list:
+    ps = _psutil()
+    if ps is not None:
+        try:
+            return [child.pid for child in ps.Process(pid).children(recursive=True)]
+        except ps.Error:
+            return []
+    if not os.path.isdir("/proc"):
+        return []
+    children = {}
+    for name in os.listdir("/proc"):
+        if name.isdigit():
+            stat = _proc_stat(name)
+            if stat is not None:
+                children.setdefault(stat[1], []).append(int(name))
+    found, pending = [], [pid]
+    while pending:
+        for child in children.get(pending.pop(), []):
+            found.append(child)
+            pending.append(child)
+    return found
+
+
+def _rss_mb(pid) -> float:
+    ps = _psutil()
+    if ps is not None:
+        try:
+            return ps.Process(pid).memory_info().rss / (1024 * 1024)
+        except ps.Error:
+            return 0.0
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return 0.0
+
+
+def _kill(pid) -> bool:
+    ps = _psutil()
+    try:
+        if ps is not None:
+            ps.Process(pid).kill()
+        elif sys.platform == "win32":
+            subprocess.run(["taskkill", "/F", "/T", "/PID", str(pid)], capture_output=True, timeout=30, check=True)
+        else:
+            os.kill(pid, signal.SIGKILL)
+        return True
+    except Exception:
+        return False
+
+
+def _kill_pids(pids) -> tuple:
+    """按 {pid: 启动时刻} 结束仍存活的进程，返回 (结束的进程数, 回收的内存 MB)"""
+    targets = [int(pid) for pid, start in pids.items() if _alive(pid, start)]
+    memory = sum(_rss_mb(pid) for pid in targets)
+    killed = sum(1 for pid in targets if _kill(pid))
+    return killed, memory
+
+
+def _service_pid(driver):
+    """本地驱动服务进程（chromedriver / msedgedriver / geckodriver）的 pid；远程 / 回放 driver 返回 None"""
+    process = getattr(getattr(driver, "service", None), "process", None)
+    return getattr(process, "pid", None)
+
+
+class DriverLifecycle:
+    """跟踪本进程启动的每个 driver：驱动服务进程及其浏览器进程树
+
+    - track()：get_driver 启动后登记；进程树（pid + 启动时刻）同时写入 Config.CACHE_DIR 下的登记文件
+    - untrack()：正常 quit 后注销
+    - kill()：强制结束某个 driver 的整棵进程树（看门狗超时、启动后配置失败时使用）
+    - reap_session()：会话结束时结束本进程遗留的驱动 / 浏览器进程
+    - reap_stale()：启动时清理登记文件里已退出的进程（上次运行崩溃、被 CI 杀掉）遗留的进程
+
+    登记的启动时刻用来识别 pid 复用：不一致的 pid 一律不动。
+    """
+
+    def __init__(self):
+        self._records = {}
+        self._lock = threading.Lock()
+        self._atexit = False
+        self.stats = {
+            "tracked": 0, "killed_processes": 0, "reclaimed_mb": 0.0,
+            "stale_processes": 0, "stale_mb": 0.0, "timeouts": 0,
+        }
+
+    @staticmethod
+    def path() -> str:
+        return os.path.join(getattr(Config, "CACHE_DIR", ".cache/"), "driver_processes.json")
+
+    def track(self, driver) -> None:
+        pid = _service_pid(driver)
+        if pid is None:
+            return
+        pids = {}
+        for p in [pid] + _descendants(pid):
+            start = _start_time(p)
+            if start is not None:
+                pids[str(p)] = start
+        with self._lock:
+            self._records[id(driver)] = {"driver": driver, "pid": pid, "pids": pids, "started": time.time()}
+            self.stats["tracked"] += 1
+            if not self._atexit:
+                # 不经过 pytest 的脚本（main.py、utils.load）异常退出时也回收
+                atexit.register(self.reap_session)
+                self._atexit = True
+        self._persist()
+
+    def untrack(self, driver) -> None:
+        with self._lock:
+            record = self._records.pop(id(driver), None)
+        if record is not None:
+            self._persist()
+
+    def drivers_since(self, started) -> list:
+        with self._lock:
+            return [r["driver"] for r in self._records.values() if r["started"] >= started]
+
+    def kill(self, driver) -> tuple:
+        """强制结束 driver 的进程树（不发 quit，会话可能已经卡死），返回 (进程数, MB)"""
+        with self._lock:
+            record = self._records.pop(id(driver), None)
+        if record is None:
+            return 0, 0.0
+        killed, memory = self._kill_record(record)
+        self._persist()
+        return killed, memory
+
+    def discard(self, driver) -> None:
+        """启动后配置失败等场景：先尝试正常 quit，残留的进程再强制结束"""
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        self.kill(driver)
+
+    def count_timeout(self) -> None:
+        with self._lock:
+            self.stats["timeouts"] += 1
+
+    def _kill_record(self, record) -> tuple:
+        pids = dict(record["pids"])
+        # 登记之后才启动的子进程（新窗口 / 渲染进程）也要算上
+        for p in _descendants(record["pid"]):
+            start = _start_time(p)
+            if start is not None:
+                pids.setdefault(str(p), start)
+        if not pids and sys.platform == "win32":
+            # Windows 没装 psutil 时查不到进程树：taskkill /T 按父子关系结束整棵树
+            # （driver 的 Popen 句柄还开着，pid 不会被复用）
+            killed, memory = (1, 0.0) if _kill(record["pid"]) else (0, 0.0)
+        else:
+            killed, memory = _kill_pids(pids)
+        with self._lock:
+            self.stats["killed_processes"] += killed
+            self.stats["reclaimed_mb"] += memory
+        return killed, memory
+
+    def reap_session(self) -> dict:
+        """结束本进程登记过、但仍在运行的驱动 / 浏览器进程（正常 quit 过的已不存在，不受影响）"""
+        with self._lock:
+            records = list(self._records.values())
+            self._records.clear()
+        for record in records:
+            killed, memory = self._kill_record(record)
+            if killed:
+                get_logger().warning("回收遗留的浏览器进程: 驱动 pid=%s，结束 %s 个进程，约 %.0f MB", record["pid"], killed, memory)
+        self._persist()
+        return dict(self.stats)
+
+    def reap_stale(self) -> dict:
+        """清理登记文件里属于已退出进程的驱动 / 浏览器进程（同时运行的其他 worker 不受影响）"""
+        path = self.path()
+        if not os.path.exists(path):
+            return dict(self.stats)
+        with FileLock(path + ".lock"):
+            registry = self._read(path)
+            for owner, entry in list(registry.items()):
+                if int(owner) == os.getpid() or _alive(owner, entry.get("start")):
+                    continue
+                killed, memory = _kill_pids(entry.get("pids", {}))
+                if killed:
+                    get_logger().warning("清理上次运行遗留的浏览器进程: 属主 pid=%s，结束 %s 个进程，约 %.0f MB", owner, killed, memory)
+                with self._lock:
+                    self.stats["stale_processes"] += killed
+                    self.stats["stale_mb"] += memory
+                del registry[owner]
+            self._write(path, registry)
+        return dict(self.stats)
+
+    def _persist(self) -> None:
+        """把本进程当前登记的进程树写入登记文件（按属主 pid 分开，多个 worker 共用一个文件）"""
+        path = self.path()
+        with self._lock:
+            pids = {}
+            for record in self._records.values():
+                pids.update(record["pids"])
+        owner = str(os.getpid())
+        try:
+            with FileLock(path + ".lock"):
+                registry = self._read(path)
+                if pids:
+                    registry[owner] = {"start": _start_time(os.getpid()), "pids": pids}
+                else:
+                    registry.pop(owner, None)
+                self._write(path, registry)
+        except (OSError, TimeoutError):
+            pass
+
+    @staticmethod
+    def _read(path) -> dict:
+        try:
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def _write(path, registry) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        if not registry:
+            if os.path.exists(path):
+                os.remove(path)
+            return
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(registry, f)
+        os.replace(tmp, path)
+
+
+driver_lifecycle = DriverLifecycle()
+
+
+def dump_stacks(path, header="") -> str:
+    """把所有线程的 Python 调用栈写到文件（看门狗超时时定位卡在哪一步）"""
+    names = {t.ident: t.name for t in threading.enumerate()}
+    lines = [header] if header else []
+    for ident, frame in sys._current_frames().items():
+        lines.append(f"\n--- 线程 {names.get(ident, ident)} ---")
+        lines.extend(line.rstrip("\n") for line in traceback.format_stack(frame))
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    return path
+
+
+class Watchdog:
+    """用例级时间预算（setup + call + teardown 的墙钟时间）
+
+    超时后在看门狗线程里：
+    1. 转储所有线程的调用栈到 Config.WATCHDOG_DIR
+    2. 对用例的浏览器截图（最多等 10 秒，卡死的浏览器可能截不了）
+    3. 强制结束该用例浏览器的进程树：卡在 WebDriver 命令上的主线程随即收到连接错误，用例失败后继续下一个
+    4. 再过 Config.TEST_TIMEOUT_GRACE 秒用例仍未结束（卡在 WebDriver 之外）：中断主线程，结束本次运行
+    """
+
+    def __init__(self, lifecycle):
+        self._lifecycle = lifecycle
+        self._timers = []
+        self._token = 0
+        self._lock = threading.Lock()
+
+    def start(self, item, budget) -> None:
+        self.cancel()
+        if not budget:
+            return
+        with self._lock:
+            token = self._token
+        timer = threading.Timer(budget, self._fire, args=(token, item, budget, time.time()))
+        timer.daemon = True
+        timer.name = "test-watchdog"
+        self._timers.append(timer)
+        timer.start()
+
+    def cancel(self) -> None:
+        with self._lock:
+            self._token += 1
+        for timer in self._timers:
+            timer.cancel()
+        self._timers = []
+
+    def _current(self, token) -> bool:
+        with self._lock:
+            return token == self._token
+
+    def _fire(self, token, item, budget, started) -> None:
+        if not self._current(token):
+            return
+        logger = get_logger()
+        name = re.sub(r"[^\w.-]+", "_", item.nodeid.split("::", 1)[-1]).strip("_")
+        message = f"用例超出时间预算 {budget}s: {item.nodeid}"
+        stacks = dump_stacks(os.path.join(getattr(Config, "WATCHDOG_DIR", "reports/watchdog/"), f"{name}.txt"), message)
+
+        driver = item.funcargs.get("driver") if hasattr(item, "funcargs") else None
+        # 卡在 driver fixture 里（例如启动浏览器）时 funcargs 里还没有 driver：按开始时间找本用例期间启动的
+        drivers = [driver] if driver is not None else self._lifecycle.drivers_since(started)
+        for drv in drivers:
+            self._screenshot(drv, f"timeout_{name}")
+        # 结束进程后主线程立刻就会失败并生成报告：先把超时信息挂到用例上
+        item._watchdog = {"message": f"{message}，调用栈: {stacks}", "stacks": stacks}
+        killed, memory = 0, 0.0
+        for drv in drivers:
+            k, m = self._lifecycle.kill(drv)
+            killed, memory = killed + k, memory + m
+        self._lifecycle.count_timeout()
+        logger.error("%s；已强制结束 %s 个浏览器 / 驱动进程（约 %.0f MB），调用栈: %s", message, killed, memory, stacks)
+
+        grace = getattr(Config, "TEST_TIMEOUT_GRACE", 30)
+        timer = threading.Timer(grace, self._interrupt, args=(token, item, stacks))
+        timer.daemon = True
+        self._timers.append(timer)
+        timer.start()
+
+    @staticmethod
+    def _screenshot(driver, name) -> None:
+        from utils.screenshot import take_screenshot
+
+        def capture():
+            try:
+                take_screenshot(driver, name, kind="failure")
+            except Exception:
+                pass
+
+        worker = threading.Thread(target=capture, daemon=True)
+        worker.start()
+        worker.join(10)
+
+    def _interrupt(self, token, item, stacks) -> None:
+        if not self._current(token):
+            return
+        dump_stacks(stacks, f"强制结束浏览器后用例仍未结束，中断本次运行: {item.nodeid}")
+        get_logger().error("用例 %s 在浏览器之外卡住，中断本次运行（调用栈: %s）", item.nodeid, stacks)
+        _thread.interrupt_main()
+
+
+watchdog = Watchdog(driver_lifecycle)
@@ -0,0 +1,401 @@
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import random
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from config import Config
+
+# 思考时间分布：none / const:秒 / uniform:最小,最大 / exp:平均秒数
+THINK_DISTRIBUTIONS = ("none", "const", "uniform", "exp")
+
+
+def parse_think(spec: str):
+    """"uniform:0.5,2" -> (kind, params)"""
+    kind, _, rest = (spec or "none").partition(":")
+    kind = kind.strip().lower()
+    if kind not in THINK_DISTRIBUTIONS:
+        raise ValueError(f"不支持的思考时间分布: {spec}（可选: {', '.join(THINK_DISTRIBUTIONS)}）")
+    params = [float(p) for p in rest.split(",") if p.strip()]
+    expected = {"none": 0, "const": 1, "uniform": 2, "exp": 1}[kind]
+    if len(params) != expected:
+        raise ValueError(f"思考时间 {kind} 需要 {expected} 个参数: {spec}")
+    return kind, params
+
+
+def think_time(kind, params, rng) -> float:
+    if kind == "const":
+        return params[0]
+    if kind == "uniform":
+        return rng.uniform(params[0], params[1])
+    if kind == "exp":
+        return rng.expovariate(1 / params[0]) if params[0] > 0 else 0.0
+    return 0.0
+
+
+def parse_mix(spec: str) -> list:
+    """"standard_user=3,performance_glitch_user=1" -> [(用户名, 权重), ...]；不写权重按 1"""
+    mix = []
+    for part in (spec or "").split(","):
+        if not part.strip():
+            continue
+        name, _, weight = part.partition("=")
+        mix.append((name.strip(), float(weight) if weight.strip() else 1.0))
+    if not mix or sum(w for _, w in mix) <= 0:
+        raise ValueError(f"用户组成为空: {spec!r}")
+    return mix
+
+
+def assign_users(mix, count: int) -> list:
+    """按权重把 count 个虚拟用户分配给各账号（最大余数法，结果确定），交错排列便于爬坡时各类用户均匀出现"""
+    total = sum(w for _, w in mix)
+    quotas = [(name, count * w / total) for name, w in mix]
+    counts = {name: int(q) for name, q in quotas}
+    left = count - sum(counts.values())
+    for name, q in sorted(quotas, key=lambda item: item[1] - int(item[1]), reverse=True)[:left]:
+        counts[name] += 1
+    users, pending = [], dict(counts)
+    while len(users) < count:
+        for name, _ in mix:
+            if pending[name]:
+                users.append(name)
+                pending[name] -= 1
+    return users
+
+
+# ---------------------------------------------------------------------- 统计
+
+
+class LoadStats:
+    """汇总各虚拟用户上报的步骤耗时：吞吐、延迟分位数、错误率（只在主进程里使用）"""
+
+    def __init__(self, window=10.0):
+        self.window = window
+        self.started = time.time()
+        self.steps = {}
+        self.iterations = {"ok": 0, "failed": 0}
+        self.active_users = 0
+
+    def add(self, event) -> None:
+        kind = event[0]
+        if kind == "step":
+            _, user, name, finished, duration_ms, error = event
+            entry = self.steps.setdefault(name, {"durations": [], "errors": 0, "finished": [], "by_user": {}})
+            entry["durations"].append(duration_ms)
+            entry["finished"].append(finished)
+            entry["by_user"].setdefault(user, []).append(duration_ms)
+            if error:
+                entry["errors"] += 1
+                entry.setdefault("last_error", error)
+        elif kind == "iteration":
+            self.iterations["ok" if event[1] else "failed"] += 1
+        elif kind == "user":
+            self.active_users += 1 if event[1] == "start" else -1
+
+    def snapshot(self, now=None) -> dict:
+        from utils.profiler import percentile
+
+        now = now or time.time()
+        elapsed = max(now - self.started, 1e-6)
+        steps = {}
+        for name, entry in self.steps.items():
+            values = sorted(entry["durations"])
+            recent = sum(1 for t in entry["finished"] if t >= now - self.window)
+            steps[name] = {
+                "count": len(values),
+                "errors": entry["errors"],
+                "error_rate": round(entry["errors"] / len(values), 4) if values else 0.0,
+                "throughput_per_s": round(len(values) / elapsed, 3),
+                "recent_per_s": round(recent / min(self.window, elapsed), 3),
+                "p50_ms": round(percentile(values, 50), 1),
+                "p90_ms": round(percentile(values, 90), 1),
+                "p95_ms": round(percentile(values, 95), 1),
+                "p99_ms": round(percentile(values, 99), 1),
+                "max_ms": round(values[-1], 1) if values else 0.0,
+                "p50_ms_by_user": {u: round(percentile(sorted(v), 50), 1) for u, v in entry["by_user"].items()},
+            }
+            if entry.get("last_error"):
+                steps[name]["last_error"] = entry["last_error"]
+        return {
+            "elapsed_s": round(elapsed, 1),
+            "active_users": self.active_users,
+            "iterations": dict(self.iterations),
+            "steps": steps,
+        }
+
+
+def format_snapshot(snapshot) -> str:
+    lines = [f"[{snapshot['elapsed_s']:7.1f}s] 活跃用户 {snapshot['active_users']}，"
+             f"完成 {snapshot['iterations']['ok']} / 失败 {snapshot['iterations']['failed']}"]
+    for name, s in snapshot["steps"].items():
+        lines.append(
+            f"  {name:<12} n={s['count']:<5} {s['recent_per_s']:6.2f}/s  "
+            f"p50={s['p50_ms']:8.1f}ms p95={s['p95_ms']:8.1f}ms p99={s['p99_ms']:8.1f}ms  错误 {s['error_rate']:.1%}"
+        )
+    return "\n".join(lines)
+
+
+# ---------------------------------------------------------------------- 虚拟用户
+
+
+def _describe(error) -> str:
+    return f"{type(error).__name__}: {error}"[:200]
+
+
+class _TimedStep:
+    def __init__(self):
+        self.error = None
+
+    def fail(self, message: str) -> None:
+        self.error = message
+
+
+def _virtual_user(user_index, username, options, start_at, events, browsers, provider, stop_at):
+    """一个虚拟用户：到点开始，循环执行工作流；每次迭代只在需要时占用一个浏览器名额"""
+    from main import demo_full_workflow
+    from utils.logger import get_logger
+
+    rng = random.Random(options["seed"] * 1_000_003 + user_index)
+    kind, params = options["think"]
+    # 几十个虚拟用户同时写 INFO 日志会淹没实时汇总，只保留警告和错误
+    logger = get_logger("load.vu")
+    logger.setLevel(logging.WARNING)
+
+    time.sleep(max(0.0, start_at - time.time()))
+    events.put(("user", "start"))
+    # 本次迭代里出错的步骤（包括调用 fail() 后继续执行的步骤），有任何一个迭代即记为失败
+    failed_steps = []
+
+    @contextmanager
+    def step(name):
+        handle = _TimedStep()
+        started = time.perf_counter()
+        try:
+            yield handle
+        except Exception as e:
+            handle.error = handle.error or _describe(e)
+            raise
+        finally:
+            duration_ms = (time.perf_counter() - started) * 1000
+            events.put(("step", username, name, time.time(), duration_ms, handle.error))
+            if handle.error:
+                failed_steps.append(name)
+
+    try:
+        iteration = 0
+        while iteration < options["iterations"] or (stop_at and time.time() < stop_at):
+            if stop_at and time.time() >= stop_at:
+                break
+            iteration += 1
+            failed_steps.clear()
+            with browsers:
+                acquire_started = time.perf_counter()
+                try:
+                    driver = provider.acquire()
+                except Exception as e:
+                    events.put(("step", username, "acquire_browser", time.time(),
+                                (time.perf_counter() - acquire_started) * 1000, _describe(e)))
+                    events.put(("iteration", False))
+                    continue
+                events.put(("step", username, "acquire_browser", time.time(),
+                            (time.perf_counter() - acquire_started) * 1000, None))
+
+                # 工作流内部的步骤错误由 step() 记录；这里只兜住步骤之外的异常（思考时间、归还浏览器等）
+                completed = False
+                workflow_started = time.perf_counter()
+                try:
+                    completed = demo_full_workflow(
+                        driver, username, Config.VALID_PASSWORD,
+                        think=lambda: time.sleep(think_time(kind, params, rng)), step=step, logger=logger,
+                    )
+                except Exception as e:
+                    events.put(("step", username, "workflow", time.time(),
+                                (time.perf_counter() - workflow_started) * 1000, _describe(e)))
+                # 流程走完但有步骤 fail() 过：浏览器仍可复用，迭代本身记为失败
+                ok = completed and not failed_steps
+                try:
+                    provider.release(driver, broken=not completed)
+                except Exception as e:
+                    ok = False
+                    events.put(("step", username, "workflow", time.time(), 0.0, _describe(e)))
+            events.put(("iteration", ok))
+    finally:
+        events.put(("user", "stop"))
+
+
+def _run_users(users, options, events):
+    """在当前进程里用线程跑一组虚拟用户：[(全局序号, 用户名, 开始时间), ...]"""
+    from utils.driver_setup import DriverPool
+
+    Config.BASE_URL = options["base_url"]
+    if options.get("headless"):
+        Config.HEADLESS = True
+    if options.get("process"):
+        # 每个进程各自的截图服务：分目录写，同名截图（demo_login_failed 等）不会跨进程互相覆盖
+        Config.SCREENSHOT_DIR = os.path.join(Config.SCREENSHOT_DIR, f"load_{options['process']}", "")
+
+    browsers = threading.BoundedSemaphore(options["browsers"])
+    provider = DriverPool(size=options["browsers"])
+    threads = [
+        threading.Thread(
+            target=_virtual_user,
+            args=(index, username, options, start_at, events, browsers, provider, options["stop_at"]),
+            name=f"vu-{index}",
+            daemon=True,
+        )
+        for index, username, start_at in users
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    provider.close()
+
+
+def _process_main(users, options, events):
+    _run_users(users, options, events)
+    events.put(("process", "done"))
+
+
+# ---------------------------------------------------------------------- 入口
+
+
+def run_load(users=None, mix=None, ramp_up=None, iterations=None, duration=None, think=None,
+             browsers=None, processes=None, report_interval=None, seed=0, headless=False, on_report=print):
+    """以 N 个并发虚拟用户运行 main.demo_full_workflow，返回最终汇总
+
+    - ramp_up：秒，N 个用户在这段时间内均匀启动
+    - iterations：每个用户循环几次；设置 duration（秒，爬坡结束后计时）时改为按时长运行
+    - browsers：同时打开的浏览器总数上限（超过的虚拟用户排队等待）
+    - processes：把虚拟用户分散到几个进程（每个进程各自的浏览器池，浏览器名额按进程均分，
+      除不尽的余数分给前几个进程；进程数不超过用户数和浏览器数）
+    """
+    users = users or getattr(Config, "LOAD_USERS", 5)
+    mix = parse_mix(mix or getattr(Config, "LOAD_USER_MIX", Config.VALID_USERNAME))
+    ramp_up = getattr(Config, "LOAD_RAMP_UP", 10) if ramp_up is None else ramp_up
+    iterations = getattr(Config, "LOAD_ITERATIONS", 1) if iterations is None else iterations
+    think = parse_think(think or getattr(Config, "LOAD_THINK_TIME", "uniform:0.5,2"))
+    browsers = max(1, browsers or getattr(Config, "LOAD_MAX_BROWSERS", 4))
+    processes = max(1, min(processes or 1, users, browsers))
+    report_interval = report_interval or getattr(Config, "LOAD_REPORT_INTERVAL", 5)
+
+    now = time.time()
+    stop_at = now + ramp_up + duration if duration else 0
+    names = assign_users(mix, users)
+    schedule = [(i, name, now + (ramp_up * i / users if users > 1 else 0)) for i, name in enumerate(names)]
+    options = {
+        "base_url": Config.BASE_URL, "think": think, "iterations": iterations if not duration else 0,
+        "browsers": browsers, "stop_at": stop_at, "seed": seed, "headless": headless,
+    }
+    # 各进程的浏览器名额：总数按进程均分，余数分给前几个进程，合计正好是 browsers
+    shares = [browsers // processes + (1 if p < browsers % processes else 0) for p in range(processes)]
+
+    stats = LoadStats(window=max(report_interval * 2, 10))
+    if processes == 1:
+        events = queue.Queue()
+        workers = [threading.Thread(target=_process_main, args=(schedule, options, events), daemon=True)]
+    else:
+        # spawn：每个子进程重新导入模块，Config.BASE_URL 等通过 options 传入
+        context = multiprocessing.get_context("spawn")
+        events = context.Queue()
+        workers = [
+            context.Process(
+                target=_process_main,
+                args=(schedule[p::processes], dict(options, browsers=shares[p], process=f"p{p}"), events),
+                daemon=True,
+            )
+            for p in range(processes)
+        ]
+    for worker in workers:
+        worker.start()
+
+    done, next_report = 0, time.time() + report_interval
+    while done < len(workers):
+        try:
+            event = events.get(timeout=0.5)
+        except queue.Empty:
+            event = None
+            if not any(w.is_alive() for w in workers):
+                break
+        if event is not None:
+            if event == ("process", "done"):
+                done += 1
+            else:
+                stats.add(event)
+        if time.time() >= next_report:
+            on_report(format_snapshot(stats.snapshot()))
+            next_report += report_interval
+    for worker in workers:
+        worker.join(timeout=5)
+
+    result = stats.snapshot()
+    result["config"] = {
+        "users": users, "mix": mix, "ramp_up_s": ramp_up, "iterations": iterations, "duration_s": duration,
+        "think": think, "max_browsers": browsers, "processes": processes, "base_url": Config.BASE_URL,
+    }
+    return result
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="负载模式：以 N 个并发虚拟用户运行 main.demo_full_workflow")
+    parser.add_argument("--users", type=int, default=Config.LOAD_USERS, help="虚拟用户数")
+    parser.add_argument("--mix", default=Config.LOAD_USER_MIX,
+                        help="用户组成（账号=权重），例如 standard_user=3,performance_glitch_user=1")
+    parser.add_argument("--ramp-up", type=float, default=Config.LOAD_RAMP_UP, help="全部用户在多少秒内均匀启动")
+    parser.add_argument("--iterations", type=int, default=Config.LOAD_ITERATIONS, help="每个用户循环执行几次")
+    parser.add_argument("--duration", type=float, default=0, help="按时长运行（秒，爬坡结束后计时），设置后忽略 --iterations")
+    parser.add_argument("--think", default=Config.LOAD_THINK_TIME,
+                        help="步骤间思考时间：none / const:1 / uniform:0.5,2 / exp:1（平均秒数）")
+    parser.add_argument("--browsers", type=int, default=Config.LOAD_MAX_BROWSERS, help="同时打开的浏览器总数上限")
+    parser.add_argument("--processes", type=int, default=1, help="把虚拟用户分散到几个进程")
+    parser.add_argument("--report-interval", type=float, default=Config.LOAD_REPORT_INTERVAL, help="实时汇总的输出间隔（秒）")
+    parser.add_argument("--seed", type=int, default=0, help="思考时间随机种子")
+    parser.add_argument("--headless", action="store_true", help="以无头模式启动浏览器")
+    parser.add_argument("--remote", action="store_true", help="对 Config.BASE_URL 的真实站点施压（默认用本地替身站点）")
+    parser.add_argument("--latency", default="none", help="本地站点注入的网络条件（none / lan / broadband / wan / 3g）")
+    parser.add_argument("--output", default=os.path.join(Config.LOAD_REPORT_DIR, "load_report.json"), help="最终汇总输出文件")
+    args = parser.parse_args(argv)
+
+    try:
+        parse_think(args.think)
+        parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+
+    site = None
+    if not args.remote:
+        from utils.local_site import LocalSite
+
+        site = LocalSite(latency=args.latency).start()
+        Config.BASE_URL = site.url
+    try:
+        result = run_load(
+            users=args.users, mix=args.mix, ramp_up=args.ramp_up, iterations=args.iterations,
+            duration=args.duration, think=args.think, browsers=args.browsers, processes=args.processes,
+            report_interval=args.report_interval, seed=args.seed, headless=args.headless,
+        )
+    finally:
+        if site is not None:
+            site.stop()
+
+    result["time"] = datetime.now().isoformat(timespec="seconds")
+    result["target"] = Config.BASE_URL if args.remote else f"local:{args.latency}"
+    print("\n=== 最终汇总 ===")
+    print(format_snapshot(result))
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    print(f"结果已写入 {args.output}")
+    failed = result["iterations"]["failed"]
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,5 @@
+"""本地 SauceDemo 替身站点：离线、低延迟、可注入网络延迟"""
+
+from utils.local_site.server import LATENCY_PROFILES, LocalSite
+
+__all__ = ["LATENCY_PROFILES", "LocalSite"]
@@ -0,0 +1,27 @@
+import argparse
+import time
+
+from utils.local_site.server import LATENCY_PROFILES, LocalSite
+
+
+def main():
+    parser = argparse.ArgumentParser(description="启动本地 SauceDemo 替身站点")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000, help="监听端口（0 = 自动分配空闲端口）")
+    parser.add_argument("--latency", default="none", choices=sorted(LATENCY_PROFILES), help="注入的网络延迟配置")
+    parser.add_argument("--glitch-delay-ms", type=int, default=5000, help="performance_glitch_user 登录后的延迟")
+    args = parser.parse_args()
+
+    site = LocalSite(host=args.host, port=args.port, latency=args.latency, glitch_delay_ms=args.glitch_delay_ms).start()
+    print(f"本地站点已启动: {site.url}（latency={args.latency}），Ctrl+C 退出")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        site.stop()
+
+
+if __name__ == "__main__":
+    main()
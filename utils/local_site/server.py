@@ -0,0 +1,208 @@
+import asyncio
+import json
+import mimetypes
+import random
+import threading
+from pathlib import Path
+from urllib.parse import unquote, urlsplit
+
+STATIC_DIR = Path(__file__).resolve().parent / "static"
+
+# 单页应用的路由：这些路径都返回同一个 index.html，由前端按 pathname 渲染
+PAGE_ROUTES = (
+    "/",
+    "/index.html",
+    "/inventory.html",
+    "/cart.html",
+    "/checkout-step-one.html",
+    "/checkout-step-two.html",
+    "/checkout-complete.html",
+)
+
+# 注入的网络条件：每个响应前等待 latency_ms ± jitter_ms，再按带宽（kbit/s，0 = 不限）计算传输耗时
+LATENCY_PROFILES = {
+    "none": {"latency_ms": 0, "jitter_ms": 0, "bandwidth_kbps": 0},
+    "lan": {"latency_ms": 2, "jitter_ms": 1, "bandwidth_kbps": 0},
+    "broadband": {"latency_ms": 20, "jitter_ms": 5, "bandwidth_kbps": 20000},
+    "wan": {"latency_ms": 80, "jitter_ms": 20, "bandwidth_kbps": 5000},
+    "3g": {"latency_ms": 300, "jitter_ms": 50, "bandwidth_kbps": 750},
+}
+
+_REASONS = {200: "OK", 404: "Not Found", 405: "Method Not Allowed"}
+
+
+class LocalSite:
+    """本地 SauceDemo 替身服务器（asyncio 实现，在后台线程里运行自己的事件循环）
+
+    用法：
+        site = LocalSite(latency="wan").start()
+        Config.BASE_URL = site.url
+        ...
+        site.stop()
+
+    port=0 表示由系统分配空闲端口；latency 可以是 LATENCY_PROFILES 的名字，也可以是同结构的 dict。
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency="none", glitch_delay_ms=5000, seed=0):
+        self.host = host
+        self.port = port
+        self.profile = self._resolve_profile(latency)
+        self.glitch_delay_ms = glitch_delay_ms
+        self.stats = {"requests": 0, "bytes_sent": 0}
+
+        self._random = random.Random(seed)
+        self._files = {}
+        self._loop = None
+        self._server = None
+        self._thread = None
+        self._ready = threading.Event()
+        self._error = None
+
+    @staticmethod
+    def _resolve_profile(latency):
+        if isinstance(latency, dict):
+            return {**LATENCY_PROFILES["none"], **latency}
+        name = (latency or "none").lower().strip()
+        if name not in LATENCY_PROFILES:
+            raise ValueError(f"未知的延迟配置: {latency}（可选: {', '.join(LATENCY_PROFILES)}）")
+        return dict(LATENCY_PROFILES[name])
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}/"
+
+    # ------------------------------------------------------------------ 生命周期
+
+    def start(self):
+        self._load_files()
+        self._thread = threading.Thread(target=self._run, name="local-site", daemon=True)
+        self._thread.start()
+        self._ready.wait(timeout=10)
+        if self._error is not None:
+            raise RuntimeError(f"本地站点启动失败: {self._error}") from self._error
+        return self
+
+    def stop(self) -> None:
+        if self._loop is None:
+            return
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self._loop = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def _run(self) -> None:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            self._server = loop.run_until_complete(asyncio.start_server(self._handle, self.host, self.port))
+            self.port = self._server.sockets[0].getsockname()[1]
+            self._loop = loop
+        except Exception as e:
+            self._error = e
+            self._ready.set()
+            loop.close()
+            return
+
+        self._ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            self._server.close()
+            pending = asyncio.all_tasks(loop)
+            for task in pending:
+                task.cancel()
+            loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            loop.run_until_complete(self._server.wait_closed())
+            loop.close()
+
+    def _load_files(self) -> None:
+        """静态资源启动时一次性读入内存，请求时不再读磁盘"""
+        for path in STATIC_DIR.rglob("*"):
+            if path.is_file():
+                self._files["/static/" + path.relative_to(STATIC_DIR).as_posix()] = path.read_bytes()
+
+    # ------------------------------------------------------------------ HTTP
+
+    def _route(self, method, target):
+        """返回 (状态码, Content-Type, Cache-Control, body)"""
+        if method not in ("GET", "HEAD"):
+            return 405, "text/plain; charset=utf-8", "no-store", b"Method Not Allowed"
+
+        path = unquote(urlsplit(target).path)
+        if path in PAGE_ROUTES:
+            return 200, "text/html; charset=utf-8", "no-cache", self._files["/static/index.html"]
+        if path == "/config.js":
+            config = json.dumps({"glitchDelayMs": self.glitch_delay_ms})
+            return 200, "application/javascript; charset=utf-8", "no-cache", f"window.__SITE_CONFIG = {config};".encode()
+        if path in self._files:
+            content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+            if content_type.startswith("text/") or content_type.endswith("javascript"):
+                content_type += "; charset=utf-8"
+            return 200, content_type, "max-age=300", self._files[path]
+        return 404, "text/plain; charset=utf-8", "no-store", b"Not Found"
+
+    async def _delay(self, size: int) -> None:
+        profile = self.profile
+        delay_ms = profile["latency_ms"]
+        if profile["jitter_ms"]:
+            delay_ms += self._random.uniform(-profile["jitter_ms"], profile["jitter_ms"])
+        if profile["bandwidth_kbps"]:
+            delay_ms += size * 8 / profile["bandwidth_kbps"]
+        if delay_ms > 0:
+            await asyncio.sleep(delay_ms / 1000)
+
+    async def _handle(self, reader, writer) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get("content-length") or 0)
+                if length:
+                    await reader.readexactly(length)
+
+                parts = request_line.decode("latin-1").split()
+                if len(parts) != 3:
+                    break
+                method, target, version = parts
+
+                status, content_type, cache_control, body = self._route(method, target)
+                await self._delay(len(body))
+
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                head = (
+                    f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+                    f"Content-Type: {content_type}\r\n"
+                    f"Content-Length: {len(body)}\r\n"
+                    f"Cache-Control: {cache_control}\r\n"
+                    "Timing-Allow-Origin: *\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+                ).encode("latin-1")
+                payload = head + (body if method != "HEAD" else b"")
+                writer.write(payload)
+                await writer.drain()
+
+                self.stats["requests"] += 1
+                self.stats["bytes_sent"] += len(payload)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        except asyncio.CancelledError:
+            # 关闭服务器时取消空闲的 keep-alive 连接：正常结束即可
+            pass
+        finally:
+            writer.close()
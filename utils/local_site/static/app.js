@@ -0,0 +1,478 @@
+/*
+ * 本地 SauceDemo 替身（单页应用）
+ *
+ * 与 https://www.saucedemo.com/ 保持一致的部分：
+ * - 路由：/、/inventory.html、/cart.html、/checkout-step-one.html、/checkout-step-two.html、/checkout-complete.html
+ * - pages/*.py 用到的 id / class / data-test 属性
+ * - 会话存放在 cookie "session-username"，购物车存放在 localStorage "cart-contents"
+ * - 登录页、结算第一步的校验错误文案
+ */
+(function () {
+    "use strict";
+
+    var CONFIG = window.__SITE_CONFIG || {};
+    var PASSWORD = "secret_sauce";
+    var USERS = ["standard_user", "locked_out_user", "problem_user", "performance_glitch_user", "error_user", "visual_user"];
+    var SESSION_COOKIE = "session-username";
+    var CART_KEY = "cart-contents";
+    var SESSION_MINUTES = 10;
+
+    // 与线上默认排序（名称 A-Z）一致
+    var PRODUCTS = [
+        {id: 4, slug: "sauce-labs-backpack", name: "Sauce Labs Backpack", price: 29.99, img: "sauce-backpack.svg",
+            desc: "carry.allTheThings() with the sleek, streamlined Sly Pack that melds uncompromising style with unequaled laptop and tablet protection."},
+        {id: 0, slug: "sauce-labs-bike-light", name: "Sauce Labs Bike Light", price: 9.99, img: "bike-light.svg",
+            desc: "A red light isn't the desired state in testing but it sure helps when riding your bike at night. Water-resistant with 3 lighting modes, 1 AAA battery included."},
+        {id: 1, slug: "sauce-labs-bolt-t-shirt", name: "Sauce Labs Bolt T-Shirt", price: 15.99, img: "bolt-shirt.svg",
+            desc: "Get your testing superhero on with the Sauce Labs bolt T-shirt. From American Apparel, 100% ringspun combed cotton, heather gray with red bolt."},
+        {id: 5, slug: "sauce-labs-fleece-jacket", name: "Sauce Labs Fleece Jacket", price: 49.99, img: "fleece-jacket.svg",
+            desc: "It's not every day that you come across a midweight quarter-zip fleece jacket capable of handling everything from a relaxing day outdoors to a busy day at the office."},
+        {id: 2, slug: "sauce-labs-onesie", name: "Sauce Labs Onesie", price: 7.99, img: "onesie.svg",
+            desc: "Rib snap infant onesie for the junior automation engineer in development. Reinforced 3-snap bottom closure, two-needle hemmed sleeved and bottom won't unravel."},
+        {id: 3, slug: "test.allthethings()-t-shirt-(red)", name: "Test.allTheThings() T-Shirt (Red)", price: 15.99, img: "red-tatt.svg",
+            desc: "This classic Sauce Labs t-shirt is perfect to wear when cozying up to your keyboard to automate a few tests. Super-soft and comfy ringspun combed cotton."}
+    ];
+
+    var PROTECTED = ["/inventory.html", "/cart.html", "/checkout-step-one.html", "/checkout-step-two.html", "/checkout-complete.html"];
+
+    var root = document.getElementById("root");
+
+    // ---------------------------------------------------------------- 工具函数
+
+    function h(tag, attrs, children) {
+        var node = document.createElement(tag);
+        var key;
+        attrs = attrs || {};
+        for (key in attrs) {
+            if (!attrs.hasOwnProperty(key) || attrs[key] === null || attrs[key] === undefined) { continue; }
+            if (key === "className") { node.className = attrs[key]; }
+            else if (key === "text") { node.textContent = attrs[key]; }
+            else if (key === "value") { node.value = attrs[key]; }
+            else if (key.indexOf("on") === 0) { node.addEventListener(key.slice(2), attrs[key]); }
+            else { node.setAttribute(key, attrs[key]); }
+        }
+        (children || []).forEach(function (child) {
+            if (child) { node.appendChild(typeof child === "string" ? document.createTextNode(child) : child); }
+        });
+        return node;
+    }
+
+    function getCookie(name) {
+        var parts = document.cookie ? document.cookie.split("; ") : [];
+        for (var i = 0; i < parts.length; i++) {
+            var index = parts[i].indexOf("=");
+            if (parts[i].slice(0, index) === name) { return decodeURIComponent(parts[i].slice(index + 1)); }
+        }
+        return "";
+    }
+
+    function setSession(username) {
+        var expires = new Date(Date.now() + SESSION_MINUTES * 60 * 1000).toUTCString();
+        document.cookie = SESSION_COOKIE + "=" + encodeURIComponent(username) + "; expires=" + expires + "; path=/";
+    }
+
+    function clearSession() {
+        document.cookie = SESSION_COOKIE + "=; expires=Thu, 01 Jan 1970 00:00:00 GMT; path=/";
+    }
+
+    function currentUser() {
+        var user = getCookie(SESSION_COOKIE);
+        return USERS.indexOf(user) >= 0 ? user : "";
+    }
+
+    function getCart() {
+        try {
+            var ids = JSON.parse(window.localStorage.getItem(CART_KEY));
+            return Array.isArray(ids) ? ids : [];
+        } catch (e) {
+            return [];
+        }
+    }
+
+    function setCart(ids) {
+        if (ids.length) { window.localStorage.setItem(CART_KEY, JSON.stringify(ids)); }
+        else { window.localStorage.removeItem(CART_KEY); }
+    }
+
+    function productById(id) {
+        for (var i = 0; i < PRODUCTS.length; i++) {
+            if (PRODUCTS[i].id === id) { return PRODUCTS[i]; }
+        }
+        return null;
+    }
+
+    function cartProducts() {
+        return getCart().map(productById).filter(Boolean);
+    }
+
+    function money(value) {
+        return "$" + value.toFixed(2);
+    }
+
+    function imageFor(product) {
+        // problem_user 的已知缺陷：所有商品图片都是同一张 404 图
+        return "/static/img/" + (currentUser() === "problem_user" ? "sl-404.svg" : product.img);
+    }
+
+    function navigate(path) {
+        window.history.pushState({}, "", path);
+        render();
+    }
+
+    // ---------------------------------------------------------------- 公共区块
+
+    function errorBox(container, message, inputs) {
+        container.innerHTML = "";
+        container.className = "error-message-container" + (message ? " error" : "");
+        inputs.forEach(function (input) {
+            input.className = "input_error form_input" + (message ? " error" : "");
+        });
+        if (!message) { return; }
+        container.appendChild(h("h3", {"data-test": "error"}, [
+            message,
+            h("button", {className: "error-button", "data-test": "error-button", "aria-label": "close", type: "button",
+                onclick: function () { errorBox(container, "", inputs); }})
+        ]));
+    }
+
+    function updateBadge() {
+        var link = document.querySelector(".shopping_cart_link");
+        if (!link) { return; }
+        var count = getCart().length;
+        var badge = link.querySelector(".shopping_cart_badge");
+        if (!count) {
+            if (badge) { link.removeChild(badge); }
+            return;
+        }
+        if (!badge) {
+            badge = h("span", {className: "shopping_cart_badge", "data-test": "shopping-cart-badge"});
+            link.appendChild(badge);
+        }
+        badge.textContent = String(count);
+    }
+
+    function header(title, extra) {
+        var menu = h("div", {className: "bm-menu-wrap", "aria-hidden": "true", hidden: "hidden"}, [
+            h("nav", {className: "bm-item-list"}, [
+                h("a", {id: "inventory_sidebar_link", className: "bm-item menu-item", "data-test": "inventory-sidebar-link",
+                    text: "All Items", onclick: function () { closeMenu(); navigate("/inventory.html"); }}),
+                h("a", {id: "about_sidebar_link", className: "bm-item menu-item", "data-test": "about-sidebar-link",
+                    text: "About", href: "https://saucelabs.com/"}),
+                h("a", {id: "logout_sidebar_link", className: "bm-item menu-item", "data-test": "logout-sidebar-link",
+                    text: "Logout", onclick: function () { closeMenu(); clearSession(); navigate("/"); }}),
+                h("a", {id: "reset_sidebar_link", className: "bm-item menu-item", "data-test": "reset-sidebar-link",
+                    text: "Reset App State", onclick: function () { setCart([]); closeMenu(); render(); }})
+            ]),
+            h("div", {className: "bm-cross-button"}, [
+                h("button", {id: "react-burger-cross-btn", type: "button", text: "Close Menu", onclick: function () { closeMenu(); }})
+            ])
+        ]);
+
+        function closeMenu() {
+            menu.setAttribute("hidden", "hidden");
+            menu.setAttribute("aria-hidden", "true");
+        }
+
+        var cartLink = h("a", {className: "shopping_cart_link", "data-test": "shopping-cart-link",
+            onclick: function () { navigate("/cart.html"); }});
+
+        var node = h("div", {className: "header_container", id: "header_container", "data-test": "header-container"}, [
+            h("div", {className: "primary_header", "data-test": "primary-header"}, [
+                h("div", {id: "menu_button_container"}, [
+                    h("div", {className: "bm-burger-button"}, [
+                        h("button", {id: "react-burger-menu-btn", type: "button", text: "Open Menu", onclick: function () {
+                            menu.removeAttribute("hidden");
+                            menu.setAttribute("aria-hidden", "false");
+                        }})
+                    ]),
+                    menu
+                ]),
+                h("div", {className: "header_label"}, [h("div", {className: "app_logo", text: "Swag Labs"})]),
+                h("div", {id: "shopping_cart_container", className: "shopping_cart_container"}, [cartLink])
+            ]),
+            h("div", {className: "header_secondary_container", "data-test": "secondary-header"}, [
+                h("span", {className: "title", "data-test": "title", text: title})
+            ].concat(extra || []))
+        ]);
+        return node;
+    }
+
+    function footer() {
+        return h("footer", {className: "footer", "data-test": "footer"}, [
+            h("div", {className: "footer_copy", "data-test": "footer-copy",
+                text: "© " + new Date().getFullYear() + " Sauce Labs. All Rights Reserved. Terms of Service | Privacy Policy"})
+        ]);
+    }
+
+    function page(id, title, extra, content) {
+        root.appendChild(h("div", {id: "page_wrapper", className: "page_wrapper"}, [
+            h("div", {id: "contents_wrapper"}, [header(title, extra), h("div", {id: id, className: id, "data-test": id.replace(/_/g, "-")}, content)]),
+            footer()
+        ]));
+        updateBadge();
+    }
+
+    function cartItem(product, removable) {
+        var pricebar = [h("div", {className: "inventory_item_price", "data-test": "inventory-item-price", text: money(product.price)})];
+        if (removable) {
+            pricebar.push(h("button", {className: "btn btn_secondary btn_small cart_button", id: "remove-" + product.slug,
+                "data-test": "remove-" + product.slug, name: "remove-" + product.slug, text: "Remove", type: "button",
+                onclick: function () {
+                    setCart(getCart().filter(function (id) { return id !== product.id; }));
+                    render();
+                }}));
+        }
+        return h("div", {className: "cart_item", "data-test": "inventory-item"}, [
+            h("div", {className: "cart_quantity", "data-test": "item-quantity", text: "1"}),
+            h("div", {className: "cart_item_label"}, [
+                h("a", {id: "item_" + product.id + "_title_link", "data-test": "item-" + product.id + "-title-link"}, [
+                    h("div", {className: "inventory_item_name", "data-test": "inventory-item-name", text: product.name})
+                ]),
+                h("div", {className: "inventory_item_desc", "data-test": "inventory-item-desc", text: product.desc}),
+                h("div", {className: "item_pricebar", "data-test": "item-pricebar"}, pricebar)
+            ])
+        ]);
+    }
+
+    // ---------------------------------------------------------------- 页面
+
+    function renderLogin(initialError) {
+        var username = h("input", {className: "input_error form_input", placeholder: "Username", type: "text",
+            "data-test": "username", id: "user-name", name: "user-name", autocorrect: "off", autocapitalize: "none"});
+        var password = h("input", {className: "input_error form_input", placeholder: "Password", type: "password",
+            "data-test": "password", id: "password", name: "password", autocorrect: "off", autocapitalize: "none"});
+        var errors = h("div", {className: "error-message-container"});
+        var inputs = [username, password];
+
+        var form = h("form", {onsubmit: function (event) {
+            event.preventDefault();
+            var user = username.value;
+            var pass = password.value;
+            if (!user) { return errorBox(errors, "Epic sadface: Username is required", inputs); }
+            if (!pass) { return errorBox(errors, "Epic sadface: Password is required", inputs); }
+            if (USERS.indexOf(user) < 0 || pass !== PASSWORD) {
+                return errorBox(errors, "Epic sadface: Username and password do not match any user in this service", inputs);
+            }
+            if (user === "locked_out_user") {
+                return errorBox(errors, "Epic sadface: Sorry, this user has been locked out.", inputs);
+            }
+            errorBox(errors, "", inputs);
+            setSession(user);
+            if (user === "performance_glitch_user") {
+                window.setTimeout(function () { navigate("/inventory.html"); }, CONFIG.glitchDelayMs || 0);
+            } else {
+                navigate("/inventory.html");
+            }
+        }}, [
+            h("div", {className: "form_group"}, [username]),
+            h("div", {className: "form_group"}, [password]),
+            errors,
+            h("input", {type: "submit", className: "submit-button btn_action", "data-test": "login-button",
+                id: "login-button", name: "login-button", value: "Login"})
+        ]);
+
+        root.appendChild(h("div", {className: "login_container"}, [
+            h("div", {className: "login_logo", text: "Swag Labs"}),
+            h("div", {className: "login_wrapper"}, [
+                h("div", {className: "login_wrapper-inner"}, [
+                    h("div", {id: "login_button_container", className: "form_column"}, [h("div", {className: "login-box"}, [form])])
+                ])
+            ]),
+            h("div", {className: "login_credentials_wrap", "data-test": "login-credentials-container"}, [
+                h("div", {id: "login_credentials", className: "login_credentials", "data-test": "login-credentials"}, [
+                    h("h4", {text: "Accepted usernames are:"})
+                ].concat(USERS.map(function (name) { return h("div", {text: name}); }))),
+                h("div", {className: "login_password", "data-test": "login-password"}, [
+                    h("h4", {text: "Password for all users:"}), h("div", {text: PASSWORD})
+                ])
+            ])
+        ]));
+
+        if (initialError) { errorBox(errors, initialError, inputs); }
+    }
+
+    function inventoryButton(product, inCart) {
+        var prefix = inCart ? "remove-" : "add-to-cart-";
+        return h("button", {
+            className: "btn " + (inCart ? "btn_secondary" : "btn_primary") + " btn_small btn_inventory",
+            id: prefix + product.slug, "data-test": prefix + product.slug, name: prefix + product.slug,
+            type: "button", text: inCart ? "Remove" : "Add to cart",
+            onclick: function (event) {
+                var cart = getCart();
+                var index = cart.indexOf(product.id);
+                if (index >= 0) { cart.splice(index, 1); } else { cart.push(product.id); }
+                setCart(cart);
+                event.currentTarget.parentNode.replaceChild(inventoryButton(product, index < 0), event.currentTarget);
+                updateBadge();
+            }
+        });
+    }
+
+    function renderInventory() {
+        var sortOrder = window.sessionStorage.getItem("inventory-sort") || "az";
+        var products = PRODUCTS.slice();
+        var sorters = {
+            az: function (a, b) { return a.name < b.name ? -1 : 1; },
+            za: function (a, b) { return a.name < b.name ? 1 : -1; },
+            lohi: function (a, b) { return a.price - b.price; },
+            hilo: function (a, b) { return b.price - a.price; }
+        };
+        products.sort(sorters[sortOrder] || sorters.az);
+
+        var select = h("select", {className: "product_sort_container", "data-test": "product-sort-container",
+            onchange: function () { window.sessionStorage.setItem("inventory-sort", select.value); render(); }}, [
+            h("option", {value: "az", text: "Name (A to Z)"}),
+            h("option", {value: "za", text: "Name (Z to A)"}),
+            h("option", {value: "lohi", text: "Price (low to high)"}),
+            h("option", {value: "hilo", text: "Price (high to low)"})
+        ]);
+        select.value = sortOrder;
+
+        var cart = getCart();
+        var items = products.map(function (product) {
+            return h("div", {className: "inventory_item", "data-test": "inventory-item"}, [
+                h("div", {className: "inventory_item_img"}, [
+                    h("a", {id: "item_" + product.id + "_img_link", "data-test": "item-" + product.id + "-img-link"}, [
+                        h("img", {alt: product.name, className: "inventory_item_img", src: imageFor(product),
+                            "data-test": "inventory-item-" + product.slug + "-img"})
+                    ])
+                ]),
+                h("div", {className: "inventory_item_description", "data-test": "inventory-item-description"}, [
+                    h("div", {className: "inventory_item_label"}, [
+                        h("a", {id: "item_" + product.id + "_title_link", "data-test": "item-" + product.id + "-title-link"}, [
+                            h("div", {className: "inventory_item_name", "data-test": "inventory-item-name", text: product.name})
+                        ]),
+                        h("div", {className: "inventory_item_desc", "data-test": "inventory-item-desc", text: product.desc})
+                    ]),
+                    h("div", {className: "pricebar"}, [
+                        h("div", {className: "inventory_item_price", "data-test": "inventory-item-price", text: money(product.price)}),
+                        inventoryButton(product, cart.indexOf(product.id) >= 0)
+                    ])
+                ])
+            ]);
+        });
+
+        page("inventory_container", "Products", [select], [
+            h("div", {className: "inventory_list", "data-test": "inventory-list"}, items)
+        ]);
+    }
+
+    function renderCart() {
+        var items = cartProducts().map(function (product) { return cartItem(product, true); });
+        page("cart_contents_container", "Your Cart", [], [
+            h("div", {className: "cart_list", "data-test": "cart-list"}, [
+                h("div", {className: "cart_quantity_label", "data-test": "cart-quantity-label", text: "QTY"}),
+                h("div", {className: "cart_desc_label", "data-test": "cart-desc-label", text: "Description"})
+            ].concat(items)),
+            h("div", {className: "cart_footer"}, [
+                h("button", {className: "btn btn_secondary back btn_medium", id: "continue-shopping", "data-test": "continue-shopping",
+                    name: "continue-shopping", type: "button", text: "Continue Shopping", onclick: function () { navigate("/inventory.html"); }}),
+                h("button", {className: "btn btn_action btn_medium checkout_button", id: "checkout", "data-test": "checkout",
+                    name: "checkout", type: "button", text: "Checkout", onclick: function () { navigate("/checkout-step-one.html"); }})
+            ])
+        ]);
+    }
+
+    function renderCheckoutStepOne() {
+        function field(id, dataTest, placeholder) {
+            return h("input", {className: "input_error form_input", placeholder: placeholder, type: "text",
+                "data-test": dataTest, id: id, name: id, autocorrect: "off", autocapitalize: "none"});
+        }
+        var firstName = field("first-name", "firstName", "First Name");
+        var lastName = field("last-name", "lastName", "Last Name");
+        var postalCode = field("postal-code", "postalCode", "Zip/Postal Code");
+        var errors = h("div", {className: "error-message-container"});
+        var inputs = [firstName, lastName, postalCode];
+
+        var form = h("form", {onsubmit: function (event) {
+            event.preventDefault();
+            // 与线上一致：只判断是否为空字符串，空格、Unicode 都视为有效输入
+            if (!firstName.value) { return errorBox(errors, "Error: First Name is required", inputs); }
+            if (!lastName.value) { return errorBox(errors, "Error: Last Name is required", inputs); }
+            if (!postalCode.value) { return errorBox(errors, "Error: Postal Code is required", inputs); }
+            navigate("/checkout-step-two.html");
+        }}, [
+            h("div", {className: "checkout_info", "data-test": "checkout-info-container"}, [
+                h("div", {className: "form_group"}, [firstName]),
+                h("div", {className: "form_group"}, [lastName]),
+                h("div", {className: "form_group"}, [postalCode]),
+                errors
+            ]),
+            h("div", {className: "checkout_buttons"}, [
+                h("button", {className: "btn btn_secondary back btn_medium cart_cancel_link", id: "cancel", "data-test": "cancel",
+                    name: "cancel", type: "button", text: "Cancel", onclick: function () { navigate("/cart.html"); }}),
+                h("input", {type: "submit", className: "submit-button btn btn_primary cart_button btn_action",
+                    "data-test": "continue", id: "continue", name: "continue", value: "Continue"})
+            ])
+        ]);
+
+        page("checkout_info_container", "Checkout: Your Information", [], [
+            h("div", {className: "checkout_info_wrapper"}, [form])
+        ]);
+    }
+
+    function renderCheckoutStepTwo() {
+        var products = cartProducts();
+        var itemTotal = products.reduce(function (sum, product) { return sum + product.price; }, 0);
+        var tax = Math.round(itemTotal * 0.08 * 100) / 100;
+        var total = Math.round((itemTotal + tax) * 100) / 100;
+
+        page("checkout_summary_container", "Checkout: Overview", [], [
+            h("div", {className: "cart_list", "data-test": "cart-list"}, [
+                h("div", {className: "cart_quantity_label", "data-test": "cart-quantity-label", text: "QTY"}),
+                h("div", {className: "cart_desc_label", "data-test": "cart-desc-label", text: "Description"})
+            ].concat(products.map(function (product) { return cartItem(product, false); }))),
+            h("div", {className: "summary_info"}, [
+                h("div", {className: "summary_info_label", "data-test": "payment-info-label", text: "Payment Information:"}),
+                h("div", {className: "summary_value_label", "data-test": "payment-info-value", text: "SauceCard #31337"}),
+                h("div", {className: "summary_info_label", "data-test": "shipping-info-label", text: "Shipping Information:"}),
+                h("div", {className: "summary_value_label", "data-test": "shipping-info-value", text: "Free Pony Express Delivery!"}),
+                h("div", {className: "summary_info_label", "data-test": "total-info-label", text: "Price Total"}),
+                h("div", {className: "summary_subtotal_label", "data-test": "subtotal-label", text: "Item total: " + money(itemTotal)}),
+                h("div", {className: "summary_tax_label", "data-test": "tax-label", text: "Tax: " + money(tax)}),
+                h("div", {className: "summary_total_label", "data-test": "total-label", text: "Total: " + money(total)}),
+                h("div", {className: "cart_footer"}, [
+                    h("button", {className: "btn btn_secondary back btn_medium cart_cancel_link", id: "cancel", "data-test": "cancel",
+                        name: "cancel", type: "button", text: "Cancel", onclick: function () { navigate("/inventory.html"); }}),
+                    h("button", {className: "btn btn_action btn_medium cart_button", id: "finish", "data-test": "finish",
+                        name: "finish", type: "button", text: "Finish", onclick: function () { setCart([]); navigate("/checkout-complete.html"); }})
+                ])
+            ])
+        ]);
+    }
+
+    function renderCheckoutComplete() {
+        page("checkout_complete_container", "Checkout: Complete!", [], [
+            h("img", {alt: "Pony Express", className: "pony_express", "data-test": "pony-express", src: "/static/img/pony-express.svg"}),
+            h("h2", {className: "complete-header", "data-test": "complete-header", text: "Thank you for your order!"}),
+            h("div", {className: "complete-text", "data-test": "complete-text",
+                text: "Your order has been dispatched, and will arrive just as fast as the pony can get there!"}),
+            h("button", {className: "btn btn_primary btn_small", id: "back-to-products", "data-test": "back-to-products",
+                name: "back-to-products", type: "button", text: "Back Home", onclick: function () { navigate("/inventory.html"); }})
+        ]);
+    }
+
+    var ROUTES = {
+        "/": renderLogin,
+        "/index.html": renderLogin,
+        "/inventory.html": renderInventory,
+        "/cart.html": renderCart,
+        "/checkout-step-one.html": renderCheckoutStepOne,
+        "/checkout-step-two.html": renderCheckoutStepTwo,
+        "/checkout-complete.html": renderCheckoutComplete
+    };
+
+    function render() {
+        var path = window.location.pathname;
+        root.innerHTML = "";
+        if (PROTECTED.indexOf(path) >= 0 && !currentUser()) {
+            window.history.replaceState({}, "", "/");
+            renderLogin("Epic sadface: You can only access '" + path + "' when you are logged in.");
+            return;
+        }
+        (ROUTES[path] || renderLogin)();
+    }
+
+    window.addEventListener("popstate", render);
+    render();
+}());
@@ -0,0 +1,449 @@
+# 静态定位器检查：不启动浏览器，用录制好的页面 HTML 校验页面对象里的定位器
+#
+# 录制（需要浏览器，走一遍登录 → 商品 → 购物车 → 结算各步骤及错误状态）：
+#     python -m utils.locator_check --record            # 录制 Config.BASE_URL 的真实站点
+#     python -m utils.locator_check --record --local    # 录制本地替身站点
+# 检查（纯 Python，几秒内完成）：
+#     python -m utils.locator_check
+# pytest 里 tests/test_locator_check.py 也做同样的检查；还没有录制快照时该用例明确跳过（命令行检查则以退出码 2 提示）
+#
+# 每个页面对象类里的 (By, value) 类属性都会在所有快照上匹配一遍：
+# - 所有快照里都匹配不到 → missing
+# - 录制时只匹配一个节点（或是新定位器）的，现在在某个快照里匹配到多个 → ambiguous
+import argparse
+import importlib
+import inspect
+import json
+import os
+import pkgutil
+import re
+import sys
+from html.parser import HTMLParser
+
+from selenium.webdriver.common.by import By
+
+from config import Config
+
+_VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+
+# 一次读取整个文档（包括 React 渲染出的节点），比 driver.page_source 更接近当前 DOM
+_OUTER_HTML_JS = "return document.documentElement.outerHTML;"
+
+
+class UnsupportedLocator(ValueError):
+    """静态检查不支持的定位方式或 CSS 语法（例如 XPath、伪类）"""
+
+
+# ---------------------------------------------------------------------- DOM
+
+
+class Node:
+    __slots__ = ("tag", "attrs", "parent", "children")
+
+    def __init__(self, tag, attrs, parent=None):
+        self.tag = tag
+        self.attrs = attrs
+        self.parent = parent
+        self.children = []
+
+    @property
+    def classes(self):
+        return self.attrs.get("class", "").split()
+
+    def iter(self):
+        """深度优先遍历所有后代元素（不含自身）"""
+        stack = list(reversed(self.children))
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(reversed(node.children))
+
+    def previous_siblings(self):
+        if self.parent is None:
+            return []
+        siblings = self.parent.children
+        return list(reversed(siblings[:siblings.index(self)]))
+
+
+class _TreeBuilder(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = Node("#document", {})
+        self._stack = [self.root]
+
+    def handle_starttag(self, tag, attrs):
+        node = Node(tag, {k: (v if v is not None else "") for k, v in attrs}, self._stack[-1])
+        self._stack[-1].children.append(node)
+        if tag not in _VOID_TAGS:
+            self._stack.append(node)
+
+    def handle_startendtag(self, tag, attrs):
+        node = Node(tag, {k: (v if v is not None else "") for k, v in attrs}, self._stack[-1])
+        self._stack[-1].children.append(node)
+
+    def handle_endtag(self, tag):
+        # 容忍不规范的 HTML：关闭到最近的同名元素为止，找不到就忽略
+        for i in range(len(self._stack) - 1, 0, -1):
+            if self._stack[i].tag == tag:
+                del self._stack[i:]
+                return
+
+
+def parse_html(html: str) -> Node:
+    builder = _TreeBuilder()
+    builder.feed(html)
+    builder.close()
+    return builder.root
+
+
+# ---------------------------------------------------------------------- CSS 选择器（常用子集）
+
+_COMPOUND_RE = re.compile(
+    r"""(?P<tag>\*|[a-zA-Z][\w-]*)
+      |\#(?P<id>[\w-]+)
+      |\.(?P<cls>[\w-]+)
+      |\[\s*(?P<attr>[\w:-]+)\s*(?:(?P<op>[~^$*|]?=)\s*(?:"(?P<dq>[^"]*)"|'(?P<sq>[^']*)'|(?P<bare>[^\]\s]+))\s*)?\]
+    """,
+    re.VERBOSE,
+)
+
+_ATTR_OPS = {
+    "=": lambda actual, expected: actual == expected,
+    "~=": lambda actual, expected: expected in actual.split(),
+    "^=": lambda actual, expected: bool(expected) and actual.startswith(expected),
+    "$=": lambda actual, expected: bool(expected) and actual.endswith(expected),
+    "*=": lambda actual, expected: bool(expected) and expected in actual,
+    "|=": lambda actual, expected: actual == expected or actual.startswith(expected + "-"),
+}
+
+
+def _parse_compound(text):
+    """"h3[data-test='error'].x" -> [(kind, ...), ...]"""
+    parts, pos = [], 0
+    while pos < len(text):
+        m = _COMPOUND_RE.match(text, pos)
+        if not m:
+            raise UnsupportedLocator(f"不支持的 CSS 语法: {text[pos:]!r}")
+        if m.group("tag"):
+            parts.append(("tag", m.group("tag").lower()))
+        elif m.group("id"):
+            parts.append(("attr", "id", "=", m.group("id")))
+        elif m.group("cls"):
+            parts.append(("attr", "class", "~=", m.group("cls")))
+        else:
+            value = next((v for v in (m.group("dq"), m.group("sq"), m.group("bare")) if v is not None), None)
+            parts.append(("attr", m.group("attr").lower(), m.group("op"), value))
+        pos = m.end()
+    return parts
+
+
+def _split_selector(text):
+    """按顶层的逗号和组合符切分，方括号里的内容（例如 [class~=x]、[title='a b']）保持完整"""
+    tokens, buf, depth, quote = [], "", 0, None
+    for ch in text:
+        if quote:
+            buf += ch
+            quote = None if ch == quote else quote
+        elif ch in "'\"":
+            buf += ch
+            quote = ch
+        elif ch == "[":
+            depth += 1
+            buf += ch
+        elif ch == "]":
+            depth -= 1
+            buf += ch
+        elif depth == 0 and (ch.isspace() or ch in ">+~,"):
+            if buf:
+                tokens.append(buf)
+                buf = ""
+            if not ch.isspace():
+                tokens.append(ch)
+        else:
+            buf += ch
+    if buf:
+        tokens.append(buf)
+    return tokens
+
+
+def _parse_selector(selector):
+    """逗号分隔的选择器列表 -> [[(组合符, 复合选择器), ...], ...]
+
+    组合符（" " / ">" / "+" / "~"）写在它右边的复合选择器上：chain[i][0] 是 chain[i-1] 与 chain[i] 的关系
+    """
+    result, chain, combinator = [], [], " "
+    for token in _split_selector(selector) + [","]:
+        if token == ",":
+            if not chain:
+                raise UnsupportedLocator(f"空选择器: {selector!r}")
+            result.append(chain)
+            chain, combinator = [], " "
+        elif token in (">", "+", "~"):
+            combinator = token
+        else:
+            chain.append((combinator, _parse_compound(token)))
+            combinator = " "
+    return result
+
+
+def _matches_compound(node, parts):
+    for part in parts:
+        if part[0] == "tag":
+            if part[1] != "*" and node.tag != part[1]:
+                return False
+            continue
+        _, name, op, expected = part
+        if name not in node.attrs:
+            return False
+        if op and not _ATTR_OPS[op](node.attrs[name], expected):
+            return False
+    return True
+
+
+def _matches_chain(node, chain, index):
+    combinator, parts = chain[index]
+    if not _matches_compound(node, parts):
+        return False
+    if index == 0:
+        return True
+    if combinator == ">":
+        parent = node.parent
+        return parent is not None and parent.tag != "#document" and _matches_chain(parent, chain, index - 1)
+    if combinator == " ":
+        ancestor = node.parent
+        while ancestor is not None and ancestor.tag != "#document":
+            if _matches_chain(ancestor, chain, index - 1):
+                return True
+            ancestor = ancestor.parent
+        return False
+    siblings = node.previous_siblings()
+    if combinator == "+":
+        return bool(siblings) and _matches_chain(siblings[0], chain, index - 1)
+    return any(_matches_chain(s, chain, index - 1) for s in siblings)  # "~"
+
+
+def select(root: Node, selector: str) -> list:
+    """按 CSS 选择器查找元素（文档顺序，去重）"""
+    chains = _parse_selector(selector)
+    return [node for node in root.iter() if any(_matches_chain(node, chain, len(chain) - 1) for chain in chains)]
+
+
+def find_all(root: Node, locator) -> list:
+    """静态版的 driver.find_elements：支持 ID / CLASS_NAME / CSS_SELECTOR / NAME / TAG_NAME"""
+    by, value = locator
+    if by == By.ID:
+        return [n for n in root.iter() if n.attrs.get("id") == value]
+    if by == By.CLASS_NAME:
+        return [n for n in root.iter() if value.strip() in n.classes]
+    if by == By.NAME:
+        return [n for n in root.iter() if n.attrs.get("name") == value]
+    if by == By.TAG_NAME:
+        return [n for n in root.iter() if n.tag == value.lower()]
+    if by == By.CSS_SELECTOR:
+        return select(root, value)
+    raise UnsupportedLocator(f"静态检查不支持的定位方式: {by}")
+
+
+# ---------------------------------------------------------------------- 页面对象与快照
+
+
+def page_locators() -> dict:
+    """收集 pages/ 下所有页面对象类的类级定位器：{"CheckoutPage.ERROR_MESSAGE": (By, value)}"""
+    import pages
+    from pages.base_page import BasePage
+
+    result = {}
+    for module_info in pkgutil.iter_modules(pages.__path__):
+        module = importlib.import_module(f"pages.{module_info.name}")
+        for _, cls in inspect.getmembers(module, inspect.isclass):
+            if not issubclass(cls, BasePage) or cls.__module__ != module.__name__:
+                continue
+            for attr, value in vars(cls).items():
+                if (attr.isupper() and isinstance(value, tuple) and len(value) == 2
+                        and isinstance(value[0], str) and isinstance(value[1], str)):
+                    result[f"{cls.__name__}.{attr}"] = value
+    return dict(sorted(result.items()))
+
+
+def snapshot_dir(directory=None) -> str:
+    return directory or getattr(Config, "LOCATOR_SNAPSHOT_DIR", "data/html_snapshots")
+
+
+def load_manifest(directory=None) -> dict:
+    path = os.path.join(snapshot_dir(directory), "manifest.json")
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def load_snapshots(directory=None) -> dict:
+    """{状态名: DOM 根节点}"""
+    directory = snapshot_dir(directory)
+    manifest = load_manifest(directory)
+    snapshots = {}
+    for state, info in manifest.get("states", {}).items():
+        with open(os.path.join(directory, info["file"]), encoding="utf-8") as f:
+            snapshots[state] = parse_html(f.read())
+    return snapshots
+
+
+def count_matches(locators: dict, snapshots: dict) -> dict:
+    """{定位器名: {状态名: 匹配数}}；不支持的定位器值为错误信息字符串"""
+    counts = {}
+    for name, locator in locators.items():
+        try:
+            counts[name] = {state: len(find_all(root, locator)) for state, root in snapshots.items()}
+        except UnsupportedLocator as e:
+            counts[name] = str(e)
+    return counts
+
+
+def check_locators(directory=None) -> dict:
+    """对比当前定位器与录制的快照，返回 {"missing", "ambiguous", "unsupported", "ok", "states"}"""
+    manifest = load_manifest(directory)
+    snapshots = load_snapshots(directory)
+    if not snapshots:
+        raise FileNotFoundError(f"{snapshot_dir(directory)} 下没有录制的快照，先运行 python -m utils.locator_check --record")
+
+    locators = page_locators()
+    recorded = manifest.get("locators", {})
+    report = {"missing": [], "ambiguous": [], "unsupported": [], "ok": [], "states": sorted(snapshots)}
+    for name, counts in count_matches(locators, snapshots).items():
+        if isinstance(counts, str):
+            report["unsupported"].append({"locator": name, "value": list(locators[name]), "reason": counts})
+            continue
+        entry = {"locator": name, "value": list(locators[name]),
+                 "matches": {state: n for state, n in counts.items() if n}}
+        # 录制时本来就匹配多个节点的（商品列表、按钮列表等）允许多个
+        multiple = recorded.get(name, {}).get("multiple", False)
+        if not any(counts.values()):
+            report["missing"].append(entry)
+        elif not multiple and max(counts.values()) > 1:
+            report["ambiguous"].append(entry)
+        else:
+            report["ok"].append(entry)
+    return report
+
+
+# ---------------------------------------------------------------------- 录制
+
+
+def _record_flow(driver):
+    """按顺序走到每个页面状态，产出 (状态名, URL, HTML)"""
+    from pages.cart_page import CartPage
+    from pages.checkout_page import CheckoutPage
+    from pages.home_page import HomePage
+    from pages.login_page import LoginPage
+
+    def page_html():
+        return driver.current_url, driver.execute_script(_OUTER_HTML_JS)
+
+    login, home = LoginPage(driver), HomePage(driver)
+    cart, checkout = CartPage(driver), CheckoutPage(driver)
+
+    login.open()
+    yield ("login", *page_html())
+    login.login(Config.INVALID_USERNAME, Config.INVALID_PASSWORD)
+    login.waiter.present(login.ERROR_MESSAGE)
+    yield ("login_error", *page_html())
+
+    login.open().login(Config.VALID_USERNAME, Config.VALID_PASSWORD)
+    login.waiter.present(login.PRODUCTS_TITLE)
+    yield ("inventory", *page_html())
+    home.add_products_by_index([0])
+    yield ("inventory_with_cart", *page_html())
+
+    home.go_to_cart()
+    yield ("cart", *page_html())
+    cart.click_checkout()
+    yield ("checkout_step_one", *page_html())
+    checkout.click_continue()
+    checkout.waiter.present(checkout.ERROR_MESSAGE)
+    yield ("checkout_step_one_error", *page_html())
+
+    checkout.enter_checkout_info("Test", "User", "12345").click_continue()
+    checkout.wait_for_checkout_step_two()
+    yield ("checkout_step_two", *page_html())
+    checkout.click_finish()
+    checkout.wait_for_order_complete()
+    yield ("checkout_complete", *page_html())
+
+
+def record_snapshots(driver, directory=None) -> dict:
+    """录制各页面状态的 HTML，并记下每个定位器录制时是否匹配多个节点，写 manifest.json"""
+    directory = snapshot_dir(directory)
+    os.makedirs(directory, exist_ok=True)
+    states, snapshots = {}, {}
+    for state, url, html in _record_flow(driver):
+        filename = f"{state}.html"
+        with open(os.path.join(directory, filename), "w", encoding="utf-8") as f:
+            f.write(html)
+        states[state] = {"file": filename, "url": url}
+        snapshots[state] = parse_html(html)
+
+    locators = {}
+    for name, counts in count_matches(page_locators(), snapshots).items():
+        if not isinstance(counts, str):
+            locators[name] = {"multiple": max(counts.values(), default=0) > 1}
+
+    manifest = {"base_url": Config.BASE_URL, "states": states, "locators": locators}
+    with open(os.path.join(directory, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return manifest
+
+
+def _print_report(report):
+    print(f"快照: {', '.join(report['states'])}")
+    print(f"通过 {len(report['ok'])} / 匹配不到 {len(report['missing'])} / 匹配多个 {len(report['ambiguous'])}"
+          f" / 不支持 {len(report['unsupported'])}")
+    for entry in report["missing"]:
+        print(f"  ✗ missing    {entry['locator']} {tuple(entry['value'])}")
+    for entry in report["ambiguous"]:
+        where = ", ".join(f"{state}={n}" for state, n in entry["matches"].items() if n > 1)
+        print(f"  ✗ ambiguous  {entry['locator']} {tuple(entry['value'])}: {where}")
+    for entry in report["unsupported"]:
+        print(f"  ? unsupported {entry['locator']}: {entry['reason']}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="静态定位器检查：用录制的页面 HTML 校验页面对象的定位器（不启动浏览器）")
+    parser.add_argument("--record", action="store_true", help="启动浏览器重新录制各页面状态的 HTML 快照")
+    parser.add_argument("--local", action="store_true", help="录制本地替身站点（默认录制 Config.BASE_URL）")
+    parser.add_argument("--dir", default=None, help=f"快照目录（默认 {snapshot_dir()}）")
+    parser.add_argument("--json", default=None, help="检查结果另存为 JSON")
+    args = parser.parse_args(argv)
+
+    if args.record:
+        from utils.driver_setup import DriverSetup
+
+        site = None
+        if args.local:
+            from utils.local_site import LocalSite
+
+            site = LocalSite().start()
+            Config.BASE_URL = site.url
+        driver = DriverSetup.get_driver()
+        try:
+            manifest = record_snapshots(driver, args.dir)
+        finally:
+            DriverSetup.quit_quietly(driver)
+            if site is not None:
+                site.stop()
+        print(f"已录制 {len(manifest['states'])} 个页面状态到 {snapshot_dir(args.dir)}")
+
+    try:
+        report = check_locators(args.dir)
+    except FileNotFoundError as e:
+        print(e)
+        return 2
+    _print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    return 1 if report["missing"] or report["ambiguous"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,24 @@
+import json
+
+from selenium.webdriver.common.by import By
+
+
+def to_css(locator) -> str:
+    """把页面对象里的 (By, value) 定位器转换成 CSS 选择器，供页面内 JS 使用"""
+    by, value = locator
+    if by == By.CSS_SELECTOR:
+        return value
+    if by == By.ID:
+        return f"[id={json.dumps(value)}]"
+    if by == By.NAME:
+        return f"[name={json.dumps(value)}]"
+    if by == By.CLASS_NAME:
+        return "." + value.strip()
+    if by == By.TAG_NAME:
+        return value
+    raise ValueError(f"无法转换为 CSS 选择器的定位方式: {by}")
+
+
+def js_string(value: str) -> str:
+    """把 Python 字符串安全地嵌入到 JS 源码中"""
+    return json.dumps(value, ensure_ascii=False)
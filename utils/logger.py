@@ -1,25 +1,196 @@
+import atexit
+import contextvars
+import glob
+import json
 import logging
+import logging.handlers
 import os
+import queue
+import threading
+import time
 from datetime import datetime
 
 from config import Config
 
+# 当前用例 ID（conftest 在每个用例开始/结束时设置），写入每条日志的 test_id 字段
+_test_id = contextvars.ContextVar("test_id", default="")
+
 
 def _ensure_dir(path: str) -> None:
     os.makedirs(path, exist_ok=True)
 
 
+def set_test_id(test_id: str) -> None:
+    _test_id.set(test_id or "")
+
+
+def get_test_id() -> str:
+    return _test_id.get()
+
+
+def _level():
+    level_name = str(getattr(Config, "LOG_LEVEL", "INFO")).upper()
+    return getattr(logging, level_name, logging.INFO)
+
+
+class _TestIdFilter(logging.Filter):
+    """在调用线程上给日志记录打上 test_id（后台线程拿不到调用方的上下文）"""
+
+    def filter(self, record):
+        record.test_id = _test_id.get()
+        return True
+
+
+class _JsonFormatter(logging.Formatter):
+    def format(self, record):
+        return json.dumps({
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "test_id": getattr(record, "test_id", ""),
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }, ensure_ascii=False)
+
+
+class _RoutingHandler(logging.Handler):
+    """运行在后台监听线程里：按 logger 名称分发到各自的文件
+
+    每个名称两份文件：
+    - <name>.log：固定文件名，每次运行覆盖，方便找
+    - <name>_<时间戳>.log：历史文件，按大小（或时间）轮转，旧文件按数量/天数清理
+    """
+
+    def __init__(self, log_dir, fmt):
+        super().__init__()
+        self.log_dir = log_dir
+        self.fmt = fmt
+        self._files = {}
+
+    def _handlers_for(self, name):
+        handlers = self._files.get(name)
+        if handlers is None:
+            _prune_history(self.log_dir, name)
+
+            fixed = logging.FileHandler(os.path.join(self.log_dir, f"{name}.log"), mode="w", encoding="utf-8")
+
+            ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+            hist_file = os.path.join(self.log_dir, f"{name}_{ts}.log")
+            when = getattr(Config, "LOG_ROTATE_WHEN", "")
+            backups = getattr(Config, "LOG_HISTORY_BACKUPS", 5)
+            if when:
+                hist = logging.handlers.TimedRotatingFileHandler(
+                    hist_file, when=when, backupCount=backups, encoding="utf-8"
+                )
+            else:
+                hist = logging.handlers.RotatingFileHandler(
+                    hist_file, maxBytes=getattr(Config, "LOG_HISTORY_MAX_BYTES", 10 * 1024 * 1024),
+                    backupCount=backups, encoding="utf-8",
+                )
+
+            handlers = (fixed, hist)
+            for h in handlers:
+                h.setFormatter(self.fmt)
+            self._files[name] = handlers
+        return handlers
+
+    def emit(self, record):
+        for h in self._handlers_for(record.name):
+            h.handle(record)
+
+    def close(self):
+        for handlers in self._files.values():
+            for h in handlers:
+                h.close()
+        self._files.clear()
+        super().close()
+
+
+def _prune_history(log_dir, name):
+    """清理同名的历史日志：超过保留天数的删除，剩余的只保留最近 LOG_RETENTION_COUNT 个"""
+    keep = getattr(Config, "LOG_RETENTION_COUNT", 20)
+    max_age = getattr(Config, "LOG_RETENTION_DAYS", 7) * 86400
+    # 历史文件名 <name>_YYYYmmdd_HHMMSS.log（以及轮转出来的 .log.1 / .log.2024-01-01 等）
+    files = [f for f in glob.glob(os.path.join(glob.escape(log_dir), f"{glob.escape(name)}_*.log*"))
+             if os.path.basename(f)[len(name) + 1:len(name) + 16].replace("_", "").isdigit()]
+    files.sort(key=os.path.getmtime, reverse=True)
+    now = time.time()
+    for i, path in enumerate(files):
+        try:
+            if (max_age and now - os.path.getmtime(path) > max_age) or (keep and i >= keep):
+                os.remove(path)
+        except OSError:
+            pass
+
+
+class _Backend:
+    """日志后端：所有 logger 共用一个队列和一个后台监听线程
+
+    调用线程只把记录放进队列就返回，格式化和文件/控制台 I/O 都在监听线程里完成。
+    """
+
+    def __init__(self):
+        self.log_dir = getattr(Config, "LOG_DIR", "reports/logs/")
+        _ensure_dir(self.log_dir)
+
+        fmt = logging.Formatter(
+            "%(asctime)s | %(levelname)s | %(name)s | %(message)s",
+            datefmt="%Y-%m-%d %H:%M:%S",
+        )
+
+        console = logging.StreamHandler()
+        console.setFormatter(fmt)
+        handlers = [_RoutingHandler(self.log_dir, fmt), console]
+
+        # 可选：结构化 JSONL（每行一条，带 test_id，方便按用例过滤/聚合）
+        self.jsonl_file = None
+        if getattr(Config, "LOG_JSONL", False):
+            self.jsonl_file = os.path.join(self.log_dir, "log.jsonl")
+            jsonl = logging.FileHandler(self.jsonl_file, mode="w", encoding="utf-8")
+            jsonl.setFormatter(_JsonFormatter())
+            handlers.append(jsonl)
+
+        self.queue = queue.SimpleQueue()
+        self.listener = logging.handlers.QueueListener(self.queue, *handlers)
+        self.listener.start()
+
+    def stop(self):
+        self.listener.stop()
+        for h in self.listener.handlers:
+            h.close()
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def _get_backend() -> _Backend:
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = _Backend()
+            atexit.register(shutdown_logging)
+        return _backend
+
+
+def shutdown_logging() -> None:
+    """停止后台监听线程并把队列里剩余的日志写完（进程退出时会自动调用）"""
+    global _backend
+    with _backend_lock:
+        backend, _backend = _backend, None
+    if backend is not None:
+        backend.stop()
+
+
 def get_logger(name: str = "SeleniumTest") -> logging.Logger:
     """
-    获取全局 logger：控制台 + 文件
+    获取全局 logger：控制台 + 文件（写入在后台线程完成，不阻塞调用方）
     - 文件固定输出到 reports/logs/<name>.log（每次运行覆盖，方便找）
-    - 同时保留一份带时间戳的历史日志
+    - 同时保留一份带时间戳的历史日志（按大小/时间轮转，旧文件自动清理）
+    - Config.LOG_JSONL 开启时额外写 reports/logs/log.jsonl
     """
-    log_dir = getattr(Config, "LOG_DIR", "reports/logs/")
-    _ensure_dir(log_dir)
-
-    level_name = str(getattr(Config, "LOG_LEVEL", "INFO")).upper()
-    level = getattr(logging, level_name, logging.INFO)
+    backend = _get_backend()
+    level = _level()
 
     logger = logging.getLogger(name)
     logger.setLevel(level)
@@ -29,38 +200,18 @@ def get_logger(name: str = "SeleniumTest") -> logging.Logger:
     if logger.handlers:
         return logger
 
-    fmt = logging.Formatter(
-        "%(asctime)s | %(levelname)s | %(name)s | %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S",
-    )
-
-    # 固定文件（覆盖）
-    fixed_log_file = os.path.join(log_dir, f"{name}.log")
-    fh_fixed = logging.FileHandler(fixed_log_file, mode="w", encoding="utf-8")
-    fh_fixed.setLevel(level)
-    fh_fixed.setFormatter(fmt)
-
-    # 历史文件（可选，但很有用）
-    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-    hist_log_file = os.path.join(log_dir, f"{name}_{ts}.log")
-    fh_hist = logging.FileHandler(hist_log_file, mode="w", encoding="utf-8")
-    fh_hist.setLevel(level)
-    fh_hist.setFormatter(fmt)
-
-    # 控制台
-    ch = logging.StreamHandler()
-    ch.setLevel(level)
-    ch.setFormatter(fmt)
-
-    logger.addHandler(fh_fixed)
-    logger.addHandler(fh_hist)
-    logger.addHandler(ch)
+    qh = logging.handlers.QueueHandler(backend.queue)
+    qh.setLevel(level)
+    qh.addFilter(_TestIdFilter())
+    logger.addHandler(qh)
 
-    # ✅ 写一条，确保文件立刻生成 & 你能看到路径
-    logger.info("Logger initialized. fixed=%s | hist=%s", fixed_log_file, hist_log_file)
+    logger.info("Logger initialized. dir=%s", backend.log_dir)
 
     return logger
 
 
-# 给外部直接 import 用
-logger = get_logger()
+def __getattr__(name):
+    # 给外部直接 `from utils.logger import logger` 用：第一次访问时才创建
+    if name == "logger":
+        return get_logger()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,126 @@
+import itertools
+import random
+
+
+class MatrixCase:
+    """组合矩阵里的一条用例：每个字段取哪个取值（标签）以及对应的实际值"""
+
+    def __init__(self, labels: dict, values: dict):
+        self.labels = labels
+        self.values = values
+
+    @property
+    def id(self) -> str:
+        return "-".join(f"{field}={label}" for field, label in self.labels.items())
+
+    def __getitem__(self, field):
+        return self.values[field]
+
+    def __repr__(self):
+        return f"MatrixCase({self.id})"
+
+
+def _normalize(domains: dict) -> dict:
+    """字段取值域统一成 {字段: {标签: 值}}；传列表时值本身就是标签"""
+    result = {}
+    for field, domain in domains.items():
+        result[field] = dict(domain) if isinstance(domain, dict) else {v: v for v in domain}
+        if not result[field]:
+            raise ValueError(f"字段 {field} 的取值域为空")
+    return result
+
+
+def _allowed(assignment: dict, constraints) -> bool:
+    return all(constraint(assignment) for constraint in constraints)
+
+
+def covering_cases(domains: dict, strength=2, constraints=(), candidates=20, seed=0):
+    """按 t 元组合覆盖（默认两两组合）逐条生成用例（生成器，按需产出）
+
+    domains：{字段: {标签: 值}} 或 {字段: [值, ...]}
+    constraints：约束函数列表，参数是 {字段: 标签}。生成过程中会传入只含部分字段的赋值，
+        所以约束只在涉及的字段都已赋值时判断，例如 lambda c: not (c.get("user") == "x" and c.get("zip") == "long")
+    每条用例都尽量多覆盖尚未覆盖的 t 元组合（AETG 式贪心：每轮构造 candidates 个候选取最好的），
+    直到所有满足约束的 t 元组合都被覆盖。相同参数得到的序列是确定的。
+    """
+    domains = _normalize(domains)
+    fields = list(domains)
+    strength = max(1, min(strength, len(fields)))
+    rng = random.Random(seed)
+
+    combos = list(itertools.combinations(fields, strength))
+    uncovered = set()
+    for combo in combos:
+        for labels in itertools.product(*(domains[f] for f in combo)):
+            if _allowed(dict(zip(combo, labels)), constraints):
+                uncovered.add((combo, labels))
+
+    def newly_covered(assignment):
+        return sum(
+            1 for combo in combos
+            if all(f in assignment for f in combo) and (combo, tuple(assignment[f] for f in combo)) in uncovered
+        )
+
+    def build_candidate(pool):
+        # 从一个尚未覆盖的组合出发，其余字段按随机顺序逐个挑“新覆盖最多”的取值
+        seed_combo = rng.choice(pool)
+        assignment = dict(zip(*seed_combo))
+        rest = [f for f in fields if f not in assignment]
+        rng.shuffle(rest)
+        for field in rest:
+            best, best_score = None, -1
+            options = list(domains[field])
+            rng.shuffle(options)
+            for label in options:
+                trial = dict(assignment, **{field: label})
+                if not _allowed(trial, constraints):
+                    continue
+                score = newly_covered(trial)
+                if score > best_score:
+                    best, best_score = label, score
+            if best is None:
+                # 这个组合在约束下无法补全成完整用例，不再要求覆盖
+                uncovered.discard(seed_combo)
+                return None
+            assignment[field] = best
+        return assignment
+
+    while uncovered:
+        best, best_score = None, 0
+        pool = sorted(uncovered, key=repr)  # 排序后再随机挑选，保证结果可复现
+        for _ in range(max(1, candidates)):
+            assignment = build_candidate(pool)
+            if assignment is None:
+                continue
+            score = newly_covered(assignment)
+            if score > best_score:
+                best, best_score = assignment, score
+        if best is None:
+            continue
+        for combo in combos:
+            uncovered.discard((combo, tuple(best[f] for f in combo)))
+        labels = {f: best[f] for f in fields}
+        yield MatrixCase(labels, {f: domains[f][label] for f, label in labels.items()})
+
+
+def full_product_size(domains: dict, constraints=()) -> int:
+    """完整笛卡尔积（满足约束）的用例数，用于和组合覆盖的规模对比"""
+    domains = _normalize(domains)
+    fields = list(domains)
+    return sum(
+        1 for labels in itertools.product(*(domains[f] for f in fields))
+        if _allowed(dict(zip(fields, labels)), constraints)
+    )
+
+
+def group_cases(cases, key):
+    """按共用的前置条件分组（例如同一个登录用户），返回 [(key 值, [case, ...]), ...]，保持首次出现的顺序
+
+    同一组的用例可以在一个浏览器会话里依次执行，只做一次登录 / 加购。
+    key：字段名，或 callable(case)
+    """
+    groups = {}
+    for case in cases:
+        value = case.labels[key] if isinstance(key, str) else key(case)
+        groups.setdefault(value, []).append(case)
+    return list(groups.items())
@@ -0,0 +1,234 @@
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+from selenium.common.exceptions import WebDriverException
+
+from config import Config
+from utils.logger import get_test_id
+from utils.step_tracker import step_tracker
+
+# 读取当前页面的导航计时和资源计时（Navigation / Resource Timing API）
+_NAVIGATION_METRICS_JS = """
+var nav = performance.getEntriesByType("navigation")[0];
+var resources = performance.getEntriesByType("resource");
+var bytes = 0, encoded = 0, byType = {};
+for (var i = 0; i < resources.length; i++) {
+    var r = resources[i], type = r.initiatorType || "other";
+    bytes += r.transferSize || 0;
+    encoded += r.encodedBodySize || 0;
+    byType[type] = byType[type] || {count: 0, transfer_bytes: 0};
+    byType[type].count += 1;
+    byType[type].transfer_bytes += r.transferSize || 0;
+}
+var docBytes = nav ? (nav.transferSize || 0) : 0;
+return {
+    url: location.href,
+    dom_content_loaded_ms: nav ? nav.domContentLoadedEventEnd : null,
+    load_ms: nav && nav.loadEventEnd ? nav.loadEventEnd : null,
+    resources: resources.length,
+    transfer_bytes: bytes + docBytes,
+    encoded_bytes: encoded + (nav ? (nav.encodedBodySize || 0) : 0),
+    by_type: byType
+};
+"""
+
+
+def navigation_metrics(driver) -> dict:
+    """当前页面的导航耗时和传输字节数（被拦截的资源不会出现在资源计时里）"""
+    return driver.execute_script(_NAVIGATION_METRICS_JS)
+
+
+def measure_navigation(driver, url) -> dict:
+    """导航到 url 并返回 driver.get 的实际阻塞时间 + 页面计时
+
+    get_ms 就是测试代码等待的时间：页面加载策略为 eager 时在 DOMContentLoaded 返回，
+    normal 时要等 load（包括图片、字体）。
+    """
+    start = time.perf_counter()
+    driver.get(url)
+    metrics = navigation_metrics(driver)
+    metrics["get_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    return metrics
+
+
+# ---------------------------------------------------------------------- 被测站点前端性能采集
+
+# 一次脚本调用：导航计时 + 绘制指标 + 本页新增的资源计时 + 当前用户（SauceDemo 的会话 cookie）
+# 同一个文档里第二次采集说明是单页应用内的路由切换（soft），只统计上次采集之后加载的资源
+_PAGE_TIMING_JS = """
+var soft = !!window.__pageTimingSeen, since = window.__pageTimingLast || 0;
+window.__pageTimingSeen = true;
+window.__pageTimingLast = performance.now();
+
+var out = {path: location.pathname, soft: soft, nav: null, paint: {}, user: ""};
+var nav = performance.getEntriesByType("navigation")[0];
+if (nav && !soft) {
+    out.nav = {
+        ttfb_ms: nav.responseStart,
+        dom_content_loaded_ms: nav.domContentLoadedEventEnd,
+        load_ms: nav.loadEventEnd || null,
+        transfer_bytes: nav.transferSize || 0
+    };
+    performance.getEntriesByType("paint").forEach(function (p) { out.paint[p.name] = p.startTime; });
+}
+
+var resources = performance.getEntriesByType("resource"), count = 0, bytes = 0, slowest = [];
+for (var i = 0; i < resources.length; i++) {
+    var r = resources[i];
+    if (r.startTime < since) { continue; }
+    count += 1;
+    bytes += r.transferSize || 0;
+    slowest.push({name: r.name, type: r.initiatorType, duration_ms: r.duration});
+}
+slowest.sort(function (a, b) { return b.duration_ms - a.duration_ms; });
+out.resources = {count: count, transfer_bytes: bytes, slowest: slowest.slice(0, 3)};
+
+var m = document.cookie.match(/(?:^|; )session-username=([^;]*)/);
+out.user = m ? decodeURIComponent(m[1]) : "";
+return out;
+"""
+
+# 参与 p50 / p95 汇总和回归判断的指标
+# duration_ms：完整导航的加载耗时；transition_ms：单页应用路由切换（从触发操作到新页面就绪）的耗时
+TIMING_METRICS = ("duration_ms", "transition_ms", "ttfb_ms", "dom_content_loaded_ms", "load_ms",
+                  "first_contentful_paint_ms")
+
+
+class PageTimingCollector:
+    """被测站点的前端性能采集（Config.PAGE_TIMING 开启时生效）
+
+    页面对象在每次导航/路由切换完成后调用 capture()：一次脚本读取导航计时、绘制指标和资源计时，
+    并打上当前用例、allure.step、登录用户的标签。会话结束时 finish() 按页面汇总 p50 / p95，
+    追加到趋势文件，并与最近几次运行的中位数（滚动基线）比较，标出回归的页面。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = []
+
+    @staticmethod
+    def enabled() -> bool:
+        return bool(getattr(Config, "PAGE_TIMING", False))
+
+    def capture(self, driver, started=None) -> None:
+        """started：触发导航的操作开始时间（time.perf_counter()），用于计算单页应用路由切换的耗时"""
+        elapsed = round((time.perf_counter() - started) * 1000, 1) if started is not None else None
+        try:
+            data = driver.execute_script(_PAGE_TIMING_JS)
+        except WebDriverException:
+            return
+
+        page = data["path"].rstrip("/").rsplit("/", 1)[-1].replace(".html", "") or "login"
+        if page == "index":
+            page = "login"
+        nav = data["nav"] or {}
+        sample = {
+            "page": page,
+            "soft": data["soft"],
+            "test_id": get_test_id(),
+            "step": step_tracker.current() or "",
+            "user": data["user"],
+            # 完整导航取 load（eager 策略下可能还没触发则取 DOMContentLoaded）
+            "duration_ms": (nav.get("load_ms") or nav.get("dom_content_loaded_ms")) if nav else None,
+            "transition_ms": elapsed if data["soft"] else None,
+            "ttfb_ms": nav.get("ttfb_ms"),
+            "dom_content_loaded_ms": nav.get("dom_content_loaded_ms"),
+            "load_ms": nav.get("load_ms"),
+            "first_contentful_paint_ms": data["paint"].get("first-contentful-paint"),
+            "first_paint_ms": data["paint"].get("first-paint"),
+            "transfer_bytes": nav.get("transfer_bytes", 0) + data["resources"]["transfer_bytes"],
+            "resources": data["resources"],
+        }
+        with self._lock:
+            self.samples.append(sample)
+
+    def aggregate(self) -> dict:
+        """按页面汇总：{page: {count, users, <metric>: {p50, p95}}}"""
+        from utils.profiler import percentile
+
+        pages = {}
+        for sample in self.samples:
+            pages.setdefault(sample["page"], []).append(sample)
+        result = {}
+        for page, samples in sorted(pages.items()):
+            entry = {"count": len(samples), "users": sorted({s["user"] for s in samples if s["user"]})}
+            for metric in TIMING_METRICS:
+                values = sorted(s[metric] for s in samples if s[metric] is not None)
+                if values:
+                    entry[metric] = {"p50": round(percentile(values, 50), 1), "p95": round(percentile(values, 95), 1)}
+            result[page] = entry
+        return result
+
+    @staticmethod
+    def _load_trend(path):
+        if not os.path.exists(path):
+            return []
+        runs = []
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    runs.append(json.loads(line))
+                except ValueError:
+                    continue
+        return runs
+
+    @staticmethod
+    def find_regressions(current, history, window=None, threshold=None):
+        """与滚动基线比较：每个页面每个指标取最近 window 次运行 p50 的中位数，当前 p50 超出 threshold 比例即回归"""
+        window = getattr(Config, "PAGE_TIMING_BASELINE_RUNS", 5) if window is None else window
+        threshold = getattr(Config, "PAGE_TIMING_THRESHOLD", 0.25) if threshold is None else threshold
+        recent = history[-window:] if window else history
+        regressions = []
+        for page, entry in current.items():
+            for metric in TIMING_METRICS:
+                if metric not in entry:
+                    continue
+                past = sorted(run["pages"][page][metric]["p50"] for run in recent
+                              if metric in run.get("pages", {}).get(page, {}))
+                if not past:
+                    continue
+                baseline = past[len(past) // 2]
+                value = entry[metric]["p50"]
+                if baseline > 0 and value > baseline * (1 + threshold):
+                    regressions.append({"page": page, "metric": metric, "p50": value, "baseline": baseline,
+                                        "runs": len(past)})
+        return regressions
+
+    def finish(self) -> dict:
+        """写出本次采样和汇总，追加趋势文件，返回 {"pages", "regressions", "path"}；没有采样返回 None"""
+        if not self.samples:
+            return None
+        from utils.driver_setup import DriverSetup
+        from utils.file_lock import FileLock
+
+        current = self.aggregate()
+        trend_file = getattr(Config, "PAGE_TIMING_TREND_FILE", "reports/page_timing_trend.jsonl")
+        run = {
+            "time": datetime.now().isoformat(timespec="seconds"),
+            "worker": getattr(Config, "WORKER_ID", ""),
+            "base_url": Config.BASE_URL,
+            "profile": DriverSetup.profile()["name"],
+            "pages": current,
+        }
+        # 多个 worker 可能同时追加，读历史和写入都在锁内完成
+        with FileLock(trend_file + ".lock"):
+            history = [r for r in self._load_trend(trend_file)
+                       if r.get("base_url") == run["base_url"] and r.get("profile") == run["profile"]]
+            regressions = self.find_regressions(current, history)
+            os.makedirs(os.path.dirname(trend_file) or ".", exist_ok=True)
+            with open(trend_file, "a", encoding="utf-8") as f:
+                f.write(json.dumps(run, ensure_ascii=False) + "\n")
+
+        directory = getattr(Config, "PAGE_TIMING_DIR", "reports/page_timing/")
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, "page_timing.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({**run, "regressions": regressions, "samples": self.samples}, f, ensure_ascii=False, indent=2)
+        self.samples = []
+        return {"pages": current, "regressions": regressions, "path": path}
+
+
+page_timing = PageTimingCollector()
@@ -0,0 +1,178 @@
+import json
+import os
+import re
+import sys
+import threading
+import time
+
+from config import Config
+from pages.base_page import BasePage
+from utils.step_tracker import step_tracker
+
+_BASE_PAGE_FILE = sys.modules[BasePage.__module__].__file__
+
+# 延迟直方图的桶上限（毫秒），最后一个桶为 “>= 5000”
+HISTOGRAM_BUCKETS_MS = (1, 5, 10, 50, 100, 500, 1000, 5000)
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def _summarize(durations):
+    values = sorted(durations)
+    return {
+        "count": len(values),
+        "total_ms": round(sum(values), 2),
+        "p50_ms": round(percentile(values, 50), 2),
+        "p95_ms": round(percentile(values, 95), 2),
+        "max_ms": round(values[-1], 2) if values else 0.0,
+    }
+
+
+def _histogram(durations):
+    labels = [f"<{b}ms" for b in HISTOGRAM_BUCKETS_MS] + [f">={HISTOGRAM_BUCKETS_MS[-1]}ms"]
+    counts = dict.fromkeys(labels, 0)
+    for d in durations:
+        for bound, label in zip(HISTOGRAM_BUCKETS_MS, labels):
+            if d < bound:
+                counts[label] += 1
+                break
+        else:
+            counts[labels[-1]] += 1
+    return counts
+
+
+def _target_of(command, params):
+    """命令的目标：定位器 / URL / 脚本开头"""
+    if not params:
+        return ""
+    if "using" in params and "value" in params:
+        return f"{params['using']}={params['value']}"
+    if "url" in params:
+        return params["url"]
+    if "script" in params:
+        return " ".join(str(params["script"]).split())[:80]
+    if "text" in params:
+        return "<text>"  # 输入内容可能含密码，不记录
+    return ""
+
+
+def _caller():
+    """沿调用栈找到发起命令的页面对象方法，例如 CheckoutPage.get_item_total
+
+    BasePage 自身的通用方法（snapshot 等）会被跳过，归到调用它的子类方法上；
+    栈上没有页面对象时返回 ""（测试代码直接操作 driver）。
+    """
+    fallback = ""
+    frame = sys._getframe(2)
+    while frame is not None:
+        obj = frame.f_locals.get("self")
+        if isinstance(obj, BasePage):
+            name = f"{type(obj).__name__}.{frame.f_code.co_name}"
+            if frame.f_code.co_filename != _BASE_PAGE_FILE:
+                return name
+            fallback = fallback or name
+        frame = frame.f_back
+    return fallback
+
+
+class CommandProfiler:
+    """WebDriver 命令级性能分析（Config.PROFILE_COMMANDS 开启时由 DriverSetup 挂到 driver 上）
+
+    在 driver 实例上替换 execute：记录每条命令的名称、目标（定位器 / URL）、耗时、
+    发起它的页面对象方法和所在的 allure.step。
+    关闭时不做任何包装，没有额外开销。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._records = []
+        self.test_id = ""
+
+    def attach(self, driver):
+        """包装 driver.execute（同一个 driver 只包装一次）"""
+        if getattr(driver, "_command_profiler", None) is self:
+            return driver
+        # 需要 step_tracker 注册到 allure 才能知道命令所在的 step
+        step_tracker.add_listener(self)
+        original = driver.execute
+
+        def execute(driver_command, params=None):
+            start = time.perf_counter()
+            error = None
+            try:
+                return original(driver_command, params)
+            except Exception as e:
+                error = type(e).__name__
+                raise
+            finally:
+                self.record(driver_command, (time.perf_counter() - start) * 1000,
+                            target=_target_of(driver_command, params), error=error)
+
+        driver.execute = execute
+        driver._command_profiler = self
+        return driver
+
+    def record(self, command, duration_ms, target="", caller=None, error=None):
+        entry = {
+            "command": command,
+            "target": target,
+            "duration_ms": round(duration_ms, 3),
+            "caller": _caller() if caller is None else caller,
+            "step": step_tracker.current() or "",
+            "error": error,
+        }
+        with self._lock:
+            self._records.append(entry)
+
+    def begin_test(self, test_id: str) -> None:
+        with self._lock:
+            self._records = []
+            self.test_id = test_id
+
+    def end_test(self) -> dict:
+        """结束当前用例并返回汇总"""
+        with self._lock:
+            records, self._records = self._records, []
+        return self.summarize(records, self.test_id)
+
+    @staticmethod
+    def summarize(records, test_id="", top_n=None) -> dict:
+        top_n = getattr(Config, "PROFILE_TOP_N", 10) if top_n is None else top_n
+
+        def group(key):
+            buckets = {}
+            for r in records:
+                buckets.setdefault(r[key] or "(none)", []).append(r["duration_ms"])
+            result = {name: _summarize(values) for name, values in buckets.items()}
+            return dict(sorted(result.items(), key=lambda kv: kv[1]["total_ms"], reverse=True))
+
+        durations = [r["duration_ms"] for r in records]
+        return {
+            "test_id": test_id,
+            "commands": len(records),
+            "total_ms": round(sum(durations), 2),
+            "histogram": _histogram(durations),
+            "by_command": group("command"),
+            "by_step": group("step"),
+            "by_page_method": group("caller"),
+            "slowest": sorted(records, key=lambda r: r["duration_ms"], reverse=True)[:top_n],
+        }
+
+    @staticmethod
+    def write(summary: dict, directory=None) -> str:
+        """把汇总写成 JSON，返回文件路径"""
+        directory = directory or getattr(Config, "PROFILE_DIR", "reports/profiles/")
+        os.makedirs(directory, exist_ok=True)
+        name = re.sub(r"[^\w.-]+", "_", summary["test_id"] or "session").strip("_")
+        path = os.path.join(directory, f"{name}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        return path
+
+
+command_profiler = CommandProfiler()
@@ -0,0 +1,138 @@
+import heapq
+import json
+import os
+from pathlib import Path
+
+from config import Config
+
+
+class RunHistory:
+    """用例运行历史（按 nodeid 持久化）
+
+    - duration：用例耗时（setup + call + teardown），用指数滑动平均平滑偶发抖动
+    - runs：累计执行次数
+    - outcomes：最近几次的结果（passed / failed / skipped，最新的在最后）
+    - source：用例函数源码的哈希，用于判断用例最近是否改动过
+
+    文件格式：{"version": 1, "tests": {"<nodeid>": {"duration": 1.23, "runs": 3, "outcomes": [...], "source": "..."}}}
+    """
+
+    VERSION = 1
+    SMOOTHING = 0.5  # 新一次耗时的权重
+    MAX_OUTCOMES = 10  # 每个用例保留最近几次结果
+
+    def __init__(self, path=None):
+        self.path = Path(path or RunHistory.default_path())
+        self.tests = self._load()
+
+    @staticmethod
+    def main_path() -> str:
+        """主历史文件：排序和分片都以它为准（并行 worker 也从这里读）"""
+        return getattr(Config, "RUN_HISTORY_FILE", "reports/run_history.json")
+
+    @staticmethod
+    def default_path() -> str:
+        """本次结果写到哪里：串行执行写主历史文件；并行 worker 只写本次结果到各自目录，由 run_tests.py 汇总
+
+        worker 目录每次运行前会被清空，读取历史（用于排序）要用 main_path()。
+        """
+        worker_id = getattr(Config, "WORKER_ID", "")
+        if worker_id:
+            return os.path.join(Config.REPORT_DIR, "workers", worker_id, "run_history.json")
+        return RunHistory.main_path()
+
+    def _load(self) -> dict:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get("version") != self.VERSION:
+            return {}
+        return dict(data.get("tests") or {})
+
+    def duration(self, nodeid: str, default=None):
+        entry = self.tests.get(nodeid)
+        return entry["duration"] if entry else default
+
+    def recently_failed(self, nodeid: str, runs=None) -> bool:
+        """最近 runs 次（默认 Config.ORDER_RECENT_RUNS）里是否失败过"""
+        runs = getattr(Config, "ORDER_RECENT_RUNS", 3) if runs is None else runs
+        entry = self.tests.get(nodeid)
+        return bool(entry) and "failed" in entry.get("outcomes", [])[-runs:]
+
+    def changed(self, nodeid: str, source) -> bool:
+        """用例是新增的，或源码哈希与上次运行时不同"""
+        entry = self.tests.get(nodeid)
+        return entry is None or (source is not None and entry.get("source") != source)
+
+    def record(self, nodeid: str, duration: float, outcome=None, source=None) -> None:
+        entry = self.tests.get(nodeid)
+        if entry is None:
+            entry = self.tests[nodeid] = {"duration": round(duration, 3), "runs": 1}
+        else:
+            smoothed = entry["duration"] * (1 - self.SMOOTHING) + duration * self.SMOOTHING
+            entry["duration"] = round(smoothed, 3)
+            entry["runs"] = entry.get("runs", 0) + 1
+        if outcome:
+            entry["outcomes"] = (entry.get("outcomes", []) + [outcome])[-self.MAX_OUTCOMES:]
+        if source:
+            entry["source"] = source
+
+    def merge(self, other: "RunHistory") -> None:
+        """把另一份历史（通常是某个 worker 本次的结果）合并进来"""
+        for nodeid, entry in other.tests.items():
+            outcomes = entry.get("outcomes") or [None]
+            self.record(nodeid, entry["duration"], outcomes[-1], entry.get("source"))
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": self.VERSION, "tests": self.tests}, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.path)
+
+
+def plan_shards(nodeids, history: RunHistory, workers: int):
+    """按历史耗时把用例分配到 N 个分片（最长处理时间优先的贪心算法）
+
+    没有历史记录的用例按已知耗时的中位数估算；分片内保持原收集顺序。
+    返回 [(预计耗时, [nodeid, ...]), ...]
+    """
+    workers = max(1, min(int(workers), len(nodeids) or 1))
+    known = sorted(d for d in (history.duration(n) for n in nodeids) if d is not None)
+    fallback = known[len(known) // 2] if known else 1.0
+
+    estimates = {n: history.duration(n, fallback) for n in nodeids}
+    position = {n: i for i, n in enumerate(nodeids)}
+
+    heap = [(0.0, i) for i in range(workers)]
+    shards = [[] for _ in range(workers)]
+    totals = [0.0] * workers
+    for nodeid in sorted(nodeids, key=lambda n: (-estimates[n], position[n])):
+        total, index = heapq.heappop(heap)
+        shards[index].append(nodeid)
+        totals[index] = total + estimates[nodeid]
+        heapq.heappush(heap, (totals[index], index))
+
+    return [(round(totals[i], 3), sorted(shards[i], key=position.get)) for i in range(workers) if shards[i]]
+
+
+def order_nodeids(nodeids, history: RunHistory, smoke=(), sources=None):
+    """失败优先的执行顺序
+
+    1. smoke 用例（其余用例都依赖它们，失败时可以尽早中止）
+    2. 最近失败过、新增或源码改动过的用例
+    3. 其余用例
+    每组内按历史耗时从短到长（没有历史的按 0 计，排在组内最前），耗时相同保持原顺序。
+    sources：{nodeid: 源码哈希}，用于判断改动
+    """
+    sources = sources or {}
+    smoke = set(smoke)
+    position = {n: i for i, n in enumerate(nodeids)}
+
+    def key(nodeid):
+        suspect = history.recently_failed(nodeid) or history.changed(nodeid, sources.get(nodeid))
+        return (nodeid not in smoke, not suspect, history.duration(nodeid, 0.0), position[nodeid])
+
+    return sorted(nodeids, key=key)
@@ -0,0 +1,177 @@
+import json
+import threading
+import time
+from urllib.parse import urlsplit
+
+from selenium.common.exceptions import WebDriverException
+
+from config import Config
+from utils.driver_setup import DriverSetup
+
+# 把快照里的 localStorage 写回页面
+_RESTORE_STORAGE_JS = """
+var items = arguments[0];
+try {
+    window.localStorage.clear();
+    for (var key in items) { window.localStorage.setItem(key, items[key]); }
+} catch (e) {}
+"""
+
+# CDP 注入脚本：在页面自身脚本执行前写入 localStorage（只对快照所属的源生效）
+_PRELOAD_JS = """
+(function () {
+    if (location.origin !== %(origin)s) { return; }
+    try {
+        var items = %(items)s;
+        window.localStorage.clear();
+        for (var key in items) { window.localStorage.setItem(key, items[key]); }
+    } catch (e) {}
+})();
+"""
+
+_READ_STORAGE_JS = """
+var out = {};
+try {
+    for (var i = 0; i < window.localStorage.length; i++) {
+        var key = window.localStorage.key(i);
+        out[key] = window.localStorage.getItem(key);
+    }
+} catch (e) {}
+return out;
+"""
+
+
+class ScenarioSnapshot:
+    """某个已构建好的场景：cookies + localStorage + 落地页"""
+
+    def __init__(self, origin, landing, cookies, storage):
+        self.origin = origin
+        self.landing = landing
+        self.cookies = cookies
+        self.storage = storage
+        self.created = time.time()
+
+    def is_stale(self, ttl) -> bool:
+        """超过 TTL，或有 cookie 即将过期（30 秒内），视为过期需要重建"""
+        now = time.time()
+        if ttl and now - self.created > ttl:
+            return True
+        return any(c.get("expiry") and c["expiry"] < now + 30 for c in self.cookies)
+
+
+class ScenarioCache:
+    """场景状态缓存：同一会话里每个命名场景只通过 UI 构建一次
+
+    例如 “standard_user 已登录”、“购物车里有第 0、1 个商品”。
+    构建完成后抓取 cookies 和 localStorage（SauceDemo 的会话和购物车都存在这里），
+    之后的用例直接把状态写回浏览器、导航一次落地页即可，不再走登录/加购的 UI。
+
+    恢复后用 verify(driver) 校验页面状态，不通过（会话失效、站点数据变更等）就作废并重建。
+    """
+
+    def __init__(self):
+        self._snapshots = {}
+        self._lock = threading.Lock()
+        self.stats = {"built": 0, "restored": 0, "rebuilt": 0}
+
+    def invalidate(self, name=None) -> None:
+        with self._lock:
+            if name is None:
+                self._snapshots.clear()
+            else:
+                self._snapshots.pop(name, None)
+
+    def restore(self, driver, name, build, landing, verify) -> bool:
+        """把 driver 置于场景 name 的状态，并停在 landing 页面
+
+        build(driver)：通过 UI 构建场景（缓存未命中或快照失效时调用）
+        verify(driver)：当前页面是否处于期望状态
+        返回 True 表示走了缓存快速路径，False 表示通过 UI 构建。
+        """
+        if not getattr(Config, "SCENARIO_CACHE", True):
+            build(driver)
+            return False
+
+        with self._lock:
+            snapshot = self._snapshots.get(name)
+        if snapshot is not None and snapshot.is_stale(getattr(Config, "SCENARIO_CACHE_TTL", 300)):
+            self.invalidate(name)
+            snapshot = None
+
+        if snapshot is not None:
+            try:
+                self._apply(driver, snapshot)
+                if verify(driver):
+                    with self._lock:
+                        self.stats["restored"] += 1
+                    return True
+            except WebDriverException:
+                pass
+            # 快照已不可用：作废并回到干净状态后重建
+            self.invalidate(name)
+            DriverSetup.reset_driver(driver)
+            with self._lock:
+                self.stats["rebuilt"] += 1
+
+        build(driver)
+        self._capture(driver, name, landing)
+        with self._lock:
+            self.stats["built"] += 1
+        return False
+
+    # ------------------------------------------------------------------ 内部实现
+
+    @staticmethod
+    def _origin(url) -> str:
+        parts = urlsplit(url)
+        return f"{parts.scheme}://{parts.netloc}"
+
+    def _capture(self, driver, name, landing) -> None:
+        origin = self._origin(driver.current_url)
+        storage = driver.execute_script(_READ_STORAGE_JS)
+        snapshot = ScenarioSnapshot(origin, landing, driver.get_cookies(), storage)
+        with self._lock:
+            self._snapshots[name] = snapshot
+
+    def _apply(self, driver, snapshot) -> None:
+        url = snapshot.origin + "/" + snapshot.landing.lstrip("/")
+        if hasattr(driver, "execute_cdp_cmd"):
+            self._apply_cdp(driver, snapshot, url)
+        else:
+            # 其他浏览器：必须先处在该源上才能写 cookie / localStorage，多一次导航
+            driver.get(snapshot.origin + "/")
+            for cookie in snapshot.cookies:
+                driver.add_cookie({k: v for k, v in cookie.items() if k != "sameSite" or v})
+            driver.execute_script(_RESTORE_STORAGE_JS, snapshot.storage)
+            driver.get(url)
+
+    @staticmethod
+    def _apply_cdp(driver, snapshot, url) -> None:
+        """Chromium：cookie 直接通过 CDP 写入，localStorage 用“新文档脚本”预置，只导航一次"""
+        for cookie in snapshot.cookies:
+            params = {
+                "name": cookie["name"],
+                "value": cookie["value"],
+                "url": snapshot.origin + cookie.get("path", "/"),
+                "path": cookie.get("path", "/"),
+                "secure": cookie.get("secure", False),
+                "httpOnly": cookie.get("httpOnly", False),
+            }
+            if cookie.get("domain"):
+                params["domain"] = cookie["domain"]
+            if cookie.get("expiry"):
+                params["expires"] = cookie["expiry"]
+            if cookie.get("sameSite"):
+                params["sameSite"] = cookie["sameSite"]
+            driver.execute_cdp_cmd("Network.setCookie", params)
+
+        source = _PRELOAD_JS % {"origin": json.dumps(snapshot.origin), "items": json.dumps(snapshot.storage)}
+        script_id = driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": source})["identifier"]
+        try:
+            driver.get(url)
+        finally:
+            # 只用于这一次导航：之后的导航（例如登出后刷新）不能再被还原
+            driver.execute_cdp_cmd("Page.removeScriptToEvaluateOnNewDocument", {"identifier": script_id})
+
+
+scenario_cache = ScenarioCache()
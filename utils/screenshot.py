@@ -0,0 +1,285 @@
+import base64
+import hashlib
+import io
+import json
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import allure
+from selenium.webdriver.remote.command import Command
+
+from config import Config
+from utils.tracer import tracer
+
+try:  # 可选依赖：缩放 / 转码需要 Pillow，没装时按原始 PNG 写盘
+    from PIL import Image
+except ImportError:  # pragma: no cover - 取决于运行环境
+    Image = None
+
+# 截图类型 -> 在哪些策略下保留
+#   manual：用例/脚本里显式调用的截图
+#   step：每个 allure.step 结束时自动截图
+#   failure：用例失败时自动截图
+POLICIES = {
+    "always": {"manual", "failure"},
+    "step": {"manual", "step", "failure"},
+    "on_failure": {"failure"},
+}
+
+_EXTENSIONS = {"png": ".png", "jpeg": ".jpg", "webp": ".webp"}
+# Allure 附件类型（allure 没有内置 webp，直接给 MIME 类型）
+_ALLURE_TYPES = {"png": allure.attachment_type.PNG, "jpeg": allure.attachment_type.JPG, "webp": "image/webp"}
+
+
+class ScreenshotService:
+    """异步截图服务
+
+    调用线程只向浏览器要一次原始截图数据（base64 字符串）就返回；
+    解码、按内容哈希去重、缩放/转码、写盘都交给后台线程池。
+    """
+
+    def __init__(self, directory=None, policy=None, image_format=None, max_width=None,
+                 quality=None, budget_mb=None, max_workers=None):
+        self.directory = directory or Config.SCREENSHOT_DIR
+        self.policy = (policy or getattr(Config, "SCREENSHOT_POLICY", "always")).lower()
+        if self.policy not in POLICIES:
+            raise ValueError(f"不支持的截图策略: {self.policy}（可选: {', '.join(POLICIES)}）")
+        self.image_format = (image_format or getattr(Config, "SCREENSHOT_FORMAT", "png")).lower()
+        self.max_width = getattr(Config, "SCREENSHOT_MAX_WIDTH", 0) if max_width is None else max_width
+        self.quality = getattr(Config, "SCREENSHOT_QUALITY", 80) if quality is None else quality
+        budget_mb = getattr(Config, "SCREENSHOT_BUDGET_MB", 0) if budget_mb is None else budget_mb
+        self.budget_bytes = int(budget_mb * 1024 * 1024)
+
+        if Image is None and (self.image_format != "png" or self.max_width):
+            # 没有 Pillow 时无法转码/缩放，退回原始 PNG
+            self.image_format, self.max_width = "png", 0
+
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers or getattr(Config, "SCREENSHOT_WORKERS", 2),
+            thread_name_prefix="screenshot",
+        )
+        self._lock = threading.Lock()
+        self._futures = []
+        self._hashes = {}  # 内容哈希 -> 第一次写入这帧内容的 Future（结果是写好的文件名）
+        self._manifest = {}  # 截图名 -> 实际文件（重复帧指向第一次写入的文件）
+        self._stems = set()  # 本服务已分配的截图名（同名截图加序号，已写入的文件不会被覆盖）
+        self._next_suffix = {}  # 截图名 -> 下一个候选序号
+        self._bound_driver = None
+        self.stats = {"captured": 0, "written": 0, "duplicates": 0, "skipped_policy": 0,
+                      "skipped_budget": 0, "errors": 0, "bytes_written": 0}
+
+    # ------------------------------------------------------------------ 调用方接口
+
+    def wants(self, kind: str) -> bool:
+        return kind in POLICIES[self.policy]
+
+    def bind(self, driver) -> None:
+        """绑定当前用例的 driver（用于 step 策略下的自动截图）"""
+        self._bound_driver = driver
+
+    def unbind(self) -> None:
+        self._bound_driver = None
+
+    def capture(self, driver, name: str, kind: str = "manual"):
+        """截图：同步只取原始数据，其余工作异步完成
+
+        name 可以带目录和扩展名（兼容原来的 f"{Config.SCREENSHOT_DIR}xxx.png" 写法），只取文件名部分。
+        返回 Future（被策略跳过时返回 None）。
+        """
+        if not self.wants(kind):
+            with self._lock:
+                self.stats["skipped_policy"] += 1
+            return None
+
+        return self.submit(name, driver.execute(Command.SCREENSHOT)["value"])
+
+    def submit(self, name: str, encoded: str):
+        """提交已经取到的 base64 截图数据，交给后台线程处理
+
+        同名截图（固定名字的步骤截图、重试的步骤、负载模式下的多个虚拟用户）按提交顺序加序号：
+        name、name_2、name_3……，去重时指向的文件不会再被覆盖成别的内容。
+        """
+        with self._lock:
+            self.stats["captured"] += 1
+            future = self._pool.submit(self._process, self._unique_stem(name), encoded)
+            self._futures.append(future)
+        return future
+
+    def attach_to_allure(self, future, name: str, timeout=10) -> bool:
+        """把后台处理好的截图附到 Allure 报告（附件与写盘的文件一致：同样的格式、缩放和去重）
+
+        Allure 附件要在用例所在线程登记，这里只等这一张截图写完；解码 / 转码仍在后台线程完成。
+        """
+        if future is None:
+            return False
+        try:
+            filename = future.result(timeout=timeout)
+        except Exception:
+            return False
+        if not filename:  # 超出截图预算，没有写盘
+            return False
+        allure.attach.file(
+            os.path.join(self.directory, filename), name=name,
+            attachment_type=_ALLURE_TYPES[self.image_format], extension=_EXTENSIONS[self.image_format].lstrip("."),
+        )
+        return True
+
+    def on_step_stop(self, title, exc_val) -> None:
+        """allure.step 结束时的回调（step 策略下自动截图）"""
+        driver = self._bound_driver
+        if driver is None or not self.wants("step"):
+            return
+        safe = "".join(c if c.isalnum() or c in "-_." else "_" for c in (title or "step"))[:60]
+        try:
+            self.capture(driver, f"step_{self.stats['captured'] + 1:03d}_{safe}", kind="step")
+        except Exception:
+            with self._lock:
+                self.stats["errors"] += 1
+
+    def flush(self, timeout=None) -> None:
+        """等待所有已提交的截图写完"""
+        with self._lock:
+            futures, self._futures = self._futures, []
+        for future in futures:
+            try:
+                future.result(timeout=timeout)
+            except Exception:
+                pass
+
+    def close(self) -> dict:
+        """写完剩余截图并输出 manifest.json，返回统计信息"""
+        self.flush()
+        self._pool.shutdown(wait=True)
+        if self._manifest:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(os.path.join(self.directory, "manifest.json"), "w", encoding="utf-8") as f:
+                json.dump(self._manifest, f, ensure_ascii=False, indent=2)
+        return dict(self.stats)
+
+    def _unique_stem(self, name: str) -> str:
+        """调用方持有 self._lock"""
+        base = os.path.splitext(os.path.basename(name))[0] or "screenshot"
+        n = self._next_suffix.get(base, 1)
+        stem = base if n == 1 else f"{base}_{n}"
+        while stem in self._stems:
+            n += 1
+            stem = f"{base}_{n}"
+        self._stems.add(stem)
+        self._next_suffix[base] = n + 1
+        return stem
+
+    # ------------------------------------------------------------------ 后台线程
+
+    def _process(self, name: str, encoded: str) -> str:
+        with tracer.span(f"screenshot {name}", "screenshot"):
+            return self._write(name, encoded)
+
+    def _write(self, stem: str, encoded: str) -> str:
+        try:
+            digest = hashlib.sha1(encoded.encode("ascii")).hexdigest()
+            filename = stem + _EXTENSIONS[self.image_format]
+
+            while True:
+                with self._lock:
+                    pending = self._hashes.get(digest)
+                    if pending is None:
+                        # 第一次见到这帧内容：由本次负责写盘，相同内容的后续截图等它写完
+                        written = self._hashes[digest] = Future()
+                        break
+                # 与之前某一帧完全相同：等那一帧写完，不再写盘，只在 manifest 里指向已有文件。
+                # 那一帧没写成（超出预算或出错）时它已撤销登记，这里重新判断
+                try:
+                    existing = pending.result()
+                except Exception:
+                    existing = ""
+                if existing:
+                    with self._lock:
+                        self.stats["duplicates"] += 1
+                        self._manifest[stem] = {"file": existing, "sha1": digest, "duplicate": True}
+                    return existing
+
+            try:
+                filename = self._write_new(stem, filename, digest, encoded)
+            except BaseException as e:
+                with self._lock:
+                    del self._hashes[digest]
+                written.set_exception(e)
+                raise
+            if not filename:
+                with self._lock:
+                    del self._hashes[digest]
+            written.set_result(filename)
+            return filename
+        except Exception:
+            with self._lock:
+                self.stats["errors"] += 1
+            raise
+
+    def _write_new(self, stem: str, filename: str, digest: str, encoded: str) -> str:
+        """解码、转码并写盘；超出截图预算返回空字符串"""
+        data = self._encode(base64.b64decode(encoded))
+
+        with self._lock:
+            if self.budget_bytes and self.stats["bytes_written"] + len(data) > self.budget_bytes:
+                self.stats["skipped_budget"] += 1
+                return ""
+            self.stats["bytes_written"] += len(data)
+
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(os.path.join(self.directory, filename), "wb") as f:
+                f.write(data)
+        except OSError:
+            with self._lock:
+                self.stats["bytes_written"] -= len(data)
+            raise
+
+        with self._lock:
+            self.stats["written"] += 1
+            self._manifest[stem] = {"file": filename, "sha1": digest, "duplicate": False}
+        return filename
+
+    def _encode(self, png: bytes) -> bytes:
+        if self.image_format == "png" and not self.max_width:
+            return png
+
+        image = Image.open(io.BytesIO(png))
+        if self.max_width and image.width > self.max_width:
+            height = round(image.height * self.max_width / image.width)
+            image = image.resize((self.max_width, height))
+
+        out = io.BytesIO()
+        if self.image_format == "jpeg":
+            image.convert("RGB").save(out, format="JPEG", quality=self.quality, optimize=True)
+        elif self.image_format == "webp":
+            image.save(out, format="WEBP", quality=self.quality)
+        else:
+            image.save(out, format="PNG", optimize=True)
+        return out.getvalue()
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_screenshot_service() -> ScreenshotService:
+    """进程内共享的截图服务（首次使用时创建）"""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = ScreenshotService()
+        return _service
+
+
+def close_screenshot_service():
+    """关闭共享截图服务（等待后台写盘完成），返回统计信息；未创建过返回 None"""
+    global _service
+    with _service_lock:
+        service, _service = _service, None
+    return service.close() if service is not None else None
+
+
+def take_screenshot(driver, name: str, kind: str = "manual"):
+    """截图的便捷入口，替代 driver.save_screenshot(...)"""
+    return get_screenshot_service().capture(driver, name, kind)
@@ -0,0 +1,205 @@
+import json
+import threading
+
+import allure
+from selenium.common.exceptions import (
+    ElementClickInterceptedException,
+    ElementNotInteractableException,
+    StaleElementReferenceException,
+    TimeoutException,
+    WebDriverException,
+)
+
+from config import Config
+from utils.logger import get_logger, get_test_id
+from utils.tracer import tracer
+
+# 可以通过“回到检查点再做一次”消除的瞬时错误；断言失败等确定性错误不重试
+TRANSIENT_ERRORS = (
+    StaleElementReferenceException,
+    TimeoutException,
+    ElementClickInterceptedException,
+    ElementNotInteractableException,
+)
+
+# 一次脚本读出检查点需要的页面状态：URL、localStorage、表单输入值
+_CAPTURE_JS = """
+var storage = {};
+try {
+    for (var i = 0; i < window.localStorage.length; i++) {
+        var key = window.localStorage.key(i);
+        storage[key] = window.localStorage.getItem(key);
+    }
+} catch (e) {}
+var forms = {};
+var fields = document.querySelectorAll("input, textarea, select");
+for (var j = 0; j < fields.length; j++) {
+    var el = fields[j];
+    var key = el.id ? "#" + el.id : (el.name ? "[name=" + el.name + "]" : null);
+    if (!key || el.type === "password" || el.type === "hidden" || el.type === "submit") { continue; }
+    forms[key] = (el.type === "checkbox" || el.type === "radio") ? el.checked : el.value;
+}
+return {url: location.href, storage: storage, forms: forms};
+"""
+
+_RESTORE_STORAGE_JS = """
+var items = arguments[0];
+try {
+    window.localStorage.clear();
+    for (var key in items) { window.localStorage.setItem(key, items[key]); }
+} catch (e) {}
+"""
+
+# React 等框架接管了 value：用原生 setter 赋值并派发 input / change 事件，框架状态才会同步
+_RESTORE_FORMS_JS = """
+var forms = arguments[0];
+for (var key in forms) {
+    var el = key.charAt(0) === "#" ? document.getElementById(key.slice(1))
+                                   : document.querySelector("[name='" + key.slice(6, -1) + "']");
+    if (!el) { continue; }
+    if (typeof forms[key] === "boolean") {
+        if (el.checked !== forms[key]) { el.click(); }
+        continue;
+    }
+    var proto = el.tagName === "TEXTAREA" ? HTMLTextAreaElement.prototype
+              : el.tagName === "SELECT" ? HTMLSelectElement.prototype : HTMLInputElement.prototype;
+    Object.getOwnPropertyDescriptor(proto, "value").set.call(el, forms[key]);
+    el.dispatchEvent(new Event("input", {bubbles: true}));
+    el.dispatchEvent(new Event("change", {bubbles: true}));
+}
+"""
+
+
+class Checkpoint:
+    """步骤开始前的页面状态：URL + cookies + localStorage + 表单值（两条命令，开销很小）"""
+
+    def __init__(self, url, cookies, storage, forms):
+        self.url = url
+        self.cookies = cookies
+        self.storage = storage
+        self.forms = forms
+
+    @classmethod
+    def capture(cls, driver):
+        state = driver.execute_script(_CAPTURE_JS)
+        return cls(state["url"], driver.get_cookies(), state["storage"], state["forms"])
+
+    def restore(self, driver) -> None:
+        """还原状态后重新加载检查点页面，失败步骤留下的半截 DOM（弹层、过期元素）一并丢弃"""
+        driver.delete_all_cookies()
+        for cookie in self.cookies:
+            driver.add_cookie({k: v for k, v in cookie.items() if k != "sameSite" or v})
+        driver.execute_script(_RESTORE_STORAGE_JS, self.storage)
+        driver.get(self.url)
+        if self.forms:
+            driver.execute_script(_RESTORE_FORMS_JS, self.forms)
+
+
+class _RetryLog:
+    """按用例记录发生过的步骤重试，会话结束时在终端汇总（重试成功的步骤也要能看到）"""
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def add(self, test_id, entry) -> None:
+        with self._lock:
+            self._entries.setdefault(test_id, []).append(entry)
+
+    def get(self, test_id) -> list:
+        with self._lock:
+            return list(self._entries.get(test_id, []))
+
+    def summary(self) -> dict:
+        with self._lock:
+            return {test_id: list(entries) for test_id, entries in self._entries.items()}
+
+
+step_retry_log = _RetryLog()
+
+
+class StepAttempt:
+    """一次步骤尝试：with attempt: 进入对应的 allure.step，瞬时错误且还有重试次数时吞掉异常"""
+
+    def __init__(self, retry, number):
+        self._retry = retry
+        self.number = number
+        self.ok = False
+        self.error = None
+        self._step = None
+
+    def __enter__(self):
+        title = self._retry.title
+        if self.number > 1:
+            title = f"{title}（第 {self.number} 次尝试）"
+        self._step = allure.step(title)
+        self._step.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._step.__exit__(exc_type, exc_val, exc_tb)
+        if exc_type is None:
+            self.ok = True
+            return False
+        self.error = exc_val
+        return self._retry._handle_failure(self, exc_val)
+
+
+class StepRetry:
+    """步骤级检查点重试
+
+        for attempt in step_retry(self.driver, "4. 继续到第二步"):
+            with attempt:
+                self.checkout_page.click_continue()
+                assert "checkout-step-two.html" in self.driver.current_url
+
+    - 第一次尝试前保存检查点（URL、cookies、localStorage、表单值）
+    - 步骤抛出 TRANSIENT_ERRORS 之一且还有重试次数时：还原检查点，只重做这一步
+    - 其他异常、或重试次数用完：照常抛出，用例失败
+    - 每次重试都会附到 Allure（失败的那次尝试保留为 broken 步骤），并记入 step_retry_log
+
+    会产生服务端副作用的步骤（重复提交订单等）只在副作用可重复时才适合标记重试。
+    """
+
+    def __init__(self, driver, title, retries=None, errors=TRANSIENT_ERRORS):
+        self.driver = driver
+        self.title = title
+        self.retries = getattr(Config, "STEP_RETRIES", 1) if retries is None else retries
+        self.errors = errors
+        self.checkpoint = None
+        self.attempts = []
+
+    def __iter__(self):
+        if self.retries > 0:
+            self.checkpoint = Checkpoint.capture(self.driver)
+        for number in range(1, self.retries + 2):
+            attempt = StepAttempt(self, number)
+            self.attempts.append(attempt)
+            yield attempt
+            if attempt.ok or attempt.error is None:
+                return
+
+    def _handle_failure(self, attempt, exc) -> bool:
+        if not isinstance(exc, self.errors) or attempt.number > self.retries or self.checkpoint is None:
+            return False
+
+        message = (getattr(exc, "msg", None) or str(exc)).strip()
+        reason = f"{type(exc).__name__}: {message.splitlines()[0] if message else ''}"[:200]
+        entry = {"step": self.title, "attempt": attempt.number, "error": reason, "url": self.checkpoint.url}
+        step_retry_log.add(get_test_id(), entry)
+        if tracer.enabled():
+            tracer.instant(f"retry {self.title}", "retry", entry)
+        get_logger().warning("步骤 %s 第 %s 次尝试遇到瞬时错误，还原检查点后重试: %s", self.title, attempt.number, reason)
+        allure.attach(json.dumps(entry, ensure_ascii=False, indent=2), name=f"Step Retry: {self.title}",
+                      attachment_type=allure.attachment_type.JSON)
+
+        try:
+            self.checkpoint.restore(self.driver)
+        except WebDriverException:
+            # 检查点都还原不了：会话本身出了问题，按原错误失败
+            return False
+        return True
+
+
+def step_retry(driver, title, retries=None, errors=TRANSIENT_ERRORS) -> StepRetry:
+    return StepRetry(driver, title, retries=retries, errors=errors)
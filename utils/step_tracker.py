@@ -0,0 +1,68 @@
+import threading
+
+import allure_commons
+
+
+class _StepTracker:
+    """跟踪当前正在执行的 allure.step
+
+    注册到 allure_commons 的插件管理器：每个 `with allure.step(...)` 进入/退出时
+    都会收到 start_step / stop_step，再转发给已注册的监听者。
+    不依赖 --alluredir，没开 Allure 报告时同样生效。
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._listeners = []
+        self._registered = False
+        self._lock = threading.Lock()
+
+    def _stack(self):
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    def add_listener(self, listener) -> None:
+        """listener 可实现 on_step_start(title) / on_step_stop(title, exc_val)"""
+        with self._lock:
+            if listener not in self._listeners:
+                self._listeners.append(listener)
+            if not self._registered:
+                allure_commons.plugin_manager.register(self)
+                self._registered = True
+
+    def remove_listener(self, listener) -> None:
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def current(self):
+        """当前线程正在执行的 step 标题（嵌套时为最内层），不在 step 内返回 None"""
+        stack = self._stack()
+        return stack[-1][1] if stack else None
+
+    def path(self):
+        """当前线程的 step 嵌套路径（由外到内的标题列表）"""
+        return [title for _, title in self._stack()]
+
+    @allure_commons.hookimpl
+    def start_step(self, uuid, title, params):
+        self._stack().append((uuid, title))
+        for listener in list(self._listeners):
+            if hasattr(listener, "on_step_start"):
+                listener.on_step_start(title)
+
+    @allure_commons.hookimpl
+    def stop_step(self, uuid, exc_type, exc_val, exc_tb):
+        stack = self._stack()
+        title = None
+        for i in range(len(stack) - 1, -1, -1):
+            if stack[i][0] == uuid:
+                title = stack.pop(i)[1]
+                break
+        for listener in list(self._listeners):
+            if hasattr(listener, "on_step_stop"):
+                listener.on_step_stop(title, exc_val)
+
+
+step_tracker = _StepTracker()
@@ -0,0 +1,275 @@
+import argparse
+import functools
+import inspect
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+from config import Config
+
+# DevTools 性能面板里的对时标记：浏览器侧是 console.timeStamp 产生的 TimeStamp 事件，
+# 测试侧是同名的 instant 事件，合并时按两者的时间差平移测试侧的时间线
+SYNC_PREFIX = "selenium-trace-sync"
+
+
+def _now_us() -> int:
+    # perf_counter 与 Chrome 的 TimeTicks 用同一个单调时钟（Linux: CLOCK_MONOTONIC，Windows: QPC）
+    return time.perf_counter_ns() // 1000
+
+
+class Tracer:
+    """测试运行时间线（Chrome / Perfetto trace-event 格式，Config.TRACE 开启时生效）
+
+    记录 fixture 的 setup / teardown、每个 allure.step、页面对象方法、等待、截图写盘和每条 WebDriver 命令，
+    在 chrome://tracing 或 ui.perfetto.dev 里能直接看出它们之间的重叠和空档。
+    事件只以元组追加到内存列表（不加锁、不格式化），会话结束时 flush() 一次写出。
+    """
+
+    def __init__(self):
+        self._events = []
+        self._threads = {}
+        self._track = None  # (线程 ident, 轨道 id)：按用例分轨时，当前用例所在的轨道
+        self._tracks = {}
+        self._open_fixtures = set()
+        self._sync_count = 0
+        self.dropped = 0
+
+    @staticmethod
+    def enabled() -> bool:
+        return bool(getattr(Config, "TRACE", False))
+
+    # ------------------------------------------------------------------ 记录
+
+    def _tid(self) -> int:
+        ident = threading.get_ident()
+        if ident not in self._threads:
+            self._threads[ident] = threading.current_thread().name
+        track = self._track
+        if track is not None and track[0] == ident:
+            return track[1]
+        return ident
+
+    def _add(self, event) -> None:
+        if len(self._events) >= getattr(Config, "TRACE_MAX_EVENTS", 1_000_000):
+            self.dropped += 1
+            return
+        self._events.append(event)
+
+    def complete(self, name, cat, start_us, args=None) -> None:
+        """一个已结束的区间（start_us 为 _now_us() 的返回值）"""
+        self._add(("X", name, cat, start_us, _now_us() - start_us, self._tid(), args))
+
+    def begin(self, name, cat, args=None) -> None:
+        self._add(("B", name, cat, _now_us(), 0, self._tid(), args))
+
+    def end(self, name, cat, args=None) -> None:
+        self._add(("E", name, cat, _now_us(), 0, self._tid(), args))
+
+    def instant(self, name, cat, args=None, ts=None) -> None:
+        self._add(("i", name, cat, _now_us() if ts is None else ts, 0, self._tid(), args))
+
+    def span(self, name, cat, **args):
+        """with tracer.span("...", "cat"): 关闭时返回空上下文"""
+        if not self.enabled():
+            return nullcontext()
+        return self._span(name, cat, args or None)
+
+    @contextmanager
+    def _span(self, name, cat, args):
+        start = _now_us()
+        try:
+            yield
+        finally:
+            self.complete(name, cat, start, args)
+
+    # ------------------------------------------------------------------ 用例分轨
+
+    def begin_test(self, nodeid: str) -> None:
+        """Config.TRACE_TRACKS = "test" 时，本用例在当前线程上的事件放到单独一条轨道"""
+        if getattr(Config, "TRACE_TRACKS", "worker") != "test":
+            return
+        track = self._tracks.setdefault(nodeid, -(len(self._tracks) + 1))
+        self._track = (threading.get_ident(), track)
+
+    def end_test(self) -> None:
+        self._track = None
+
+    # ------------------------------------------------------------------ 插桩
+
+    def wrap(self, func, name, cat):
+        """包装函数：每次调用记录一个区间（参数不用 self 命名，避免被命令分析器当成页面对象方法）"""
+
+        @functools.wraps(func)
+        def traced(*args, **kwargs):
+            start = _now_us()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.complete(name, cat, start)
+
+        traced.__traced__ = True
+        return traced
+
+    def trace_class(self, cls, cat="page") -> None:
+        """包装类里直接定义的公开方法（不含 staticmethod / classmethod / property）"""
+        for attr, value in list(vars(cls).items()):
+            if attr.startswith("_") or not inspect.isfunction(value) or getattr(value, "__traced__", False):
+                continue
+            setattr(cls, attr, self.wrap(value, f"{cls.__name__}.{attr}", cat))
+
+    def attach(self, driver):
+        """包装 driver.execute 记录每条命令，并向浏览器打一个对时标记（同一个 driver 只处理一次）"""
+        if getattr(driver, "_tracer", None) is self:
+            return driver
+        from utils.profiler import _target_of
+
+        original = driver.execute
+
+        def execute(driver_command, params=None):
+            start = _now_us()
+            try:
+                return original(driver_command, params)
+            finally:
+                target = _target_of(driver_command, params)
+                self.complete(driver_command, "webdriver", start, {"target": target} if target else None)
+
+        driver.execute = execute
+        driver._tracer = self
+        self.sync(driver)
+        return driver
+
+    def sync(self, driver) -> None:
+        """在浏览器的 DevTools 时间线上留一个 TimeStamp 标记，供 merge 对齐两条时间线"""
+        self._sync_count += 1
+        label = f"{SYNC_PREFIX}:{os.getpid()}:{self._sync_count}"
+        try:
+            before = _now_us()
+            driver.execute_script("console.timeStamp(arguments[0]);", label)
+            after = _now_us()
+        except Exception:
+            return
+        self.instant(label, "sync", {"label": label}, ts=(before + after) // 2)
+
+    # step_tracker 监听者
+    def on_step_start(self, title) -> None:
+        self.begin(title or "step", "step")
+
+    def on_step_stop(self, title, exc_val) -> None:
+        self.end(title or "step", "step", {"error": type(exc_val).__name__} if exc_val else None)
+
+    # fixture teardown：pytest 按后进先出执行终结器，setup 之后登记的终结器会在 fixture 自身的 teardown 之前运行
+    def fixture_teardown_started(self, key, name) -> None:
+        self._open_fixtures.add(key)
+        self.begin(name, "fixture")
+
+    def fixture_teardown_finished(self, key, name) -> None:
+        if key in self._open_fixtures:
+            self._open_fixtures.discard(key)
+            self.end(name, "fixture")
+
+    # ------------------------------------------------------------------ 输出
+
+    def to_trace_events(self) -> list:
+        pid = os.getpid()
+        worker = getattr(Config, "WORKER_ID", "")
+        events = [{"ph": "M", "name": "process_name", "pid": pid, "tid": 0,
+                   "args": {"name": f"worker {worker}" if worker else "pytest"}}]
+        for ident, name in self._threads.items():
+            events.append({"ph": "M", "name": "thread_name", "pid": pid, "tid": ident, "args": {"name": name}})
+        for nodeid, track in self._tracks.items():
+            events.append({"ph": "M", "name": "thread_name", "pid": pid, "tid": track, "args": {"name": nodeid}})
+
+        for ph, name, cat, ts, dur, tid, args in self._events:
+            event = {"ph": ph, "name": name, "cat": cat, "ts": ts, "pid": pid, "tid": tid}
+            if ph == "X":
+                event["dur"] = dur
+            elif ph == "i":
+                event["s"] = "t"
+            if args:
+                event["args"] = args
+            events.append(event)
+        return events
+
+    def flush(self, path=None) -> str:
+        """写出 trace JSON 并清空缓冲，返回文件路径（没有事件时返回空字符串）"""
+        if not self._events:
+            return ""
+        directory = getattr(Config, "TRACE_DIR", "reports/traces/")
+        path = path or os.path.join(directory, "trace.json")
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        trace = {
+            "traceEvents": self.to_trace_events(),
+            "displayTimeUnit": "ms",
+            "otherData": {"base_url": Config.BASE_URL, "browser": Config.BROWSER, "dropped_events": self.dropped},
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(trace, f, ensure_ascii=False)
+        self._events = []
+        self.dropped = 0
+        return path
+
+
+tracer = Tracer()
+
+
+# ---------------------------------------------------------------------- 合并
+
+def _load_events(path) -> list:
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    # DevTools 性能面板导出的文件可能是事件数组，也可能是 {"traceEvents": [...], "metadata": {...}}
+    return data if isinstance(data, list) else data.get("traceEvents", [])
+
+
+def merge_traces(trace_paths, devtools_path=None) -> dict:
+    """合并多个 worker 的 trace，可选再并入浏览器的 DevTools 性能 trace
+
+    DevTools trace 里找到测试侧打过的对时标记（TimeStamp 事件）时，按标记的时间差平移测试侧的事件；
+    找不到时不平移（本机同一个单调时钟下两边本来就基本对齐）。
+    """
+    ours = []
+    for path in trace_paths:
+        ours.extend(_load_events(path))
+    if not devtools_path:
+        return {"traceEvents": ours, "displayTimeUnit": "ms"}
+
+    browser = _load_events(devtools_path)
+    marks = {}
+    for event in browser:
+        if event.get("name") == "TimeStamp":
+            message = (event.get("args", {}).get("data") or {}).get("message", "")
+            if message.startswith(SYNC_PREFIX):
+                marks[message] = event["ts"]
+
+    offset = 0
+    for event in ours:
+        if event.get("cat") == "sync" and event["name"] in marks:
+            offset = marks[event["name"]] - event["ts"]
+            break
+    for event in ours:
+        if event.get("ph") != "M":
+            event["ts"] += offset
+    return {"traceEvents": browser + ours, "displayTimeUnit": "ms", "otherData": {"sync_offset_us": offset}}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="合并测试运行 trace（可选并入 DevTools 性能 trace）")
+    parser.add_argument("traces", nargs="+", help="reports/traces/ 下的 trace.json（多个 worker 可一起传）")
+    parser.add_argument("--devtools", help="DevTools 性能面板导出的 trace JSON")
+    parser.add_argument("-o", "--output", default="reports/traces/merged.json")
+    args = parser.parse_args(argv)
+
+    merged = merge_traces(args.traces, args.devtools)
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(merged, f, ensure_ascii=False)
+    offset = merged.get("otherData", {}).get("sync_offset_us")
+    print(f"已写入 {args.output}（{len(merged['traceEvents'])} 个事件" + (f"，对时偏移 {offset}us）" if offset is not None else "）"))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,166 @@
+import time
+
+from selenium.common.exceptions import (
+    JavascriptException,
+    StaleElementReferenceException,
+    TimeoutException,
+    WebDriverException,
+)
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+from config import Config
+from utils.locators import js_string, to_css
+from utils.tracer import tracer
+
+# 页面内等待：先同步检查一次条件，不满足就挂一个 MutationObserver，
+# DOM 每次变化时重新检查，满足或超时后回调 done —— 整个等待只占一次 HTTP 往返。
+_MUTATION_WAIT_JS = """
+var condition = new Function(arguments[0]);
+var budgetMs = arguments[1];
+var done = arguments[arguments.length - 1];
+function check() { try { return condition(); } catch (e) { return null; } }
+var first = check();
+if (first) { done(first); return; }
+var finished = false, timer = null;
+var observer = new MutationObserver(function () {
+    if (finished) { return; }
+    var result = check();
+    if (result) { finished = true; observer.disconnect(); clearTimeout(timer); done(result); }
+});
+observer.observe(document, {childList: true, subtree: true, attributes: true, characterData: true});
+timer = setTimeout(function () {
+    if (finished) { return; }
+    finished = true; observer.disconnect(); done(check() || null);
+}, budgetMs);
+"""
+
+
+class Waiter:
+    """显式等待引擎（替代全局隐式等待）
+
+    - 每次调用都可以单独指定超时预算（timeout），不指定则用 Config.EXPLICIT_WAIT
+    - “存在”检查：present / visible / clickable，超时抛 TimeoutException
+    - “不存在”检查：find_or_none 默认只查一次（Config.ABSENCE_TIMEOUT=0），不会白等 10 秒
+    - js_until / any_of：在页面内用 MutationObserver 等待，避免通过 HTTP 反复轮询
+    """
+
+    def __init__(self, driver, timeout=None, poll_interval=None):
+        self.driver = driver
+        self.timeout = Config.EXPLICIT_WAIT if timeout is None else timeout
+        self.poll_interval = getattr(Config, "WAIT_POLL_INTERVAL", 0.1) if poll_interval is None else poll_interval
+
+    def _budget(self, timeout):
+        return self.timeout if timeout is None else timeout
+
+    def until(self, condition, timeout=None, message=""):
+        """轮询等待任意条件（selenium expected_conditions 或 callable(driver)）"""
+        wait = WebDriverWait(
+            self.driver,
+            self._budget(timeout),
+            poll_frequency=self.poll_interval,
+            ignored_exceptions=(StaleElementReferenceException,),
+        )
+        return wait.until(condition, message)
+
+    def present(self, locator, timeout=None):
+        return self.until(EC.presence_of_element_located(locator), timeout, f"元素未出现: {locator}")
+
+    def all_present(self, locator, timeout=None):
+        return self.until(EC.presence_of_all_elements_located(locator), timeout, f"元素未出现: {locator}")
+
+    def visible(self, locator, timeout=None):
+        return self.until(EC.visibility_of_element_located(locator), timeout, f"元素不可见: {locator}")
+
+    def clickable(self, locator, timeout=None):
+        return self.until(EC.element_to_be_clickable(locator), timeout, f"元素不可点击: {locator}")
+
+    def find_or_none(self, locator, timeout=None):
+        """元素存在就返回，不存在返回 None
+
+        默认预算为 Config.ABSENCE_TIMEOUT（0 = 只查一次，立即返回）。
+        """
+        budget = getattr(Config, "ABSENCE_TIMEOUT", 0) if timeout is None else timeout
+        if budget <= 0:
+            elements = self.driver.find_elements(*locator)
+            return elements[0] if elements else None
+        try:
+            return self.present(locator, budget)
+        except TimeoutException:
+            return None
+
+    def absent(self, locator, timeout=None) -> bool:
+        """等待元素消失，预算内消失返回 True，否则 False"""
+        try:
+            self.until(lambda d: not d.find_elements(*locator), timeout)
+            return True
+        except TimeoutException:
+            return False
+
+    def url_contains(self, fragment, timeout=None):
+        """等待 URL 包含指定片段（页面内等待，SPA 路由切换时不需要轮询）"""
+        condition = f"return location.href.indexOf({js_string(fragment)}) >= 0;"
+        return self.js_until(condition, timeout, f"URL 未包含: {fragment}")
+
+    def url_changes(self, old_url, timeout=None):
+        condition = f"return location.href !== {js_string(old_url)};"
+        return self.js_until(condition, timeout, f"URL 未变化: {old_url}")
+
+    def js_until(self, condition_js: str, timeout=None, message=""):
+        """在页面内等待 JS 条件为真，返回条件的值
+
+        condition_js 是函数体，例如 "return document.querySelector('.title');"
+        页面发生整页跳转时页面内等待会被打断，此时退回到按 poll_interval 轮询。
+        """
+        budget = self._budget(timeout)
+        deadline = time.monotonic() + budget
+        script_timeout = getattr(Config, "SCRIPT_TIMEOUT", 30)
+
+        if budget < script_timeout:
+            try:
+                result = self.driver.execute_async_script(_MUTATION_WAIT_JS, condition_js, int(budget * 1000))
+            except TimeoutException:
+                raise
+            except WebDriverException:
+                # 典型情况：整页跳转导致 "document unloaded while waiting for result"
+                pass
+            else:
+                if result:
+                    return result
+                raise TimeoutException(message or f"页面条件未满足: {condition_js}")
+
+        remaining = max(0.0, deadline - time.monotonic())
+
+        def _check(driver):
+            try:
+                return driver.execute_script(condition_js)
+            except JavascriptException:
+                return None
+
+        return self.until(_check, remaining, message or f"页面条件未满足: {condition_js}")
+
+    def any_of(self, present=(), url_contains=(), timeout=None):
+        """等待多个结果中的任意一个出现，返回命中的那个
+
+        present：定位器列表（命中时返回该定位器）
+        url_contains：URL 片段列表（命中时返回该片段）
+        典型用法：点击“继续”后，要么跳到下一步，要么出现错误提示。
+        """
+        checks = []
+        targets = {}
+        for i, fragment in enumerate(url_contains):
+            key = f"url:{i}"
+            targets[key] = fragment
+            checks.append(f"if (location.href.indexOf({js_string(fragment)}) >= 0) return {js_string(key)};")
+        for i, locator in enumerate(present):
+            key = f"present:{i}"
+            targets[key] = locator
+            checks.append(f"if (document.querySelector({js_string(to_css(locator))})) return {js_string(key)};")
+        checks.append("return null;")
+
+        hit = self.js_until("\n".join(checks), timeout, f"等待超时: present={list(present)} url={list(url_contains)}")
+        return targets[hit]
+
+
+if tracer.enabled():
+    tracer.trace_class(Waiter, cat="wait")